@@ -4,13 +4,82 @@ import yaml
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "..", "config.yaml")
 
+try:
+    from yaml import CSafeLoader as SafeLoader # libyaml parser, an order of magnitude faster
+except ImportError:
+    from yaml import SafeLoader
+
 with open(CONFIG_PATH, "r") as f:
-    _config = yaml.safe_load(f)
+    _config = yaml.load(f, Loader=SafeLoader)
 
 # Extract the values for easy access
 MONGO_URI = _config["database"]["MONGO_URI"]
 MONGO_DB_NAME = _config["database"]["MONGO_DB"]
+MONGO_MAX_POOL_SIZE = _config["database"]["MONGO_MAX_POOL_SIZE"]
+MONGO_MIN_POOL_SIZE = _config["database"]["MONGO_MIN_POOL_SIZE"]
+MONGO_MAX_IDLE_TIME_MS = _config["database"]["MONGO_MAX_IDLE_TIME_MS"]
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _config["database"]["MONGO_WAIT_QUEUE_TIMEOUT_MS"]
+MONGO_WRITE_BUFFER_ENABLED = _config["database"]["MONGO_WRITE_BUFFER_ENABLED"]
+MONGO_WRITE_BATCH_SIZE = _config["database"]["MONGO_WRITE_BATCH_SIZE"]
+MONGO_WRITE_FLUSH_INTERVAL = _config["database"]["MONGO_WRITE_FLUSH_INTERVAL"]
+MONGO_WRITE_MAX_PENDING = _config["database"]["MONGO_WRITE_MAX_PENDING"]
+MONGO_WRITE_ORDERED = _config["database"]["MONGO_WRITE_ORDERED"]
 POSTGRES_HOST = _config["database"]["POSTGRES_HOST"]
 POSTGRES_DB = _config["database"]["POSTGRES_DB"]
 POSTGRES_USER = _config["database"]["POSTGRES_USER"]
-POSTGRES_PASSWORD = _config["database"]["POSTGRES_PASSWORD"]
\ No newline at end of file
+POSTGRES_PASSWORD = _config["database"]["POSTGRES_PASSWORD"]
+POSTGRES_CONNECT_TIMEOUT = _config["database"]["POSTGRES_CONNECT_TIMEOUT"]
+# The production launcher (app/server.py) sizes the pools of each worker through the environment
+POSTGRES_POOL_MIN_CONN = int(os.environ.get("POSTGRES_POOL_MIN_CONN", _config["database"]["POSTGRES_POOL_MIN_CONN"]))
+POSTGRES_POOL_MAX_CONN = int(os.environ.get("POSTGRES_POOL_MAX_CONN", _config["database"]["POSTGRES_POOL_MAX_CONN"]))
+POSTGRES_POOL_ACQUIRE_TIMEOUT = _config["database"]["POSTGRES_POOL_ACQUIRE_TIMEOUT"]
+POSTGRES_POOL_MAX_IDLE_TIME = _config["database"]["POSTGRES_POOL_MAX_IDLE_TIME"]
+POSTGRES_POOL_MAX_LIFETIME = _config["database"]["POSTGRES_POOL_MAX_LIFETIME"]
+POSTGRES_POOL_VALIDATION_INTERVAL = _config["database"]["POSTGRES_POOL_VALIDATION_INTERVAL"]
+POSTGRES_PREPARE_THRESHOLD = _config["database"]["POSTGRES_PREPARE_THRESHOLD"]
+POSTGRES_PREPARED_CACHE_SIZE = _config["database"]["POSTGRES_PREPARED_CACHE_SIZE"]
+SLOW_QUERY_THRESHOLD_MS = _config["database"]["SLOW_QUERY_THRESHOLD_MS"]
+SLOW_QUERY_EXPLAIN = _config["database"]["SLOW_QUERY_EXPLAIN"]
+SLOW_QUERY_EXPLAINS_PER_MINUTE = _config["database"]["SLOW_QUERY_EXPLAINS_PER_MINUTE"]
+SLOW_QUERY_SCAN_CHECKS_PER_MINUTE = _config["database"]["SLOW_QUERY_SCAN_CHECKS_PER_MINUTE"]
+
+DEFAULT_TIMEZONE = _config["conversion"]["DEFAULT_TIMEZONE"]
+CALENDAR_START_YEAR = _config["conversion"]["CALENDAR_START_YEAR"]
+CALENDAR_END_YEAR = _config["conversion"]["CALENDAR_END_YEAR"]
+CONVERSION_CACHE_SIZE = _config["conversion"]["CONVERSION_CACHE_SIZE"]
+CONVERSION_CACHE_MAX_AGE = _config["conversion"]["CONVERSION_CACHE_MAX_AGE"]
+
+STARTUP_TIMEOUT = _config["startup"]["STARTUP_TIMEOUT"]
+STARTUP_REQUIRED_BACKENDS = _config["startup"]["STARTUP_REQUIRED_BACKENDS"] or []
+STARTUP_RETRY_INTERVAL = _config["startup"]["STARTUP_RETRY_INTERVAL"]
+
+SERVER_HOST = _config["server"]["SERVER_HOST"]
+SERVER_PORT = _config["server"]["SERVER_PORT"]
+SERVER_WORKERS = _config["server"]["SERVER_WORKERS"]
+SERVER_POSTGRES_CONNECTION_BUDGET = _config["server"]["SERVER_POSTGRES_CONNECTION_BUDGET"]
+SERVER_REQUEST_TIMEOUT = _config["server"]["SERVER_REQUEST_TIMEOUT"]
+SERVER_KEEP_ALIVE_TIMEOUT = _config["server"]["SERVER_KEEP_ALIVE_TIMEOUT"]
+SERVER_GRACEFUL_SHUTDOWN_TIMEOUT = _config["server"]["SERVER_GRACEFUL_SHUTDOWN_TIMEOUT"]
+SERVER_MAX_REQUESTS = _config["server"]["SERVER_MAX_REQUESTS"]
+SERVER_LIMIT_CONCURRENCY = _config["server"]["SERVER_LIMIT_CONCURRENCY"]
+SERVER_BACKLOG = _config["server"]["SERVER_BACKLOG"]
+SERVER_ACCESS_LOG = _config["server"]["SERVER_ACCESS_LOG"]
+SERVER_CPU_AFFINITY = _config["server"]["SERVER_CPU_AFFINITY"]
+
+ADMISSION_ROUTES = _config["admission"]["ADMISSION_ROUTES"] or {}
+ADMISSION_POOL_MAX_WAITING = _config["admission"]["ADMISSION_POOL_MAX_WAITING"]
+ADMISSION_POOL_MAX_WAIT_TIME = _config["admission"]["ADMISSION_POOL_MAX_WAIT_TIME"]
+ADMISSION_RETRY_AFTER_MAX = _config["admission"]["ADMISSION_RETRY_AFTER_MAX"]
+
+ROLLUP_SOURCES = _config["rollup"]["ROLLUP_SOURCES"] or {}
+ROLLUP_TABLE = _config["rollup"]["ROLLUP_TABLE"]
+ROLLUP_INTERVAL = _config["rollup"]["ROLLUP_INTERVAL"]
+ROLLUP_BATCH_SIZE = _config["rollup"]["ROLLUP_BATCH_SIZE"]
+
+RESULT_CACHE_MAX_SIZE = _config["cache"]["RESULT_CACHE_MAX_SIZE"]
+RESULT_CACHE_DEFAULT_TTL = _config["cache"]["RESULT_CACHE_DEFAULT_TTL"]
+RESULT_CACHE_TTLS = _config["cache"]["RESULT_CACHE_TTLS"] or {}
+
+LOG_FORMAT = _config["logging"]["LOG_FORMAT"]
+LOG_QUEUE_SIZE = _config["logging"]["LOG_QUEUE_SIZE"]
+LOG_SAMPLE_RATE = _config["logging"]["LOG_SAMPLE_RATE"]
\ No newline at end of file
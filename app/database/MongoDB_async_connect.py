@@ -0,0 +1,186 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Dict, Any, List, AsyncIterator
+from app.config import (
+    MONGO_URI, MONGO_DB_NAME,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+)
+from app.utils.logging_setup import logger
+from app.utils.metrics import Timed
+
+class AsyncMongoDBManager:
+    """
+    A singleton class to manage an asyncio MongoDB connection (motor) and CRUD operations.
+    Same CRUD API as MongoDBManager, but awaitable, so async routes do not block the event loop.
+    """
+    _instance = None
+    client: AsyncIOMotorClient = None
+    db = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(AsyncMongoDBManager, cls).__new__(cls)
+        return cls._instance
+
+    async def connect(self):
+        """
+        Create the async MongoDB client and initialize the database instance.
+        The connection pool is sized by the MONGO_*_POOL_SIZE keys of config.yaml.
+        """
+        if not self.client:
+            self.client = AsyncIOMotorClient(
+                MONGO_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS
+            )
+            self.db = self.client[MONGO_DB_NAME]
+            logger.info(f"Connected to MongoDB (async): {MONGO_DB_NAME}")
+
+    async def disconnect(self):
+        """
+        Close the async MongoDB connection.
+        """
+        if self.client:
+            self.client.close()
+            self.client = None
+            self.db = None
+            logger.info("Async MongoDB connection closed.")
+
+    async def ping(self):
+        """
+        Check that the MongoDB server answers.
+        Raises the driver error (e.g. ServerSelectionTimeoutError) if it does not.
+        """
+        if not self.client:
+            raise RuntimeError("Async MongoDB client is not connected.")
+        await self.client.admin.command("ping")
+
+    @Timed("mongodb")
+    async def getCollectionAsync(self, collectionName: str, query: Dict = None, projection: Dict = None) -> List[Dict]:
+        """
+        Retrieve all documents from a collection.
+        The whole result is loaded in memory: use iterCollectionAsync for large collections.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents, all documents by default.
+            - projection (Dict): Fields to return, all fields by default.
+        Output:
+            - List[Dict]: List of all documents in the collection.
+        """
+        return await self.db[collectionName].find(query or {}, projection).to_list(length=None)
+
+    @Timed("mongodb")
+    async def iterCollectionAsync(
+        self,
+        collectionName: str,
+        query: Dict = None,
+        projection: Dict = None,
+        batchSize: int = 1000,
+        sort: List[tuple] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream the documents of a collection that match a query, batchSize documents per server round-trip.
+        Input:
+            - collectionName, query, projection, batchSize, sort: see MongoDBManager.iterCollection.
+        Output:
+            - AsyncIterator[Dict]: The matching documents.
+        """
+        cursor = self.db[collectionName].find(query or {}, projection, batch_size=batchSize)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+
+    @Timed("mongodb")
+    async def getOneAsync(self, collectionName: str, query: Dict) -> Dict:
+        """
+        Retrieve a single document from a collection that matches the query.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents.
+        Output:
+            - Dict: The first document that matches the query, or None if not found.
+        """
+        return await self.db[collectionName].find_one(query)
+
+    @Timed("mongodb")
+    async def insertOneAsync(self, collectionName: str, document: Dict) -> Any:
+        """
+        Insert a single document into a collection.
+        Input:
+            - collectionName (str): Name of the collection.
+            - document (Dict): The document to insert.
+        Output:
+            - Any: The ID of the inserted document.
+        """
+        return (await self.db[collectionName].insert_one(document)).inserted_id
+
+    @Timed("mongodb")
+    async def insertManyAsync(self, collectionName: str, documents: List[Dict]) -> List[Any]:
+        """
+        Insert multiple documents into a collection.
+        Input:
+            - collectionName (str): Name of the collection.
+            - documents (List[Dict]): List of documents to insert.
+        Output:
+            - List[Any]: List of IDs of the inserted documents.
+        """
+        return (await self.db[collectionName].insert_many(documents)).inserted_ids
+
+    @Timed("mongodb")
+    async def updateOneAsync(self, collectionName: str, query: Dict, newValues: Dict) -> int:
+        """
+        Update a single document in a collection.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to find the document to update.
+            - newValues (Dict): Fields to update.
+        Output:
+            - int: The number of documents modified (1 or 0).
+        """
+        result = await self.db[collectionName].update_one(query, {"$set": newValues})
+        return result.modified_count
+
+    @Timed("mongodb")
+    async def updateManyAsync(self, collectionName: str, query: Dict, newValues: Dict) -> int:
+        """
+        Update multiple documents in a collection.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to find documents to update.
+            - newValues (Dict): Fields to update.
+        Output:
+            - int: The number of documents modified.
+        """
+        result = await self.db[collectionName].update_many(query, {"$set": newValues})
+        return result.modified_count
+
+    @Timed("mongodb")
+    async def deleteOneAsync(self, collectionName: str, query: Dict) -> int:
+        """
+        Delete a single document from a collection.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to find the document to delete.
+        Output:
+            - int: The number of documents deleted (1 or 0).
+        """
+        result = await self.db[collectionName].delete_one(query)
+        return result.deleted_count
+
+    @Timed("mongodb")
+    async def deleteManyAsync(self, collectionName: str, query: Dict) -> int:
+        """
+        Delete multiple documents from a collection.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to find documents to delete.
+        Output:
+            - int: The number of documents deleted.
+        """
+        result = await self.db[collectionName].delete_many(query)
+        return result.deleted_count
@@ -0,0 +1,164 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.utils.logging_setup import logger
+
+class WriteBufferFullError(Exception):
+    """Raised when the buffer stayed full for longer than the enqueue timeout."""
+
+class MongoWriteBuffer:
+    """
+    A write-behind buffer of MongoDB inserts and $set updates.
+    - Writes are collected per collection and sent as bulk_write batches of at most maxBatchSize
+      operations by a background thread, when maxBatchSize writes are pending or every flushInterval seconds.
+    - Writes of a collection are sent in the order they were buffered. With ordered=True a failed
+      write stops the rest of its batch, with ordered=False the server may apply a batch in any order.
+    - When maxPending writes are pending, callers block until a flush frees space (backpressure).
+    - Failed writes are logged and counted, not retried.
+    """
+
+    def __init__(
+        self,
+        db,
+        maxBatchSize: int = 1000,
+        flushInterval: float = 1.0,
+        maxPending: int = 100000,
+        ordered: bool = True,
+        enqueueTimeout: float = 30.0,
+        onWrite: Callable[[str], None] = None
+    ):
+        """
+        Start the flush thread.
+        Input:
+            db: pymongo Database the writes are sent to.
+            maxBatchSize (int): number of operations per bulk_write, and number of pending writes that triggers a flush.
+            flushInterval (float): maximum number of seconds between flushes.
+            maxPending (int): number of pending writes above which callers block.
+            ordered (bool): bulk_write ordering.
+            enqueueTimeout (float): number of seconds a caller blocks on a full buffer before WriteBufferFullError.
+            onWrite (callable): called with the collection name after each batch, e.g. to invalidate caches.
+        """
+        self.db = db
+        self.maxBatchSize = maxBatchSize
+        self.flushInterval = flushInterval
+        self.maxPending = max(maxPending, maxBatchSize)
+        self.ordered = ordered
+        self.enqueueTimeout = enqueueTimeout
+        self.onWrite = onWrite
+        self.closed = False
+        self._cond = threading.Condition()
+        self._flushLock = threading.Lock() # Serializes the flushes so that batches are written in order
+        self._pending = {} # collection name -> list of operations
+        self._pendingCount = 0 # Buffered plus being written
+        self._flushRequested = False
+        self._stats = {"buffered": 0, "written": 0, "failed": 0, "batches": 0, "flushes": 0, "blockedCount": 0}
+        self._thread = threading.Thread(target=self._run, name="mongo-write-buffer", daemon=True)
+        self._thread.start()
+
+    def insert(self, collectionName: str, document: Dict):
+        """Buffer the insertion of a document."""
+        self._add(collectionName, InsertOne(document))
+
+    def update(self, collectionName: str, query: Dict, newValues: Dict, upsert: bool = False):
+        """Buffer a $set update of the first document matching the query."""
+        self._add(collectionName, UpdateOne(query, {"$set": newValues}, upsert=upsert))
+
+    def _add(self, collectionName: str, operation: Any):
+        with self._cond:
+            if self.closed:
+                raise RuntimeError("The write buffer is closed.")
+            if self._pendingCount >= self.maxPending:
+                self._stats["blockedCount"] += 1
+                self._flushRequested = True
+                self._cond.notify_all()
+                deadline = time.monotonic() + self.enqueueTimeout
+                while self._pendingCount >= self.maxPending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self.closed:
+                        raise WriteBufferFullError(f"Write buffer still full after {self.enqueueTimeout} seconds.")
+                    self._cond.wait(remaining)
+            self._pending.setdefault(collectionName, []).append(operation)
+            self._pendingCount += 1
+            self._stats["buffered"] += 1
+            if self._pendingCount == self.maxBatchSize:
+                self._cond.notify_all()
+
+    def _run(self):
+        """Flush thread: flush when a batch is full, a flush is requested, or every flushInterval seconds."""
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flushInterval
+                while not (self.closed or self._flushRequested or self._pendingCount >= self.maxBatchSize):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._flushRequested = False
+                if self.closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Write every buffered operation now, and wait until it is written."""
+        with self._flushLock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            count = sum(len(operations) for operations in pending.values())
+            written = failed = batches = 0
+            for collectionName, operations in pending.items():
+                for start in range(0, len(operations), self.maxBatchSize):
+                    batch = operations[start:start + self.maxBatchSize]
+                    done, errors = self._writeBatch(collectionName, batch)
+                    if self.onWrite:
+                        self.onWrite(collectionName)
+                    written += done
+                    failed += errors
+                    batches += 1
+            with self._cond:
+                self._pendingCount -= count
+                self._stats["written"] += written
+                self._stats["failed"] += failed
+                self._stats["batches"] += batches
+                self._stats["flushes"] += 1
+                self._cond.notify_all()
+
+    def _writeBatch(self, collectionName: str, batch: List) -> tuple[int, int]:
+        """Send one bulk_write. Return the numbers of written and failed operations."""
+        try:
+            self.db[collectionName].bulk_write(batch, ordered=self.ordered)
+            return len(batch), 0
+        except BulkWriteError as e:
+            details = e.details
+            done = details.get("nInserted", 0) + details.get("nMatched", 0) + details.get("nUpserted", 0)
+            logger.error(
+                f"Buffered write to {collectionName} failed for {len(details.get('writeErrors', []))} operations: "
+                f"{details.get('writeErrors', [{}])[0].get('errmsg')}"
+            )
+            return done, len(batch) - done
+        except Exception as e:
+            logger.error(f"Buffered write of {len(batch)} operations to {collectionName} failed: {e}")
+            return 0, len(batch)
+
+    def close(self):
+        """Stop the flush thread and write the remaining operations."""
+        with self._cond:
+            if self.closed:
+                return
+            self.closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+
+    def getStats(self) -> Dict[str, Any]:
+        """
+        Return the buffer counters.
+        Output: dict with pending, buffered, written, failed, batches, flushes and blockedCount.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["pending"] = self._pendingCount
+        return stats
@@ -1,52 +1,256 @@
-from pymongo import MongoClient
-from typing import Dict, Any, List
-from app.config import MONGO_URI, MONGO_DB_NAME
+import base64
+import time
+from bson import json_util
+from pymongo import ASCENDING, MongoClient
+from typing import Dict, Any, List, Iterator
+from app.config import (
+    MONGO_URI, MONGO_DB_NAME,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_WRITE_BATCH_SIZE, MONGO_WRITE_FLUSH_INTERVAL, MONGO_WRITE_MAX_PENDING, MONGO_WRITE_ORDERED,
+    RESULT_CACHE_MAX_SIZE, RESULT_CACHE_DEFAULT_TTL, RESULT_CACHE_TTLS,
+)
+from app.database.MongoDB_buffer import MongoWriteBuffer
+from app.utils.result_cache import ResultCache
 from app.utils.logging_setup import logger
+from app.utils.metrics import Timed
+from app.utils.slow_query import COLLECTION_SCANS, SLOW_QUERY_LOG, NormalizeFilter, ParamShape, SummarizeMongoPlan
 
 class MongoDBManager:
     """
     A singleton class to manage MongoDB connections and CRUD operations.
     """
     _instance = None
+    client: MongoClient = None
+    db = None
+    _writeBuffer: MongoWriteBuffer = None
+    _resultCache = ResultCache(RESULT_CACHE_MAX_SIZE, RESULT_CACHE_DEFAULT_TTL, RESULT_CACHE_TTLS)
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             cls._instance = super(MongoDBManager, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
-        self.client = None
-        self.db = None
-
     def connect(self):
         """
         Establish a connection to MongoDB and initialize the database instance.
+        The connection pool is sized by the MONGO_*_POOL_SIZE keys of config.yaml.
         """
         if not self.client:
-            self.client = MongoClient(MONGO_URI)
+            self.client = MongoClient(
+                MONGO_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS
+            )
             self.db = self.client[MONGO_DB_NAME]
             logger.info(f"Connected to MongoDB: {MONGO_DB_NAME}")
 
 
     def disconnect(self):
         """
-        Close the MongoDB connection.
+        Close the MongoDB connection, after writing the buffered writes.
         """
+        if self._writeBuffer:
+            self._writeBuffer.close()
+            self._writeBuffer = None
         if self.client:
             self.client.close()
             self.client = None
+            self.db = None
             logger.info("MongoDB connection closed.")
 
-    def getCollection(self, collectionName: str) -> List[Dict]:
+    def ping(self):
+        """
+        Check that the MongoDB server answers.
+        Raises the driver error (e.g. ServerSelectionTimeoutError) if it does not.
+        """
+        if not self.client:
+            raise RuntimeError("MongoDB client is not connected.")
+        self.client.admin.command("ping")
+
+    @Timed("mongodb")
+    def getCollection(self, collectionName: str, query: Dict = None, projection: Dict = None) -> List[Dict]:
         """
         Retrieve all documents from a collection.
+        The whole result is loaded in memory: use iterCollection or getPage for large collections.
         Input:
             - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents, all documents by default.
+            - projection (Dict): Fields to return, all fields by default.
         Output:
             - List[Dict]: List of all documents in the collection.
         """
-        return list(self.db[collectionName].find({}))
+        return list(self.iterCollection(collectionName, query, projection))
+
+    @Timed("mongodb")
+    def iterCollection(
+        self,
+        collectionName: str,
+        query: Dict = None,
+        projection: Dict = None,
+        batchSize: int = 1000,
+        sort: List[tuple] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream the documents of a collection that match a query.
+        Documents are fetched from the server batchSize at a time, so memory is bounded by
+        one batch and the first document arrives without waiting for the whole result.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents, all documents by default.
+            - projection (Dict): Fields to return, e.g. {"name": 1, "_id": 0}, all fields by default.
+            - batchSize (int): Number of documents per server round-trip.
+            - sort (List[tuple]): Sort specification, e.g. [("createdAt", -1)].
+        Output:
+            - Iterator[Dict]: The matching documents. The server cursor is closed when the iterator is closed.
+        """
+        cursor = self.db[collectionName].find(query or {}, projection, batch_size=batchSize)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    @Timed("mongodb")
+    def iterPages(
+        self,
+        collectionName: str,
+        query: Dict = None,
+        projection: Dict = None,
+        pageSize: int = 1000,
+        sortField: str = "_id",
+        after: tuple = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Stream the documents of a collection that match a query, one page at a time, with keyset pagination:
+        each page is a new query starting after the (sortField, _id) of the last document of the previous page,
+        so every page costs an index range scan instead of skipping the previous pages.
+        sortField should be indexed (together with _id) and present in every matching document.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents, all documents by default.
+            - projection (Dict): Fields to return. sortField and _id are always returned.
+            - pageSize (int): Number of documents per page.
+            - sortField (str): Field the pages are ordered by, "_id" by default.
+            - after (tuple): (sortField value, _id) of the document to start after, from the start by default.
+        Output:
+            - Iterator[List[Dict]]: Pages of at most pageSize documents, in ascending (sortField, _id) order.
+        """
+        while True:
+            page = self.fetchPage(collectionName, query, projection, pageSize, sortField, after)
+            if page:
+                yield page
+            if len(page) < pageSize:
+                return
+            after = (self.getFieldValue(page[-1], sortField), page[-1]["_id"])
+
+    @Timed("mongodb")
+    def getPage(
+        self,
+        collectionName: str,
+        query: Dict = None,
+        projection: Dict = None,
+        pageSize: int = 100,
+        sortField: str = "_id",
+        token: str = None
+    ) -> tuple[List[Dict], str | None]:
+        """
+        Retrieve one page of documents with keyset pagination, for paginated HTTP endpoints.
+        Input:
+            - collectionName, query, projection, pageSize, sortField: see iterPages.
+            - token (str): Continuation token returned with the previous page, from the start by default.
+        Output:
+            - List[Dict]: The documents of the page.
+            - str | None: URL-safe continuation token of the next page, or None if this is the last page.
+        Raises ValueError if the token is invalid or was issued for another sortField.
+        """
+        after = self.decodeToken(token, sortField) if token else None
+        page = self.fetchPage(collectionName, query, projection, pageSize + 1, sortField, after)
+        if len(page) <= pageSize:
+            return page, None
+        page = page[:pageSize]
+        return page, self.encodeToken(sortField, self.getFieldValue(page[-1], sortField), page[-1]["_id"])
+
+    def fetchPage(
+        self,
+        collectionName: str,
+        query: Dict,
+        projection: Dict,
+        limit: int,
+        sortField: str,
+        after: tuple
+    ) -> List[Dict]:
+        """
+        Run one keyset query: at most limit documents after the (sortField value, _id) pair, in ascending order.
+        """
+        conditions = [query] if query else []
+        if after is not None:
+            lastValue, lastId = after
+            if sortField == "_id":
+                conditions.append({"_id": {"$gt": lastId}})
+            else:
+                conditions.append({"$or": [
+                    {sortField: {"$gt": lastValue}},
+                    {sortField: lastValue, "_id": {"$gt": lastId}},
+                ]})
+        keysetQuery = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+
+        sort = [("_id", ASCENDING)] if sortField == "_id" else [(sortField, ASCENDING), ("_id", ASCENDING)]
+        cursor = self.db[collectionName].find(
+            keysetQuery, self.withSortFields(projection, sortField), batch_size=limit
+        ).sort(sort).limit(limit)
+        try:
+            return list(cursor)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def withSortFields(projection: Dict, sortField: str) -> Dict:
+        """Return the projection with sortField and _id included, as they are needed to build the next page."""
+        if not projection:
+            return projection
+        projection = dict(projection)
+        if any(projection.get(field) == 0 for field in ("_id", sortField)):
+            raise ValueError(f"The projection of a paginated read cannot exclude _id or {sortField}.")
+        # Exclusion projections, and $slice-only ones, return every other field; any other projection,
+        # even {"_id": 1}, is an inclusion projection that must name sortField
+        values = [value for field, value in projection.items() if field != "_id"]
+        isExclusion = any(value in (0, False) for value in values)
+        onlySlices = bool(values) and all(isinstance(value, dict) and set(value) == {"$slice"} for value in values)
+        if not (isExclusion or onlySlices):
+            projection[sortField] = 1
+        return projection
 
+    @staticmethod
+    def getFieldValue(document: Dict, field: str) -> Any:
+        """Return the value of a possibly dotted field of a document, or None if it is missing."""
+        value = document
+        for key in field.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    @staticmethod
+    def encodeToken(sortField: str, lastValue: Any, lastId: Any) -> str:
+        """Encode the position after a document as a URL-safe continuation token (Extended JSON keeps BSON types)."""
+        payload = json_util.dumps({"field": sortField, "value": lastValue, "id": lastId})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def decodeToken(token: str, sortField: str) -> tuple:
+        """Decode a continuation token into a (sortField value, _id) pair."""
+        try:
+            payload = json_util.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            if payload["field"] != sortField:
+                raise ValueError
+            return payload["value"], payload["id"]
+        except Exception:
+            raise ValueError("Invalid continuation token.") from None
+
+    @Timed("mongodb")
     def getOne(self, collectionName: str, query: Dict) -> Dict:
         """
         Retrieve a single document from a collection that matches the query.
@@ -56,8 +260,93 @@ class MongoDBManager:
         Output:
             - Dict: The first document that matches the query, or None if not found.
         """
-        return self.db[collectionName].find_one(query)
+        start = time.perf_counter()
+        document = self.db[collectionName].find_one(query)
+        self.checkSlowOperation("getOne", collectionName, query, None, time.perf_counter() - start)
+        return document
 
+    def checkSlowOperation(self, operation: str, collectionName: str, query: Dict, newValues: Dict, duration: float):
+        """
+        Log a filter operation if it is slower than SLOW_QUERY_THRESHOLD_MS, and capture the plan
+        of its filter if SLOW_QUERY_EXPLAIN is set, or else check it for a collection scan (see
+        SLOW_QUERY_SCAN_CHECKS_PER_MINUTE). Collection scans are flagged either way.
+        """
+        if SLOW_QUERY_LOG.isSlow(duration):
+            SLOW_QUERY_LOG.record(
+                "mongodb", operation, f"{collectionName} {json_util.dumps(NormalizeFilter(query or {}))}",
+                ParamShape(newValues) if newValues is not None else "-", duration,
+                lambda: self.explainFilter(collectionName, query),
+                lambda: self.findCollectionScan(collectionName, query)
+            )
+
+    def explainFilter(self, collectionName: str, query: Dict) -> str:
+        """
+        Return a summary of the explain() plan of a filter: winning plan stages, keys and documents examined.
+        A collection scan is flagged in the summary and counted in mongodb_collection_scans_total.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents.
+        Output:
+            - str: The plan summary.
+        """
+        summary, isCollectionScan = SummarizeMongoPlan(self.db[collectionName].find(query or {}).explain())
+        if isCollectionScan:
+            COLLECTION_SCANS.inc((collectionName,))
+        return summary
+
+    def findCollectionScan(self, collectionName: str, query: Dict) -> str | None:
+        """
+        Check whether a filter is answered by a collection scan, from a queryPlanner explain: the winning
+        plan is chosen without running the query, so the check is cheap. A scan is counted in
+        mongodb_collection_scans_total.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents.
+        Output:
+            - str: The plan summary if it is a collection scan, None otherwise.
+        """
+        explanation = self.db.command("explain", {"find": collectionName, "filter": query or {}}, verbosity="queryPlanner")
+        summary, isCollectionScan = SummarizeMongoPlan(explanation)
+        if not isCollectionScan:
+            return None
+        COLLECTION_SCANS.inc((collectionName,))
+        return summary
+
+    @Timed("mongodb")
+    def getOneCached(self, collectionName: str, query: Dict, ttl: float = None) -> Dict:
+        """
+        Retrieve a single document that matches the query, through the in-process result cache.
+        The result is cached per collection (TTL from RESULT_CACHE_TTLS, or ttl) and dropped when the
+        collection is written through this manager. Concurrent misses run the query once.
+        Invalidation is per process: other workers keep serving their cached result until its TTL.
+        The returned document is shared with other callers and must not be mutated.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to filter documents.
+            - ttl (float): Seconds the result is cached, overriding the collection TTL.
+        Output:
+            - Dict: The first document that matches the query, or None if not found.
+        """
+        key = ("getOne", json_util.dumps(query)) # Not sorted: field order matters in embedded documents
+        return self._resultCache.getOrLoad((collectionName,), key, lambda: self.getOne(collectionName, query), ttl)
+
+    def invalidateCache(self, collectionName: str = None):
+        """
+        Drop the cached results of a collection, or every cached result if collectionName is None.
+        Use it after writing a collection outside this manager.
+        """
+        if collectionName is None:
+            self._resultCache.clear()
+        else:
+            self._resultCache.invalidate(collectionName)
+
+    def getCacheStats(self) -> Dict[str, Any]:
+        """
+        Return the result cache counters (size, hits, misses, hitRatio, evictions, ...).
+        """
+        return self._resultCache.getStats()
+
+    @Timed("mongodb")
     def insertOne(self, collectionName: str, document: Dict) -> Any:
         """
         Insert a single document into a collection.
@@ -67,8 +356,11 @@ class MongoDBManager:
         Output:
             - Any: The ID of the inserted document.
         """
-        return self.db[collectionName].insert_one(document).inserted_id
+        insertedId = self.db[collectionName].insert_one(document).inserted_id
+        self.invalidateCache(collectionName)
+        return insertedId
 
+    @Timed("mongodb")
     def insertMany(self, collectionName: str, documents: List[Dict]) -> List[Any]:
         """
         Insert multiple documents into a collection.
@@ -78,8 +370,11 @@ class MongoDBManager:
         Output:
             - List[Any]: List of IDs of the inserted documents.
         """
-        return self.db[collectionName].insert_many(documents).inserted_ids
+        insertedIds = self.db[collectionName].insert_many(documents).inserted_ids
+        self.invalidateCache(collectionName)
+        return insertedIds
 
+    @Timed("mongodb")
     def updateOne(self, collectionName: str, query: Dict, newValues: Dict) -> int:
         """
         Update a single document in a collection.
@@ -90,9 +385,13 @@ class MongoDBManager:
         Output:
             - int: The number of documents modified (1 or 0).
         """
+        start = time.perf_counter()
         result = self.db[collectionName].update_one(query, {"$set": newValues})
+        self.checkSlowOperation("updateOne", collectionName, query, newValues, time.perf_counter() - start)
+        self.invalidateCache(collectionName)
         return result.modified_count
 
+    @Timed("mongodb")
     def updateMany(self, collectionName: str, query: Dict, newValues: Dict) -> int:
         """
         Update multiple documents in a collection.
@@ -103,9 +402,72 @@ class MongoDBManager:
         Output:
             - int: The number of documents modified.
         """
+        start = time.perf_counter()
         result = self.db[collectionName].update_many(query, {"$set": newValues})
+        self.checkSlowOperation("updateMany", collectionName, query, newValues, time.perf_counter() - start)
+        self.invalidateCache(collectionName)
         return result.modified_count
 
+    def enableWriteBuffer(
+        self,
+        maxBatchSize: int = MONGO_WRITE_BATCH_SIZE,
+        flushInterval: float = MONGO_WRITE_FLUSH_INTERVAL,
+        maxPending: int = MONGO_WRITE_MAX_PENDING,
+        ordered: bool = MONGO_WRITE_ORDERED
+    ):
+        """
+        Start the write-behind buffer used by bufferInsert and bufferUpdate (opt-in).
+        Buffered writes are sent as bulk_write batches of maxBatchSize operations, at least every
+        flushInterval seconds, and callers block when maxPending writes are pending.
+        The buffer is flushed and stopped by disconnect.
+        """
+        if not self._writeBuffer:
+            self._writeBuffer = MongoWriteBuffer(
+                self.db, maxBatchSize, flushInterval, maxPending, ordered, onWrite=self.invalidateCache
+            )
+            logger.info("MongoDB write buffer enabled.")
+
+    @Timed("mongodb")
+    def bufferInsert(self, collectionName: str, document: Dict):
+        """
+        Buffer the insertion of a document into a collection. It is written in the background.
+        Input:
+            - collectionName (str): Name of the collection.
+            - document (Dict): The document to insert.
+        """
+        if not self._writeBuffer:
+            raise RuntimeError("MongoDB write buffer is not enabled.")
+        self._writeBuffer.insert(collectionName, document)
+
+    @Timed("mongodb")
+    def bufferUpdate(self, collectionName: str, query: Dict, newValues: Dict, upsert: bool = False):
+        """
+        Buffer the update of a single document in a collection. It is written in the background.
+        Input:
+            - collectionName (str): Name of the collection.
+            - query (Dict): Query to find the document to update.
+            - newValues (Dict): Fields to update.
+            - upsert (bool): Insert the document if none matches the query.
+        """
+        if not self._writeBuffer:
+            raise RuntimeError("MongoDB write buffer is not enabled.")
+        self._writeBuffer.update(collectionName, query, newValues, upsert)
+
+    @Timed("mongodb")
+    def flushWrites(self):
+        """
+        Write the buffered writes now and wait until they are written.
+        """
+        if self._writeBuffer:
+            self._writeBuffer.flush()
+
+    def getWriteBufferStats(self) -> Dict[str, Any]:
+        """
+        Return the write buffer counters (pending, written, failed, batches, ...), or an empty dict if it is not enabled.
+        """
+        return self._writeBuffer.getStats() if self._writeBuffer else {}
+
+    @Timed("mongodb")
     def deleteOne(self, collectionName: str, query: Dict) -> int:
         """
         Delete a single document from a collection.
@@ -115,9 +477,13 @@ class MongoDBManager:
         Output:
             - int: The number of documents deleted (1 or 0).
         """
+        start = time.perf_counter()
         result = self.db[collectionName].delete_one(query)
+        self.checkSlowOperation("deleteOne", collectionName, query, None, time.perf_counter() - start)
+        self.invalidateCache(collectionName)
         return result.deleted_count
 
+    @Timed("mongodb")
     def deleteMany(self, collectionName: str, query: Dict) -> int:
         """
         Delete multiple documents from a collection.
@@ -127,7 +493,10 @@ class MongoDBManager:
         Output:
             - int: The number of documents deleted.
         """
+        start = time.perf_counter()
         result = self.db[collectionName].delete_many(query)
+        self.checkSlowOperation("deleteMany", collectionName, query, None, time.perf_counter() - start)
+        self.invalidateCache(collectionName)
         return result.deleted_count
 
 # usage of class 
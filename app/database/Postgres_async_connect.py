@@ -0,0 +1,133 @@
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+from app.config import POSTGRES_DB, POSTGRES_HOST, POSTGRES_PASSWORD, POSTGRES_USER, POSTGRES_CONNECT_TIMEOUT
+from typing import List, Dict
+from app.utils.logging_setup import logger
+from app.utils.metrics import Timed
+from app.utils.request_timeout import GetStatementTimeout
+
+class AsyncPostgresManager:
+    """
+    A singleton class to manage an asyncio Postgres connection pool.
+    Same query, non-query and transaction API as PostgresManager, but awaitable,
+    so async routes do not block the event loop or take a threadpool slot.
+    Queries use the same %s parameter placeholders.
+    """
+    _instance = None
+    _pool: AsyncConnectionPool = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(AsyncPostgresManager, cls).__new__(cls)
+        return cls._instance
+
+    async def initializePool(self, minConn: int = 1, maxConn: int = 20):
+        """
+        Initialize the async connection pool and wait for minConn connections.
+        """
+        if not self._pool:
+            pool = AsyncConnectionPool(
+                make_conninfo(
+                    host=POSTGRES_HOST,
+                    dbname=POSTGRES_DB,
+                    user=POSTGRES_USER,
+                    password=POSTGRES_PASSWORD,
+                    connect_timeout=POSTGRES_CONNECT_TIMEOUT
+                ),
+                min_size=minConn,
+                max_size=maxConn,
+                open=False
+            )
+            try:
+                await pool.open(wait=True)
+            except BaseException:
+                await pool.close() # Stop the pool workers, which would keep reconnecting
+                raise
+            self._pool = pool
+            logger.info("Async database connection pool initialized.")
+
+    async def closePool(self):
+        """
+        Close all connections in the async pool.
+        """
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+            logger.info("Async database connection pool closed.")
+
+    async def ping(self):
+        """
+        Check that the database answers, on a pooled connection.
+        Raises the driver error if it does not.
+        """
+        async with self.getConnection() as conn:
+            await conn.execute("SELECT 1")
+
+    def getConnection(self):
+        """
+        Get a connection from the pool, as an async context manager:
+            async with manager.getConnection() as conn: ...
+        The transaction is committed on exit, or rolled back if an exception was raised.
+        """
+        if not self._pool:
+            raise RuntimeError("Async connection pool is not initialized.")
+        return self._pool.connection()
+
+    async def boundToRequest(self, cur):
+        """Limit the rest of the transaction to the time left before the timeout of the current request, if any."""
+        timeout = GetStatementTimeout()
+        if timeout is not None:
+            await cur.execute(f"SET LOCAL statement_timeout = {timeout}")
+
+    @Timed("postgres")
+    async def executeQueryAsync(self, query: str, params: tuple = None) -> List[Dict]:
+        """
+        Execute a query that return results
+        Args:
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+        Returns:
+            List[Dict]: List of records as dictionaries
+        """
+        async with self.getConnection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await self.boundToRequest(cur)
+                await cur.execute(query, params)
+                return await cur.fetchall()
+
+    @Timed("postgres")
+    async def executeNonQueryAsync(self, query: str, params: tuple = None) -> int:
+        """
+        Execute an INSERT, UPDATE, or DELETE query and return number of affected rows
+        Args:
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+        Returns:
+            int: Number of rows affected
+        """
+        async with self.getConnection() as conn:
+            async with conn.cursor() as cur:
+                await self.boundToRequest(cur)
+                await cur.execute(query, params)
+                return cur.rowcount
+
+    @Timed("postgres")
+    async def executeTransactionAsync(self, queries: List[tuple]) -> bool:
+        """
+        Execute multiple queries in a transaction
+        Args:
+            queries: List of tuples containing (query, params)
+        Returns:
+            bool: True if transaction successful, False otherwise
+        """
+        try:
+            async with self.getConnection() as conn:
+                async with conn.transaction():
+                    async with conn.cursor() as cur:
+                        for query, params in queries:
+                            await cur.execute(query, params)
+            return True
+        except Exception as e:
+            logger.error(f"Transaction failed: {e}")
+            return False
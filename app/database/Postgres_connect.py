@@ -1,12 +1,155 @@
-from psycopg2.pool import SimpleConnectionPool
-from psycopg2.extras import RealDictCursor
-from app.config import POSTGRES_DB, POSTGRES_HOST, POSTGRES_PASSWORD, POSTGRES_USER
-from typing import List, Dict, Any
+import json
+import re
+import time
+import uuid
+from itertools import islice
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor, execute_batch, execute_values
+from app.config import (
+    POSTGRES_DB, POSTGRES_HOST, POSTGRES_PASSWORD, POSTGRES_USER, POSTGRES_CONNECT_TIMEOUT,
+    POSTGRES_POOL_ACQUIRE_TIMEOUT, POSTGRES_POOL_MAX_IDLE_TIME, POSTGRES_POOL_MAX_LIFETIME,
+    POSTGRES_POOL_VALIDATION_INTERVAL, POSTGRES_PREPARE_THRESHOLD, POSTGRES_PREPARED_CACHE_SIZE,
+    RESULT_CACHE_MAX_SIZE, RESULT_CACHE_DEFAULT_TTL, RESULT_CACHE_TTLS,
+)
+from app.database.Postgres_pool import BoundedConnectionPool
+from app.database.Postgres_prepared import ConnectionStatements, IsStalePreparedStatementError, PreparedStatementCache
+from typing import List, Dict, Any, Iterable, Iterator
 from app.utils.logging_setup import logger
+from app.utils.metrics import REGISTRY, Timed
+from app.utils.request_timeout import GetStatementTimeout
+from app.utils.result_cache import ResultCache
+from app.utils.slow_query import SLOW_QUERY_LOG, NormalizeSql, ParamShape
+
+class TransactionError(Exception):
+    """Raised by executeTransaction(raiseOnError=True) with the index and text of the failing statement."""
+
+    def __init__(self, index: int, query: str, error: Exception):
+        super().__init__(f"Transaction failed at statement {index}: {error}")
+        self.index = index
+        self.query = query
+        self.error = error
+
+def iterPages(items: Iterable, pageSize: int) -> Iterator[List]:
+    """Split an iterable into lists of at most pageSize items without materializing it."""
+    iterator = iter(items)
+    page = list(islice(iterator, pageSize))
+    while page:
+        yield page
+        page = list(islice(iterator, pageSize))
+
+def encodeCopyValue(value: Any) -> str:
+    """Encode a value in the COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+class CopyReader:
+    """
+    A read-only file-like object producing COPY text-format lines from an iterable of rows on demand,
+    so copy_expert can stream rows without the whole payload being built in memory.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self.rows = iter(rows)
+        self.buffer = b""
+        self.rowCount = 0
+
+    def encodeRow(self) -> bool:
+        """Append the next row to the buffer as a COPY line. Returns False once the rows are exhausted."""
+        row = next(self.rows, None)
+        if row is None:
+            return False
+        self.buffer += ("\t".join(map(encodeCopyValue, row)) + "\n").encode()
+        self.rowCount += 1
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            if not self.encodeRow():
+                break
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        """Return the next line (one row), or its first size bytes. copy_expert only calls read."""
+        while b"\n" not in self.buffer and (size < 0 or len(self.buffer) < size):
+            if not self.encodeRow():
+                break
+        end = self.buffer.find(b"\n") + 1 or len(self.buffer)
+        if size >= 0:
+            end = min(end, size)
+        data, self.buffer = self.buffer[:end], self.buffer[end:]
+        return data
+
+# Statements after which the prepared statements of every connection are dropped
+_SCHEMA_CHANGE_PATTERN = re.compile(r"^\s*(CREATE|ALTER|DROP)\b", re.IGNORECASE)
+_TABLE_NAME = r'((?:"[^"]+"|\w+)(?:\.(?:"[^"]+"|\w+))?)'
+# Tables read by a query, and tables written by a statement, for the result cache
+_READ_TABLES_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+(?:ONLY\s+)?" + _TABLE_NAME, re.IGNORECASE)
+_WRITE_TABLES_PATTERN = re.compile(
+    r"(?<!\bFOR\s)(?<!\bDO\s)\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|MERGE\s+INTO|TRUNCATE(?:\s+TABLE)?"
+    r"|ALTER\s+TABLE(?:\s+IF\s+EXISTS)?|DROP\s+TABLE(?:\s+IF\s+EXISTS)?)\s+(?:ONLY\s+)?" + _TABLE_NAME,
+    re.IGNORECASE
+)
+# Clauses ending a FROM list, a comma before them means the list has several tables
+_FROM_LIST_END_PATTERN = re.compile(
+    r"\b(?:WHERE|GROUP|ORDER|LIMIT|OFFSET|HAVING|WINDOW|UNION|INTERSECT|EXCEPT|FOR|FETCH|RETURNING|ON|USING|JOIN)\b",
+    re.IGNORECASE
+)
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# Statements whose plan can be captured with EXPLAIN
+_EXPLAINABLE_PATTERN = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|VALUES)\b", re.IGNORECASE)
+
+def normalizeTableName(name: str) -> str:
+    """Cache namespace of a table: its unquoted, lowercase name without schema."""
+    return name.split(".")[-1].strip('"').lower()
+
+def hasTopLevelComma(query: str, start: int) -> bool:
+    """Whether a comma follows position start before the end of its FROM list (or of its parenthesized subquery)."""
+    depth = 0
+    end = _FROM_LIST_END_PATTERN.search(query, start)
+    for char in query[start:end.start() if end else len(query)]:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                return False
+        elif char == "," and depth == 0:
+            return True
+    return False
+
+def findReadTables(query: str) -> List[str] | None:
+    """
+    Return the tables a query reads, from its FROM and JOIN clauses.
+    Returns None when the query cannot be parsed reliably (a FROM list of several tables, a data-modifying
+    statement): its tables must then be given explicitly.
+    """
+    query = _LITERAL_PATTERN.sub("''", query)
+    if _WRITE_TABLES_PATTERN.search(query):
+        return None
+    tables = []
+    for match in _READ_TABLES_PATTERN.finditer(query):
+        if hasTopLevelComma(query, match.end()):
+            return None
+        tables.append(match.group(1))
+    return tables
 
 class PostgresManager:
     _instance = None
-    _pool: SimpleConnectionPool = None
+    _pool: BoundedConnectionPool = None
+    _preparedCache = PreparedStatementCache(POSTGRES_PREPARED_CACHE_SIZE, POSTGRES_PREPARE_THRESHOLD)
+    _resultCache = ResultCache(RESULT_CACHE_MAX_SIZE, RESULT_CACHE_DEFAULT_TTL, RESULT_CACHE_TTLS)
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -16,14 +159,21 @@ class PostgresManager:
     def initializePool(self, minConn: int = 1, maxConn: int = 20):
         """
         Initialize the connection pool.
+        The pool is thread-safe: when all connections are in use, getConnection waits
+        (in FIFO order) up to POSTGRES_POOL_ACQUIRE_TIMEOUT seconds for one to be released.
         """
         if not self._pool:
-            self._pool = SimpleConnectionPool(
+            self._pool = BoundedConnectionPool(
                 minConn, maxConn,
+                acquireTimeout=POSTGRES_POOL_ACQUIRE_TIMEOUT,
+                maxIdleTime=POSTGRES_POOL_MAX_IDLE_TIME,
+                maxLifetime=POSTGRES_POOL_MAX_LIFETIME,
+                validationInterval=POSTGRES_POOL_VALIDATION_INTERVAL,
                 host=POSTGRES_HOST,
                 database=POSTGRES_DB,
                 user=POSTGRES_USER,
-                password=POSTGRES_PASSWORD
+                password=POSTGRES_PASSWORD,
+                connect_timeout=POSTGRES_CONNECT_TIMEOUT
             )
             logger.info("Database connection pool initialized.")
 
@@ -36,13 +186,16 @@ class PostgresManager:
             self._pool = None
             logger.info("Database connection pool closed.")
 
-    def getConnection(self):
+    @Timed("postgres")
+    def getConnection(self, timeout: float = None):
         """
-        Get a connection from the pool.
+        Get a connection from the pool, waiting up to timeout seconds (the configured
+        acquire timeout by default) if all connections are in use.
+        Raises PoolTimeoutError if no connection became available in time.
         """
         if not self._pool:
             raise RuntimeError("Connection pool is not initialized.")
-        return self._pool.getconn()
+        return self._pool.getconn(timeout)
 
     def releaseConnection(self, conn):
         """
@@ -51,6 +204,78 @@ class PostgresManager:
         if self._pool:
             self._pool.putconn(conn)
 
+    def ping(self):
+        """
+        Check that the database answers, on a pooled connection.
+        Raises the driver error if it does not.
+        """
+        conn = self.getConnection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        finally:
+            self.releaseConnection(conn)
+
+    def getPoolStats(self) -> Dict[str, Any]:
+        """
+        Return the pool state and counters (in-use count, wait times, exhaustion count, ...).
+        Returns an empty dict if the pool is not initialized.
+        """
+        return self._pool.getStats() if self._pool else {}
+
+    def getPreparedStats(self) -> Dict[str, Any]:
+        """
+        Return the prepared statement cache counters (hits, misses, prepared, evictions, invalidations, hitRatio).
+        """
+        return self._preparedCache.getStats()
+
+    def invalidatePreparedStatements(self):
+        """
+        Drop the prepared statements of every connection, e.g., after a schema change made outside this manager.
+        Each connection deallocates its statements on next use.
+        """
+        self._preparedCache.invalidate()
+
+    def boundToRequest(self, cur):
+        """
+        Limit the rest of the transaction to the time left before the timeout of the current request, if any.
+        A timed out request is only cancelled in asyncio: the query of a sync route must stop on its own.
+        """
+        timeout = GetStatementTimeout()
+        if timeout is not None:
+            cur.execute("SET LOCAL statement_timeout = %s", (timeout,))
+
+    def executePrepared(self, conn, cur, query: str, params: tuple = None):
+        """
+        Execute a query on a cursor of a pooled connection, through the connection's
+        prepared statement cache: a query run POSTGRES_PREPARE_THRESHOLD times on the
+        connection is prepared once, then executed without being parsed and planned again.
+        If the prepared statements are stale (deallocated, or a schema change altered a
+        result type), the connection's cache is dropped and the query is run again unprepared.
+        Within a request, the query is limited to the time left before the request timeout.
+        Args:
+            conn: Connection from getConnection, with no other statement in its transaction
+            cur: Cursor of conn
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+        """
+        info = self._pool.getConnectionInfo(conn)
+        if info.statements is None:
+            info.statements = ConnectionStatements(self._preparedCache.generation)
+        self.boundToRequest(cur)
+        try:
+            self._preparedCache.execute(cur, query, params, info.statements)
+        except Exception as e:
+            if not IsStalePreparedStatementError(e):
+                raise
+            logger.warning(f"Stale prepared statement, retrying unprepared: {e}")
+            conn.rollback()
+            self._preparedCache.reset(cur, info.statements)
+            self.boundToRequest(cur)
+            cur.execute(query, params)
+
+    @Timed("postgres")
     def executeQuery(self, query: str, params: tuple = None) -> List[Dict]:
         """
         Execute a query that return results
@@ -63,11 +288,100 @@ class PostgresManager:
         conn = self.getConnection()
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, params)
-                return cur.fetchall()
+                start = time.perf_counter()
+                self.executePrepared(conn, cur, query, params)
+                rows = cur.fetchall()
+                self.checkSlowQuery("executeQuery", query, params, time.perf_counter() - start)
+                return rows
         finally:
             self.releaseConnection(conn)
 
+    def checkSlowQuery(self, operation: str, query: str, params: tuple, duration: float):
+        """
+        Log the query if it is slower than SLOW_QUERY_THRESHOLD_MS, and capture its plan if SLOW_QUERY_EXPLAIN is set.
+        """
+        if SLOW_QUERY_LOG.isSlow(duration):
+            SLOW_QUERY_LOG.record(
+                "postgres", operation, NormalizeSql(query), ParamShape(params), duration,
+                (lambda: self.explainQuery(query, params)) if _EXPLAINABLE_PATTERN.match(query) else None
+            )
+
+    def explainQuery(self, query: str, params: tuple = None) -> str:
+        """
+        Return the EXPLAIN (ANALYZE, BUFFERS) plan of a query.
+        The query is run again, in a transaction that is rolled back, so writes are not applied.
+        Args:
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+        Returns:
+            str: The plan, one node per line
+        """
+        conn = self.getConnection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+                return "\n".join(row[0] for row in cur.fetchall())
+        finally:
+            conn.rollback()
+            self.releaseConnection(conn)
+
+    @Timed("postgres")
+    def executeQueryCached(self, query: str, params: tuple = None, tables: List[str] = None, ttl: float = None) -> List[Dict]:
+        """
+        Execute a query that return results, through the in-process result cache.
+        The result is cached per table read (TTL from RESULT_CACHE_TTLS, or ttl) and dropped when
+        one of the tables is written through this manager. Concurrent misses run the query once.
+        Invalidation is per process: other workers keep serving their cached result until its TTL.
+        The returned rows are shared with other callers and must not be mutated.
+        Args:
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+            tables: Tables the query reads, found in its FROM and JOIN clauses by default. Required when
+                they cannot be found reliably (FROM a, b, or a data-modifying query)
+            ttl: Seconds the result is cached, overriding the table TTL
+        Returns:
+            List[Dict]: List of records as dictionaries
+        Raises:
+            ValueError: if tables is not given and cannot be found in the query
+        """
+        if tables is None:
+            tables = findReadTables(query)
+            if tables is None:
+                raise ValueError(f"Cannot find the tables read by the query, give them explicitly: {query}")
+        key = (" ".join(query.split()), repr(params))
+        return self._resultCache.getOrLoad(
+            map(normalizeTableName, tables), key, lambda: self.executeQuery(query, params), ttl
+        )
+
+    def invalidateCache(self, table: str = None):
+        """
+        Drop the cached results reading a table, or every cached result if table is None.
+        Use it after writing a table outside this manager.
+        """
+        if table is None:
+            self._resultCache.clear()
+        else:
+            self._resultCache.invalidate(normalizeTableName(table))
+
+    def invalidateWrittenTable(self, query: str):
+        """
+        Drop the cached results reading the tables written by a statement, including the statements of its
+        WITH clause (every result if no written table is recognized).
+        """
+        tables = _WRITE_TABLES_PATTERN.findall(_LITERAL_PATTERN.sub("''", query))
+        if tables:
+            for table in tables:
+                self.invalidateCache(table)
+        elif not re.match(r"\s*SELECT\b", query, re.IGNORECASE):
+            self.invalidateCache()
+
+    def getCacheStats(self) -> Dict[str, Any]:
+        """
+        Return the result cache counters (size, hits, misses, hitRatio, evictions, ...).
+        """
+        return self._resultCache.getStats()
+
+    @Timed("postgres")
     def executeNonQuery(self, query: str, params: tuple = None) -> int:
         """
         Execute an INSERT, UPDATE, or DELETE query and return number of affected rows
@@ -80,34 +394,244 @@ class PostgresManager:
         conn = self.getConnection()
         try:
             with conn.cursor() as cur:
-                cur.execute(query, params)
+                start = time.perf_counter()
+                self.executePrepared(conn, cur, query, params)
                 conn.commit()
+                self.checkSlowQuery("executeNonQuery", query, params, time.perf_counter() - start)
+                self.invalidateWrittenTable(query)
+                if _SCHEMA_CHANGE_PATTERN.match(query):
+                    self.invalidatePreparedStatements()
                 return cur.rowcount
         finally:
             self.releaseConnection(conn)
 
-    def executeTransaction(self, queries: List[tuple]) -> bool:
+    @Timed("postgres")
+    def executeTransaction(self, queries: List[tuple], batchSize: int = 100, raiseOnError: bool = False) -> bool:
         """
         Execute multiple queries in a transaction
+        Statements are sent batchSize at a time in a single round-trip. If the transaction
+        fails, it is rolled back and replayed statement by statement (then rolled back again)
+        to find and log the failing statement.
         Args:
             queries: List of tuples containing (query, params)
+            batchSize: Number of statements sent per round-trip
+            raiseOnError: Raise a TransactionError with the failing statement instead of returning False
         Returns:
             bool: True if transaction successful, False otherwise
         """
         conn = self.getConnection()
+        try:
+            pageStart = 0
+            try:
+                with conn.cursor() as cur:
+                    for pageStart in range(0, len(queries), batchSize):
+                        cur.execute(self.joinStatements(cur, queries[pageStart:pageStart + batchSize]))
+                    conn.commit()
+                for query, _ in queries:
+                    self.invalidateWrittenTable(query)
+                return True
+            except Exception as e:
+                conn.rollback()
+                index, error = self.findFailingStatement(conn, queries, pageStart, batchSize)
+                index = pageStart if index is None else index
+                error = error or e
+                logger.error(f"Transaction failed at statement {index}: {queries[index][0]} | {error}")
+                if raiseOnError:
+                    raise TransactionError(index, queries[index][0], error) from e
+                return False
+        finally:
+            self.releaseConnection(conn)
+
+    def joinStatements(self, cur, queries: List[tuple]) -> bytes:
+        """Bind the parameters of each (query, params) and join the statements into one SQL string."""
+        return b";\n".join(cur.mogrify(query, params) for query, params in queries)
+
+    def findFailingStatement(self, conn, queries: List[tuple], pageStart: int, batchSize: int) -> tuple[int | None, Exception | None]:
+        """
+        Replay a failed transaction to find its failing statement, then roll it back.
+        The pages before the failing one are replayed in batches, the failing page one statement at a time.
+        Returns:
+            tuple: (index of the failing statement, its error), or (None, None) if the replay succeeded
+        """
         try:
             with conn.cursor() as cur:
-                for query, params in queries:
-                    cur.execute(query, params)
-                conn.commit()
-            return True
+                if pageStart:
+                    cur.execute(self.joinStatements(cur, queries[:pageStart]))
+                for index in range(pageStart, min(pageStart + batchSize, len(queries))):
+                    query, params = queries[index]
+                    try:
+                        cur.execute(query, params)
+                    except Exception as e:
+                        return index, e
+            return None, None
         except Exception as e:
+            return None, e
+        finally:
             conn.rollback()
-            print(f"Transaction failed: {e}")
-            return False
+
+    @Timed("postgres")
+    def executeMany(self, query: str, paramsList: Iterable[tuple], pageSize: int = 1000) -> int:
+        """
+        Execute a statement for many parameter tuples in a single transaction, pageSize tuples per round-trip.
+        An INSERT written with a single `VALUES %s` placeholder is sent as multi-row INSERTs
+        (e.g., "INSERT INTO example_table (name, age) VALUES %s"); any other statement is sent
+        as batches of statements.
+        Args:
+            query: SQL query string
+            paramsList: Iterable of query parameters, consumed page by page
+            pageSize: Number of parameter tuples sent per round-trip
+        Returns:
+            int: Number of rows affected for `VALUES %s` inserts, otherwise number of parameter tuples executed
+        """
+        isValuesInsert = re.search(r"\bVALUES\s+%s", query, re.IGNORECASE) is not None
+        conn = self.getConnection()
+        try:
+            total = 0
+            with conn.cursor() as cur:
+                for page in iterPages(paramsList, pageSize):
+                    if isValuesInsert:
+                        execute_values(cur, query, page, page_size=pageSize)
+                        total += cur.rowcount
+                    else:
+                        execute_batch(cur, query, page, page_size=pageSize)
+                        total += len(page)
+            conn.commit()
+            self.invalidateWrittenTable(query)
+            return total
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             self.releaseConnection(conn)
 
+    @Timed("postgres")
+    def copyFrom(self, table: str, rows: Iterable[tuple], columns: List[str] = None) -> int:
+        """
+        Bulk-load rows into a table with COPY ... FROM STDIN.
+        Rows are encoded lazily while Postgres reads them, so the full payload is never built in memory.
+        Args:
+            table: Table name, optionally schema-qualified (e.g., "public.events")
+            rows: Iterable of row tuples, in the order of columns
+            columns: Column names (all the table columns, in order, if None)
+        Returns:
+            int: Number of rows loaded
+        """
+        statement = sql.SQL("COPY {} {}FROM STDIN").format(
+            sql.Identifier(*table.split(".")),
+            sql.SQL("({}) ").format(sql.SQL(", ").join(map(sql.Identifier, columns))) if columns else sql.SQL(""),
+        )
+        reader = CopyReader(rows)
+        conn = self.getConnection()
+        try:
+            with conn.cursor() as cur:
+                cur.copy_expert(statement, reader)
+            conn.commit()
+            self.invalidateCache(table)
+            return reader.rowCount
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.releaseConnection(conn)
+
+    def iterChunks(self, query: str, params: tuple = None, itersize: int = 2000, cursorFactory=None, requestBound: bool = False) -> Iterator[tuple[List[str], List]]:
+        """
+        Run a query on a named server-side cursor and yield its rows chunk by chunk.
+        The connection is taken on the first iteration and released once the rows
+        are exhausted or the generator is closed.
+        Args:
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+            itersize: Number of rows fetched from the server per round-trip
+            cursorFactory: psycopg2 cursor factory of the rows (tuples by default)
+            requestBound: Limit the query to the time left before the request timeout (not for exports,
+                which outlive the start of their response)
+        Yields:
+            tuple: (column names, list of at most itersize rows)
+        """
+        conn = self.getConnection()
+        try:
+            if requestBound:
+                with conn.cursor() as cur:
+                    self.boundToRequest(cur)
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}", cursor_factory=cursorFactory) as cur:
+                cur.execute(query, params)
+                rows = cur.fetchmany(itersize)
+                columns = [column.name for column in cur.description] if cur.description else []
+                while rows:
+                    yield columns, rows
+                    rows = cur.fetchmany(itersize)
+        finally:
+            # A named cursor lives in a transaction: end it before handing the connection back
+            if not conn.closed:
+                conn.rollback()
+            self.releaseConnection(conn)
+
+    @Timed("postgres")
+    def streamQuery(self, query: str, params: tuple = None, itersize: int = 2000, rowFormat: str = "dict") -> Iterator:
+        """
+        Stream the results of a query without loading them all in memory.
+        Rows are fetched itersize at a time from a server-side cursor, so peak memory
+        is bounded by the chunk size. The connection goes back to the pool once the
+        stream is exhausted or closed.
+        Args:
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+            itersize: Number of rows fetched from the server per round-trip
+            rowFormat: "dict" (one dict per row), "tuple" (one tuple per row)
+                or "columns" (one {column: [values]} dict per chunk of itersize rows)
+        Yields:
+            Rows or column-oriented chunks
+        Raises:
+            ValueError: on the first iteration, if rowFormat is unknown
+        """
+        if rowFormat == "dict":
+            for _, rows in self.iterChunks(query, params, itersize, RealDictCursor):
+                yield from rows
+        elif rowFormat == "tuple":
+            for _, rows in self.iterChunks(query, params, itersize):
+                yield from rows
+        elif rowFormat == "columns":
+            for columns, rows in self.iterChunks(query, params, itersize):
+                yield dict(zip(columns, (list(values) for values in zip(*rows))))
+        else:
+            raise ValueError(f"Unknown rowFormat '{rowFormat}', expected 'dict', 'tuple' or 'columns'.")
+
+    @Timed("postgres")
+    def streamQueryLines(self, query: str, params: tuple = None, itersize: int = 2000) -> Iterator[bytes]:
+        """
+        Stream the results of a query as NDJSON bytes, one JSON object per row, encoded one chunk at a time.
+        Can be passed directly to a StreamingResponse:
+            StreamingResponse(dbManager.streamQueryLines(query), media_type="application/x-ndjson")
+        Values that are not JSON types (dates, decimals, ...) are encoded as strings.
+        Args:
+            query: SQL query string
+            params: Query parameters to prevent SQL injection
+            itersize: Number of rows fetched from the server per round-trip
+        Yields:
+            bytes: NDJSON lines of up to itersize rows
+        """
+        for columns, rows in self.iterChunks(query, params, itersize):
+            yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows).encode()
+
+def poolStatsByName(*names: str) -> Dict[tuple, float]:
+    """Read pool stats for a callback metric: {(name,): value}, empty if the pool is not initialized."""
+    stats = PostgresManager().getPoolStats()
+    return {(name,): stats[name] for name in names} if stats else {}
+
+REGISTRY.callback(
+    "postgres_pool_connections", "Postgres pool connections by state.", "gauge", ("state",),
+    lambda: poolStatsByName("size", "inUse", "idle", "waiting", "maxConn")
+)
+REGISTRY.callback(
+    "postgres_pool_events_total", "Postgres pool acquisitions, waits, exhaustions, timeouts and connection churn.", "counter", ("event",),
+    lambda: poolStatsByName("acquireCount", "waitCount", "exhaustedCount", "timeoutCount", "createdCount", "closedCount", "validationFailures")
+)
+REGISTRY.callback(
+    "postgres_pool_wait_seconds", "Time spent waiting for a pooled connection.", "gauge", ("stat",),
+    lambda: poolStatsByName("totalWaitTime", "maxWaitTime", "avgWaitTime")
+)
+
 # usage of class
 def main():
     # Initialize the PostgresManager instance
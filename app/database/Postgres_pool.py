@@ -0,0 +1,300 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+from app.utils.logging_setup import logger
+
+class PoolTimeoutError(PoolError):
+    """Raised when no connection became available within the acquire timeout."""
+
+class PooledConnectionInfo:
+    """Bookkeeping of one pooled connection."""
+    __slots__ = ("createdAt", "lastUsedAt", "statements")
+
+    def __init__(self, now: float):
+        self.createdAt = now
+        self.lastUsedAt = now
+        self.statements = None # Session state owned by the connection user, e.g. prepared statements
+
+class PoolWaiter:
+    """A thread queued for a connection. It is handed either a connection or the right to open one."""
+    __slots__ = ("event", "conn", "info", "mayCreate")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.conn = None
+        self.info = None
+        self.mayCreate = False
+
+class BoundedConnectionPool:
+    """
+    A thread-safe psycopg2 connection pool with bounded waiting.
+    - getconn blocks until a connection is free, up to a timeout, instead of raising at once.
+    - Waiting threads are served in FIFO order: a released connection is handed to the oldest waiter.
+    - Connections idle for longer than maxIdleTime (above minConn) or older than maxLifetime are closed.
+    - A connection idle for longer than validationInterval is pinged before being handed out.
+    - getStats reports wait times, in-use count and exhaustion count.
+    """
+
+    def __init__(
+        self,
+        minConn: int,
+        maxConn: int,
+        acquireTimeout: float = 10.0,
+        maxIdleTime: float = 300.0,
+        maxLifetime: float = 3600.0,
+        validationInterval: float = 30.0,
+        connect: Callable[..., Any] = None,
+        **connectKwargs
+    ):
+        """
+        Open minConn connections.
+        Input:
+            minConn, maxConn (int): number of connections kept open / allowed.
+            acquireTimeout (float): default number of seconds getconn waits for a connection.
+            maxIdleTime (float): seconds after which an idle connection above minConn is closed.
+            maxLifetime (float): seconds after which a connection is closed and replaced.
+            validationInterval (float): idle seconds after which a connection is pinged on checkout.
+            connect (callable): connection factory, psycopg2.connect by default.
+            connectKwargs: arguments of the connection factory.
+        """
+        if not (0 <= minConn <= maxConn) or maxConn < 1:
+            raise ValueError("The pool size must satisfy 0 <= minConn <= maxConn and maxConn >= 1.")
+        if connect is None:
+            import psycopg2
+            connect = psycopg2.connect
+        self.minConn = minConn
+        self.maxConn = maxConn
+        self.acquireTimeout = acquireTimeout
+        self.maxIdleTime = maxIdleTime
+        self.maxLifetime = maxLifetime
+        self.validationInterval = validationInterval
+        self.closed = False
+        self._connect = connect
+        self._connectKwargs = connectKwargs
+        self._lock = threading.Lock()
+        self._idle = deque() # (conn, info), most recently used on the right
+        self._inUse = {} # id(conn) -> info
+        self._waiters = deque()
+        self._size = 0 # Open connections plus connections being opened
+        self._stats = {
+            "acquireCount": 0,
+            "waitCount": 0,
+            "exhaustedCount": 0,
+            "timeoutCount": 0,
+            "totalWaitTime": 0.0,
+            "maxWaitTime": 0.0,
+            "createdCount": 0,
+            "closedCount": 0,
+            "validationFailures": 0,
+        }
+
+        for _ in range(minConn):
+            conn, info = self._open()
+            self._idle.append((conn, info))
+            self._size += 1
+
+    def _open(self):
+        """Open a new connection (outside the lock)."""
+        conn = self._connect(**self._connectKwargs)
+        with self._lock:
+            self._stats["createdCount"] += 1
+        return conn, PooledConnectionInfo(time.monotonic())
+
+    def _close(self, conn):
+        """Close a connection (outside the lock), ignoring errors."""
+        try:
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled connection: {e}")
+        with self._lock:
+            self._stats["closedCount"] += 1
+
+    def _isExpired(self, info: PooledConnectionInfo, now: float) -> bool:
+        return now - info.createdAt > self.maxLifetime
+
+    def _isValid(self, conn, info: PooledConnectionInfo, now: float) -> bool:
+        """Check a connection before handing it out (outside the lock)."""
+        if conn.closed:
+            return False
+        if now - info.lastUsedAt <= self.validationInterval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reapIdle(self, now: float) -> list:
+        """Remove idle connections past their idle time or lifetime (under the lock). Return them to close."""
+        reaped = []
+        while self._idle and self._size > self.minConn:
+            conn, info = self._idle[0]
+            if now - info.lastUsedAt <= self.maxIdleTime and not self._isExpired(info, now):
+                break
+            self._idle.popleft()
+            self._size -= 1
+            reaped.append(conn)
+        return reaped
+
+    def _releaseSlot(self):
+        """A connection slot was freed (under the lock): let the oldest waiter open a connection in it."""
+        self._size -= 1
+        if self._waiters and self._size < self.maxConn and not self.closed:
+            nextWaiter = self._waiters.popleft()
+            nextWaiter.mayCreate = True
+            self._size += 1
+            nextWaiter.event.set()
+
+    def getconn(self, timeout: float = None):
+        """
+        Get a connection, waiting up to timeout seconds (acquireTimeout by default) if all are in use.
+        Raise PoolTimeoutError if none became available in time.
+        """
+        timeout = self.acquireTimeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        while True:
+            toClose = []
+            conn = info = queued = None
+            mayCreate = False
+            with self._lock:
+                if self.closed:
+                    raise PoolError("connection pool is closed")
+                now = time.monotonic()
+                toClose = self._reapIdle(now)
+                while self._idle:
+                    candidate, candidateInfo = self._idle.pop()
+                    if self._isExpired(candidateInfo, now):
+                        self._size -= 1
+                        toClose.append(candidate)
+                        continue
+                    conn, info = candidate, candidateInfo
+                    break
+                if conn is None:
+                    if self._size < self.maxConn:
+                        self._size += 1
+                        mayCreate = True
+                    else:
+                        queued = PoolWaiter()
+                        self._waiters.append(queued)
+                        if not waited:
+                            self._stats["exhaustedCount"] += 1
+            for stale in toClose:
+                self._close(stale)
+
+            if queued is not None:
+                waited = True
+                queued.event.wait(max(0.0, deadline - time.monotonic()))
+                with self._lock:
+                    if queued.conn is None and not queued.mayCreate:
+                        if self.closed:
+                            raise PoolError("connection pool is closed")
+                        self._waiters.remove(queued)
+                        self._stats["timeoutCount"] += 1
+                        raise PoolTimeoutError(f"No connection available within {timeout} seconds.")
+                conn, info, mayCreate = queued.conn, queued.info, queued.mayCreate
+
+            if mayCreate:
+                try:
+                    conn, info = self._open()
+                except Exception:
+                    with self._lock:
+                        self._releaseSlot()
+                    raise
+            elif not self._isValid(conn, info, time.monotonic()):
+                with self._lock:
+                    self._stats["validationFailures"] += 1
+                    self._releaseSlot()
+                self._close(conn)
+                continue
+
+            with self._lock:
+                waitTime = time.monotonic() - start
+                self._inUse[id(conn)] = info
+                self._stats["acquireCount"] += 1
+                if waited:
+                    self._stats["waitCount"] += 1
+                    self._stats["totalWaitTime"] += waitTime
+                    self._stats["maxWaitTime"] = max(self._stats["maxWaitTime"], waitTime)
+            return conn
+
+    def putconn(self, conn, close: bool = False):
+        """
+        Return a connection to the pool, rolling back any open transaction.
+        The connection is closed instead if close is True, it is broken or past its lifetime.
+        """
+        if not close and not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+
+        with self._lock:
+            info = self._inUse.pop(id(conn), None)
+            if info is None:
+                raise PoolError("trying to put unkeyed connection")
+            now = time.monotonic()
+            toClose = self._reapIdle(now)
+            if close or conn.closed or self.closed or self._isExpired(info, now):
+                toClose.append(conn)
+                self._releaseSlot()
+            else:
+                info.lastUsedAt = now
+                if self._waiters:
+                    nextWaiter = self._waiters.popleft()
+                    nextWaiter.conn, nextWaiter.info = conn, info
+                    nextWaiter.event.set()
+                else:
+                    self._idle.append((conn, info))
+        for stale in toClose:
+            self._close(stale)
+
+    def closeall(self):
+        """Close the idle connections and the pool. In-use connections are closed when they are returned."""
+        with self._lock:
+            self.closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        for queued in waiters:
+            queued.event.set() # Wakes up with neither a connection nor a slot: raises PoolError
+        for conn in idle:
+            self._close(conn)
+
+    def getConnectionInfo(self, conn) -> PooledConnectionInfo:
+        """Return the bookkeeping of an in-use connection. It is discarded with the connection."""
+        with self._lock:
+            info = self._inUse.get(id(conn))
+        if info is None:
+            raise PoolError("trying to use unkeyed connection")
+        return info
+
+    def getStats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the pool state and counters.
+        Output: dict with size, inUse, idle, waiting, maxConn, acquireCount, waitCount, exhaustedCount,
+        timeoutCount, totalWaitTime, maxWaitTime, avgWaitTime, createdCount, closedCount and validationFailures.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size,
+                "inUse": len(self._inUse),
+                "idle": len(self._idle),
+                "waiting": len(self._waiters),
+                "maxConn": self.maxConn,
+            })
+        stats["avgWaitTime"] = stats["totalWaitTime"] / stats["waitCount"] if stats["waitCount"] else 0.0
+        return stats
@@ -0,0 +1,192 @@
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict
+import psycopg2
+from psycopg2 import errors
+from app.utils.logging_setup import logger
+
+# Statements that PREPARE accepts
+_PREPARABLE_KEYWORDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "VALUES"}
+_PLACEHOLDER_PATTERN = re.compile(r"%%|%s|%")
+# Parameters bound as one PREPARE parameter each; tuples, lists, dicts and adapters expand to SQL syntax
+_SCALAR_TYPES = (type(None), bool, int, float, Decimal, str, bytes, memoryview, date, datetime, time, timedelta, uuid.UUID)
+
+class PreparedStatement:
+    """A query seen on one connection, prepared once it is hot."""
+    __slots__ = ("useCount", "name", "executeSql", "preparable")
+
+    def __init__(self):
+        self.useCount = 0
+        self.name = None
+        self.executeSql = None
+        self.preparable = True # False once its PREPARE failed: it then always runs unprepared
+
+class ConnectionStatements:
+    """The prepared statements of one connection, least recently used first."""
+    __slots__ = ("generation", "entries", "nextId")
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.entries = OrderedDict() # query text -> PreparedStatement
+        self.nextId = 0
+
+def toPreparedSql(query: str, params) -> tuple[str, int] | None:
+    """
+    Convert a query with %s placeholders to PREPARE syntax ($1, $2, ...).
+    Output: (converted query, number of parameters), or None if the query cannot be prepared
+    (sql.Composed queries, named placeholders, non-scalar parameters such as the tuple of an
+    "IN %s", several statements, utility statements, ...).
+    """
+    if not isinstance(query, str):
+        return None
+    if params is not None:
+        if not isinstance(params, (tuple, list)) or not all(isinstance(param, _SCALAR_TYPES) for param in params):
+            return None
+    text = query.strip().rstrip(";").strip()
+    if not text or ";" in text or text.split(None, 1)[0].upper() not in _PREPARABLE_KEYWORDS:
+        return None
+
+    count = 0
+    parts = []
+    position = 0
+    if params is not None:
+        for match in _PLACEHOLDER_PATTERN.finditer(text):
+            token = match.group()
+            if token == "%":
+                return None
+            count += token == "%s"
+            parts.append(text[position:match.start()])
+            parts.append(f"${count}" if token == "%s" else "%")
+            position = match.end()
+        if count != len(params):
+            return None
+    parts.append(text[position:])
+    return "".join(parts), count
+
+class PreparedStatementCache:
+    """
+    Per-connection LRU cache of server-side prepared statements, keyed by query text.
+    A query is prepared (PREPARE) the threshold-th time it runs on a connection, and
+    then runs with EXECUTE, so Postgres does not parse and plan it again. The per-connection
+    state lives with the pooled connection, so it disappears when the connection is recycled.
+    invalidate() makes every connection drop its statements (DEALLOCATE ALL) on next use,
+    e.g., after a schema change.
+    """
+
+    def __init__(self, maxSize: int = 100, threshold: int = 5):
+        """
+        Input:
+            maxSize (int): number of queries tracked per connection.
+            threshold (int): number of runs of a query on a connection before it is prepared, 0 disables.
+        """
+        self.maxSize = maxSize
+        self.threshold = threshold
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "prepared": 0, "failures": 0, "evictions": 0, "invalidations": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def invalidate(self):
+        """Drop the prepared statements of every connection (lazily, on their next use)."""
+        with self._lock:
+            self.generation += 1
+            self._stats["invalidations"] += 1
+        logger.info("Prepared statement cache invalidated.")
+
+    def reset(self, cur, statements: ConnectionStatements):
+        """Drop the prepared statements of one connection."""
+        cur.execute("DEALLOCATE ALL")
+        statements.entries.clear()
+        statements.generation = self.generation
+
+    def execute(self, cur, query: str, params, statements: ConnectionStatements):
+        """
+        Execute a query on a cursor, through a prepared statement when the query is hot.
+        Input:
+            cur: cursor of the connection owning the statements.
+            query, params: SQL query string with %s placeholders and its parameters.
+            statements: ConnectionStatements of the cursor's connection.
+        """
+        if self.threshold <= 0:
+            cur.execute(query, params)
+            return
+        if statements.generation != self.generation:
+            self.reset(cur, statements)
+
+        entry = statements.entries.get(query)
+        if entry is not None and entry.name is not None:
+            statements.entries.move_to_end(query)
+            self._count("hits")
+            cur.execute(entry.executeSql, params)
+            return
+
+        self._count("misses")
+        if entry is None:
+            entry = statements.entries[query] = PreparedStatement()
+            if len(statements.entries) > self.maxSize:
+                _, evicted = statements.entries.popitem(last=False)
+                if evicted.name is not None:
+                    cur.execute(f"DEALLOCATE {evicted.name}")
+                self._count("evictions")
+        statements.entries.move_to_end(query)
+        entry.useCount += 1
+
+        prepared = toPreparedSql(query, params) if entry.preparable and entry.useCount >= self.threshold else None
+        if prepared is None:
+            cur.execute(query, params)
+            return
+        preparedSql, paramCount = prepared
+        name = f"ps_{statements.nextId}"
+        statements.nextId += 1
+        if not self.prepare(cur, name, preparedSql):
+            entry.preparable = False
+            cur.execute(query, params)
+            return
+        entry.name = name
+        entry.executeSql = f"EXECUTE {name}" + (f" ({', '.join(['%s'] * paramCount)})" if paramCount else "")
+        self._count("prepared")
+        cur.execute(entry.executeSql, params)
+
+    def prepare(self, cur, name: str, preparedSql: str) -> bool:
+        """
+        PREPARE a statement in a savepoint, so that a failure does not abort the caller's transaction.
+        Output: True if the statement was prepared.
+        """
+        autocommit = cur.connection.autocommit
+        if not autocommit:
+            cur.execute("SAVEPOINT prepare_statement")
+        try:
+            cur.execute(f"PREPARE {name} AS {preparedSql}")
+        except psycopg2.Error as e:
+            if not autocommit:
+                cur.execute("ROLLBACK TO SAVEPOINT prepare_statement")
+            self._count("failures")
+            logger.warning(f"Could not prepare the statement, it runs unprepared: {str(e).strip()}")
+            return False
+        if not autocommit:
+            cur.execute("RELEASE SAVEPOINT prepare_statement")
+        return True
+
+    def getStats(self) -> Dict[str, Any]:
+        """Return the hit, miss, prepared, failure, eviction and invalidation counters and the hit ratio."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRatio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+def IsStalePreparedStatementError(error: Exception) -> bool:
+    """
+    Check if an error means the prepared statements of a connection are out of date:
+    the statement was deallocated, or the schema changed its result type.
+    """
+    if isinstance(error, errors.InvalidSqlStatementName):
+        return True
+    return isinstance(error, errors.FeatureNotSupported) and "cached plan" in str(error)
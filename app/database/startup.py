@@ -0,0 +1,74 @@
+"""
+Warm-up and shutdown of the database backends.
+The drivers (psycopg2, psycopg, pymongo, motor) are imported by the first warm-up, not when the
+application is imported, so that they load concurrently, in the warm-up threads.
+"""
+import asyncio
+import sys
+from app.config import MONGO_WRITE_BUFFER_ENABLED, POSTGRES_POOL_MIN_CONN, POSTGRES_POOL_MAX_CONN
+from app.utils.logging_setup import logger
+
+def warmPostgres():
+    """Open the minConn connections of the sync pool and ping the database (blocking)."""
+    from app.database.Postgres_connect import PostgresManager
+    manager = PostgresManager()
+    manager.initializePool(minConn=POSTGRES_POOL_MIN_CONN, maxConn=POSTGRES_POOL_MAX_CONN)
+    manager.ping()
+
+async def WarmPostgres():
+    await asyncio.to_thread(warmPostgres)
+
+async def WarmAsyncPostgres():
+    """Open the minConn connections of the async pool and ping the database."""
+    module = await asyncio.to_thread(__import__, "app.database.Postgres_async_connect", fromlist=["AsyncPostgresManager"])
+    manager = module.AsyncPostgresManager()
+    await manager.initializePool(minConn=POSTGRES_POOL_MIN_CONN, maxConn=POSTGRES_POOL_MAX_CONN)
+    await manager.ping()
+
+def warmMongo():
+    """Create the client (and the write buffer if enabled), then ping the server (blocking)."""
+    from app.database.MongoDB_connect import MongoDBManager
+    manager = MongoDBManager()
+    manager.connect()
+    if MONGO_WRITE_BUFFER_ENABLED:
+        manager.enableWriteBuffer()
+    manager.ping()
+
+async def WarmMongo():
+    await asyncio.to_thread(warmMongo)
+
+async def WarmAsyncMongo():
+    """Create the async client, then ping the server."""
+    module = await asyncio.to_thread(__import__, "app.database.MongoDB_async_connect", fromlist=["AsyncMongoDBManager"])
+    manager = module.AsyncMongoDBManager()
+    await manager.connect()
+    await manager.ping()
+
+BACKENDS = {
+    "postgres": WarmPostgres,
+    "postgres_async": WarmAsyncPostgres,
+    "mongodb": WarmMongo,
+    "mongodb_async": WarmAsyncMongo,
+}
+
+async def CloseBackends():
+    """
+    Flush and close every backend that was loaded. A backend whose driver was never imported is skipped,
+    and a failing close does not prevent the others from closing.
+    """
+    async def close(moduleName: str, className: str, method: str):
+        module = sys.modules.get(moduleName)
+        if module is None:
+            return
+        try:
+            result = getattr(getattr(module, className)(), method)()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error("Could not %s %s: %s", method, className, e)
+
+    await close("app.database.Postgres_connect", "PostgresManager", "closePool")
+    await close("app.database.Postgres_async_connect", "AsyncPostgresManager", "closePool")
+    await close("app.database.MongoDB_connect", "MongoDBManager", "flushWrites")
+    await close("app.database.MongoDB_connect", "MongoDBManager", "disconnect")
+    await close("app.database.MongoDB_async_connect", "AsyncMongoDBManager", "disconnect")
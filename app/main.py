@@ -1,45 +1,96 @@
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-import uvicorn
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from contextlib import asynccontextmanager
 from .routers.day2timestamp import router as day2timestamp_router
+from .routers.day2timestamp_stream import router as day2timestamp_stream_router
+from .routers.aggregations import router as aggregations_router
 from .utils.logging_setup import GetLogger
-from app.database.MongoDB_connect import MongoDBManager
-from app.database.Postgres_connect import PostgresManager
+from .utils.calendar_index import GetCalendarIndex
+from .utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware
+from .utils.readiness import READINESS
+from .utils.request_timeout import RequestTimeoutMiddleware
+from .utils.admission import AdmissionMiddleware
+from .utils.cpu_affinity import PinWorkerToCpu
+from .services.rollup import RunRollupJob
+from .config import (
+    DEFAULT_TIMEZONE, STARTUP_TIMEOUT, STARTUP_REQUIRED_BACKENDS, STARTUP_RETRY_INTERVAL, SERVER_REQUEST_TIMEOUT,
+    ADMISSION_ROUTES, ADMISSION_POOL_MAX_WAITING, ADMISSION_POOL_MAX_WAIT_TIME, ADMISSION_RETRY_AFTER_MAX,
+    ROLLUP_SOURCES, ROLLUP_INTERVAL,
+)
+from app.database.startup import BACKENDS, CloseBackends
 
 logger = GetLogger()
 
 async def lifespan(app: FastAPI):
     # define the startup tasks
     logger.info("Application startup")
-    logger.info("Start connecting to Postgres")
-    PostgresDB = PostgresManager()
-    PostgresDB.initializePool(minConn= 1, maxConn=20)
-    logger.info("Start connecting to MongoDB")
-    MongoDB = MongoDBManager()
-    MongoDB.connect()
+    PinWorkerToCpu() # Only when started by app.server with SERVER_CPU_AFFINITY
+    # The calendar index is built while the backends connect, each backend within STARTUP_TIMEOUT:
+    # a slow or down optional backend does not delay the startup (degraded mode, see /ready)
+    for name, warmUp in BACKENDS.items():
+        READINESS.register(name, warmUp, required=name in STARTUP_REQUIRED_BACKENDS)
+    await asyncio.gather(
+        asyncio.to_thread(GetCalendarIndex, DEFAULT_TIMEZONE),
+        READINESS.warmUp(STARTUP_TIMEOUT)
+    )
+    reconnect = asyncio.create_task(READINESS.reconnect(STARTUP_RETRY_INTERVAL, STARTUP_TIMEOUT))
+    # Every worker runs the job: an advisory lock lets one of them refresh a source at a time
+    rollupJob = asyncio.create_task(RunRollupJob(ROLLUP_INTERVAL)) if ROLLUP_SOURCES and ROLLUP_INTERVAL else None
     yield
     # define shutdown tasks
     logger.info("Application shutdown")
-    PostgresDB.closePool()
-    MongoDB.disconnect()
+    reconnect.cancel()
+    if rollupJob:
+        rollupJob.cancel()
+    READINESS.cancel()
+    await CloseBackends()
 
 
-app = FastAPI(lifespan=lifespan)
+# orjson encodes the responses several times faster than the standard json module
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(RequestTimeoutMiddleware, timeout=SERVER_REQUEST_TIMEOUT)
+# Requests shed by admission control never reach the threadpool, and their queue wait is not part of the request timeout
+app.add_middleware(
+    AdmissionMiddleware,
+    routes=ADMISSION_ROUTES,
+    poolMaxWaiting=ADMISSION_POOL_MAX_WAITING,
+    poolMaxWaitTime=ADMISSION_POOL_MAX_WAIT_TIME,
+    retryAfterMax=ADMISSION_RETRY_AFTER_MAX
+)
+app.add_middleware(MetricsMiddleware) # Outermost, so that timed out requests are recorded
 
 
 app.include_router(day2timestamp_router, prefix="/day2timestamp", tags=["Day2Timestamp"])
+app.include_router(day2timestamp_stream_router, prefix="/day2timestamp", tags=["Day2Timestamp"])
+app.include_router(aggregations_router, prefix="/aggregations", tags=["Aggregations"])
+
+@app.get("/metrics", include_in_schema=False)
+def GetMetrics():
+    """Request, database, pool and conversion metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/ready", include_in_schema=False)
+def GetReadiness():
+    """
+    Readiness probe: 200 once started while every required backend is up ("ready", or "degraded" if an
+    optional backend is down), 503 otherwise. The body details the state of each backend.
+    """
+    return JSONResponse(READINESS.getStatus(), status_code=200 if READINESS.isReady() else 503)
 
 # Custom handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Validation error: {exc.errors()} | Body: {await request.body()}")
+    logger.error("Validation error: %s | Body: %s", exc.errors(), await request.body())
     return JSONResponse(
         status_code=422,
-        content={"detail": exc.errors(), "body": exc.body if hasattr(exc, 'body') else None},
+        content={"detail": jsonable_encoder(exc.errors()), "body": exc.body if hasattr(exc, 'body') else None},
     )
 
 
 if __name__ == "__main__":
+    # Development server (one process, reloaded on changes): use python -m app.server in production
+    import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
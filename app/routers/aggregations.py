@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from .schemas import AggregationRequest, AggregationResponse
+from ..config import DEFAULT_TIMEZONE
+from ..services.rollup import GetRollupSource, QueryRollup
+from ..utils.convert_day import GetMonthRange, GetYearRange
+from ..utils.encoding import EncodeResponse
+from ..utils.logging_setup import GetLogger
+
+router = APIRouter()
+logger = GetLogger()
+
+@router.post("/series", response_model=AggregationResponse)
+def GetAggregationSeries(body: AggregationRequest, request: Request) -> Response:
+    """
+    Count the rows of a source and sum their values per day, month or year over a time window.
+    Whole buckets are read from the rollups maintained by the background job; only the rows not rolled
+    up yet and the partial buckets at the edges of a timestamp window are scanned. Buckets are local
+    to the configured timezone.
+
+    Example request body:
+        {
+          "source": "events",
+          "granularity": "month",
+          "year": 2025
+        }
+    "month" narrows the window to one month of the year. Instead of a year, "startTimestamp" and
+    "endTimestamp" (exclusive) give any window. The response is JSON or MessagePack depending on the
+    Accept header (see app.utils.encoding).
+    """
+    source = GetRollupSource(body.source)
+    if source is None:
+        err = f"Invalid input: Unknown aggregation source '{body.source}'."
+        logger.error("Error aggregating: %s", err)
+        return EncodeResponse(request, AggregationResponse(error=err).model_dump())
+
+    if body.year is None:
+        start, end = body.startTimestamp, body.endTimestamp
+    else:
+        if body.month is None:
+            start, end, err = GetYearRange(body.year, DEFAULT_TIMEZONE)
+        else:
+            start, end, err = GetMonthRange(body.month, body.year, DEFAULT_TIMEZONE)
+        if err:
+            logger.error("Error aggregating: %s", err)
+            return EncodeResponse(request, AggregationResponse(error=err).model_dump())
+        end += 1 # The ranges end on the last second of the window
+
+    try:
+        result = QueryRollup(source, body.granularity, start, end, DEFAULT_TIMEZONE)
+    except Exception as e:
+        logger.error("Error aggregating %s: %s", source.name, e)
+        return EncodeResponse(request, AggregationResponse(error=f"Could not aggregate '{source.name}'.").model_dump())
+    logger.info(
+        "Successfully aggregated %s into %d %s buckets (%d rows scanned)",
+        source.name, len(result["bucketStarts"]), body.granularity, result["scannedRows"]
+    )
+    return EncodeResponse(request, AggregationResponse(
+        **result,
+        totalCount=sum(result["counts"]),
+        totalSum=sum(result["sums"]),
+        startTimestamp=start,
+        endTimestamp=end
+    ).model_dump())
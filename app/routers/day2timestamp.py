@@ -1,13 +1,48 @@
-from fastapi import APIRouter
-from .schemas import DayMonthYearRequest, TimestampResponse
-from ..utils.convert_day import ConvertDayToTimestamp
+from typing import Annotated
+import numpy as np
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import Response
+from .schemas import (
+    DayMonthYearRequest, TimestampResponse, DayMonthYearBatchRequest, TimestampBatchResponse,
+    TimestampBucketRequest, TimestampBucketResponse, TimestampRequest, DayMonthYearResponse,
+    TimestampBatchRequest, DayMonthYearBatchResponse,
+)
+from ..config import CONVERSION_CACHE_MAX_AGE, CONVERSION_CACHE_SIZE
+from ..utils.calendar_index import GetCalendarIndexFor
+from ..utils.convert_day import (
+    CONVERSION_CACHES, ConvertDayToTimestamp, ConvertDaysToTimestamps, ConvertTimestampToDay, ConvertTimestampsToDays, getZone, timezoneError,
+)
+from ..utils.encoding import EncodeResponse, NullableArray
+from ..utils.http_cache import CacheableResponse, ComputeETag
 from ..utils.logging_setup import GetLogger
+from ..utils.result_cache import MemoCache
 
 router = APIRouter()
 logger = GetLogger()
 
+# Serialized /timestamp responses and their ETag: a hit skips the conversion, the serialization and the log
+TIMESTAMP_RESPONSE_CACHE = MemoCache("timestampResponse", CONVERSION_CACHE_SIZE)
+CONVERSION_CACHES.append(TIMESTAMP_RESPONSE_CACHE)
+
+def convertDay(body: DayMonthYearRequest) -> tuple[bytes, str]:
+    """Return the JSON TimestampResponse of a date and its ETag, memoized when the conversion succeeds."""
+    key = (body.day, body.month, body.year, body.tz)
+    result = TIMESTAMP_RESPONSE_CACHE.get(key)
+    if result is not None:
+        return result
+    timestamp, err = ConvertDayToTimestamp(body.day, body.month, body.year, body.tz)
+    if err:
+        logger.error("Error converting date: %s", err)
+        response = TimestampResponse(error=err).model_dump_json().encode()
+        return response, ComputeETag(response)
+    logger.info("Successfully converted to timestamp=%s", timestamp)
+    response = TimestampResponse(timestamp=timestamp).model_dump_json().encode()
+    result = (response, ComputeETag(response))
+    TIMESTAMP_RESPONSE_CACHE.put(key, result)
+    return result
+
 @router.post("/timestamp", response_model=TimestampResponse)
-def GetTimestamp(body: DayMonthYearRequest) -> TimestampResponse:
+def GetTimestamp(body: DayMonthYearRequest, request: Request) -> Response:
     """
     Return the unix timestamp for given day, month, year.
 
@@ -15,12 +50,133 @@ def GetTimestamp(body: DayMonthYearRequest) -> TimestampResponse:
         {
           "day": 15,
           "month": 1,
-          "year": 2025
+          "year": 2025,
+          "tz": "Asia/Ho_Chi_Minh"
         }
+    The "tz" field is optional and defaults to the configured timezone.
+    The response has an ETag and a Cache-Control header: the result only depends on the input.
+    """
+    response, etag = convertDay(body)
+    return CacheableResponse(request, response, CONVERSION_CACHE_MAX_AGE, etag=etag)
+
+@router.get("/timestamp", response_model=TimestampResponse)
+def GetTimestampByQuery(query: Annotated[DayMonthYearRequest, Query()], request: Request) -> Response:
     """
-    timestamp, err = ConvertDayToTimestamp(body.day, body.month, body.year)
+    Same as POST /timestamp with the input in the query string, e.g. ?day=15&month=1&year=2025&tz=UTC,
+    so that CDNs and clients can cache the response. A request whose If-None-Match header holds the
+    ETag of the response gets a 304.
+    """
+    response, etag = convertDay(query)
+    return CacheableResponse(request, response, CONVERSION_CACHE_MAX_AGE, etag=etag)
+
+@router.post("/timestamps", response_model=TimestampBatchResponse)
+def GetTimestamps(body: DayMonthYearBatchRequest, request: Request) -> Response:
+    """
+    Return the unix timestamps for arrays of day, month, year.
+    Items are converted independently: an invalid item gets a null timestamp
+    and an error message at the same index, the others are still converted.
+    The response is JSON, MessagePack or raw int64 depending on the Accept header (see app.utils.encoding).
+
+    Example request body:
+        {
+          "days": [15, 30],
+          "months": [1, 2],
+          "years": [2025, 2025],
+          "tz": "UTC"
+        }
+    """
+    timestamps, errors = ConvertDaysToTimestamps(body.days, body.months, body.years, body.tz)
+    valid = np.fromiter((err is None for err in errors), dtype=bool, count=len(errors))
+    errorCount = len(errors) - int(valid.sum())
+    if errorCount:
+        logger.error("Error converting %d of %d dates", errorCount, len(errors))
+    logger.info("Successfully converted batch of %d dates", len(errors) - errorCount)
+    return EncodeResponse(
+        request, {"timestamps": NullableArray(timestamps, valid), "errors": errors}, int64Fields=("timestamps",)
+    )
+
+
+@router.post("/date", response_model=DayMonthYearResponse)
+def GetDate(body: TimestampRequest) -> DayMonthYearResponse:
+    """
+    Return the day, month, year that a unix timestamp falls on.
+
+    Example request body:
+        {
+          "timestamp": 1736899200,
+          "tz": "Asia/Ho_Chi_Minh"
+        }
+    The "tz" field is optional and defaults to the configured timezone.
+    """
+    day, month, year, err = ConvertTimestampToDay(body.timestamp, body.tz)
     if err:
-        logger.error(f"Error converting date: {err}")
-        return TimestampResponse(error=err)
-    logger.info(f"Successfully converted to timestamp={timestamp}")
-    return TimestampResponse(timestamp=timestamp)
\ No newline at end of file
+        logger.error("Error converting timestamp: %s", err)
+        return DayMonthYearResponse(error=err)
+    logger.info("Successfully converted to date=%s/%s/%s", day, month, year)
+    return DayMonthYearResponse(day=day, month=month, year=year)
+
+@router.post("/dates", response_model=DayMonthYearBatchResponse)
+def GetDates(body: TimestampBatchRequest, request: Request) -> Response:
+    """
+    Return the day, month, year of each unix timestamp of an array.
+    Items are converted independently: an invalid item gets null day, month, year
+    and an error message at the same index, the others are still converted.
+    The response is JSON, MessagePack or raw int64 depending on the Accept header (see app.utils.encoding).
+
+    Example request body:
+        {
+          "timestamps": [1736899200, 0],
+          "tz": "UTC"
+        }
+    """
+    days, months, years, errors = ConvertTimestampsToDays(body.timestamps, body.tz)
+    valid = np.fromiter((err is None for err in errors), dtype=bool, count=len(errors))
+    errorCount = len(errors) - int(valid.sum())
+    if errorCount:
+        logger.error("Error converting %d of %d timestamps", errorCount, len(errors))
+    logger.info("Successfully converted batch of %d timestamps", len(errors) - errorCount)
+    content = {
+        "days": NullableArray(days, valid),
+        "months": NullableArray(months, valid),
+        "years": NullableArray(years, valid),
+        "errors": errors,
+    }
+    return EncodeResponse(request, content, int64Fields=("days", "months", "years"))
+
+@router.post("/buckets", response_model=TimestampBucketResponse)
+def GetTimestampBuckets(body: TimestampBucketRequest, request: Request) -> Response:
+    """
+    Bucket unix timestamps by day, month and year using the precomputed calendar index.
+    In "buckets" mode, return the start timestamp of each timestamp's day, month and year (null when
+    outside the configured year span). In "counts" mode, return the number of timestamps per bucket
+    of the requested granularity.
+    The response is JSON, MessagePack or raw int64 depending on the Accept header (see app.utils.encoding).
+
+    Example request body:
+        {
+          "timestamps": [1736899200, 1736985600, 1738368000],
+          "tz": "UTC",
+          "mode": "counts",
+          "granularity": "month"
+        }
+    """
+    content = TimestampBucketResponse().model_dump()
+    if getZone(body.tz) is None:
+        err = timezoneError(body.tz)
+        logger.error("Error bucketing timestamps: %s", err)
+        return EncodeResponse(request, content | {"error": err})
+
+    timestamps = np.asarray(body.timestamps, dtype=np.int64)
+    index = GetCalendarIndexFor(timestamps, body.tz)
+    if body.mode == "counts":
+        starts, counts, outOfRange = index.countBuckets(timestamps, body.granularity)
+        logger.info("Successfully counted %d timestamps into %d %s buckets", len(timestamps), len(starts), body.granularity)
+        content |= {"bucketStarts": starts, "counts": counts, "outOfRange": outOfRange}
+        return EncodeResponse(request, content, int64Fields=("bucketStarts", "counts"))
+
+    for granularity in ("day", "month", "year"):
+        starts, inRange = index.bucketStarts(timestamps, granularity)
+        content[f"{granularity}Starts"] = NullableArray(starts, inRange)
+    content["outOfRange"] = int(len(timestamps) - inRange.sum())
+    logger.info("Successfully bucketed %d timestamps", len(timestamps))
+    return EncodeResponse(request, content, int64Fields=("dayStarts", "monthStarts", "yearStarts"))
@@ -0,0 +1,174 @@
+import json
+from typing import AsyncIterator, Iterable
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+from ..config import DEFAULT_TIMEZONE
+from ..utils.convert_day import ConvertDayToTimestamp
+from ..utils.logging_setup import GetLogger
+
+router = APIRouter()
+logger = GetLogger()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+MAX_LINE_BYTES = 64 * 1024 # A longer line is reported as an error and skipped, so one bad line cannot grow the buffer
+MALFORMED_ROW_ERROR = "Invalid input: Each row must contain integer day, month and year."
+LINE_TOO_LONG_ERROR = f"Invalid input: Line exceeds {MAX_LINE_BYTES} bytes."
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that can be sent while the request body is still being read.
+    The default StreamingResponse listens for disconnects by consuming `receive`,
+    which would steal the upload chunks from the body iterator. Here the body iterator
+    is the only consumer, and a disconnect surfaces as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def iterLineBatches(chunks: AsyncIterator[bytes]) -> AsyncIterator[list[bytes | None]]:
+    """
+    Split a chunked byte stream into lines, yielding the complete lines of each chunk.
+    Only the trailing partial line is kept between chunks. A line longer than
+    MAX_LINE_BYTES is yielded as None and its remaining bytes are dropped.
+    """
+    pending = b""
+    skipping = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer = pending + chunk
+        lines = buffer.split(b"\n")
+        pending = lines.pop()
+        if skipping:
+            if not lines:
+                pending = b""
+                continue
+            lines.pop(0)
+            skipping = False
+        if len(buffer) > MAX_LINE_BYTES: # A complete line of this chunk may be too long as well
+            lines = [None if len(line) > MAX_LINE_BYTES else line for line in lines]
+        if len(pending) > MAX_LINE_BYTES:
+            lines.append(None)
+            pending = b""
+            skipping = True
+        if lines:
+            yield lines
+    if pending and not skipping:
+        yield [pending]
+
+def convertRow(day, month, year, tz: str) -> tuple[int | None, str | None]:
+    """Convert one parsed row, rejecting values that are not integers."""
+    if not all(type(value) is int for value in (day, month, year)) or not isinstance(tz, str):
+        return None, MALFORMED_ROW_ERROR
+    timestamp, err = ConvertDayToTimestamp(day, month, year, tz)
+    return (None, err) if err else (timestamp, None)
+
+def convertNdjsonLines(lines: Iterable[bytes | None], tz: str) -> Iterable[tuple[int | None, str | None]]:
+    """Convert NDJSON lines such as {"day": 15, "month": 1, "year": 2025, "tz": "UTC"}, skipping blank lines."""
+    for line in lines:
+        if line is None:
+            yield None, LINE_TOO_LONG_ERROR
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            yield convertRow(row["day"], row["month"], row["year"], row.get("tz", tz))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            yield None, MALFORMED_ROW_ERROR
+
+def convertCsvLines(lines: Iterable[bytes | None], tz: str) -> Iterable[tuple[int | None, str | None]]:
+    """Convert CSV lines such as `15,1,2025` or `15,1,2025,UTC`, skipping blank lines and a header row."""
+    for line in lines:
+        if line is None:
+            yield None, LINE_TOO_LONG_ERROR
+            continue
+        fields = line.decode("utf-8", errors="replace").strip().split(",")
+        if fields == [""]:
+            continue
+        if fields[0].strip().lower() == "day":
+            continue
+        try:
+            day, month, year = (int(field) for field in fields[:3])
+        except ValueError:
+            yield None, MALFORMED_ROW_ERROR
+            continue
+        rowTz = fields[3].strip() if len(fields) > 3 and fields[3].strip() else tz
+        yield convertRow(day, month, year, rowTz)
+
+def encodeNdjson(results: Iterable[tuple[int | None, str | None]]) -> bytes:
+    """Encode conversion results as NDJSON lines."""
+    return b"".join(
+        json.dumps({"timestamp": timestamp, "error": err}).encode() + b"\n"
+        for timestamp, err in results
+    )
+
+def quoteCsv(value: str) -> str:
+    """Quote a CSV field, doubling embedded quotes."""
+    return '"' + value.replace('"', '""') + '"'
+
+def encodeCsv(results: Iterable[tuple[int | None, str | None]]) -> bytes:
+    """Encode conversion results as `timestamp,error` CSV lines."""
+    return b"".join(
+        f"{'' if timestamp is None else timestamp},{quoteCsv(err) if err else ''}\n".encode()
+        for timestamp, err in results
+    )
+
+async def streamConversion(request: Request, isCsv: bool, tz: str) -> AsyncIterator[bytes]:
+    """Pipeline: request chunks -> lines -> conversion results -> encoded output, one upload chunk at a time."""
+    convert, encode = (convertCsvLines, encodeCsv) if isCsv else (convertNdjsonLines, encodeNdjson)
+    if isCsv:
+        yield b"timestamp,error\n"
+    rowCount = 0
+    try:
+        async for lines in iterLineBatches(request.stream()):
+            output = encode(convert(lines, tz))
+            rowCount += output.count(b"\n")
+            if output:
+                yield output
+    except ClientDisconnect:
+        logger.error("Client disconnected during streaming conversion after %d rows", rowCount)
+        return
+    logger.info("Successfully streamed conversion of %d rows", rowCount)
+
+@router.post("/stream")
+async def StreamTimestamps(request: Request, tz: str = DEFAULT_TIMEZONE):
+    """
+    Convert a chunked NDJSON or CSV upload of dates to unix timestamps, streaming
+    the results back in the same format and order while the upload is still arriving.
+    The format is selected by the Content-Type header.
+
+    NDJSON (Content-Type: application/x-ndjson), one object per line:
+        {"day": 15, "month": 1, "year": 2025}
+        {"day": 16, "month": 1, "year": 2025, "tz": "Asia/Ho_Chi_Minh"}
+    Response lines:
+        {"timestamp": 1736899200, "error": null}
+
+    CSV (Content-Type: text/csv), `day,month,year[,tz]` per line, optional header:
+        15,1,2025
+    Response lines after a `timestamp,error` header:
+        1736899200,
+
+    The "tz" query parameter is the default timezone of rows without one.
+    """
+    contentType = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if contentType in (NDJSON_MEDIA_TYPE, "application/jsonl"):
+        isCsv = False
+    elif contentType == CSV_MEDIA_TYPE:
+        isCsv = True
+    else:
+        logger.error("Unsupported streaming content type: %s", contentType)
+        return JSONResponse(
+            status_code=415,
+            content={"detail": f"Content-Type must be {NDJSON_MEDIA_TYPE} or {CSV_MEDIA_TYPE}."},
+        )
+
+    return DuplexStreamingResponse(
+        streamConversion(request, isCsv, tz),
+        media_type=CSV_MEDIA_TYPE if isCsv else NDJSON_MEDIA_TYPE,
+    )
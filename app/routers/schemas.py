@@ -1,12 +1,124 @@
-from pydantic import BaseModel
+from typing import Annotated, Literal
+from pydantic import BaseModel, Field, model_validator
+from ..config import DEFAULT_TIMEZONE
+
+# Array items are converted with numpy int64: a larger integer is rejected with a 422
+Int64 = Annotated[int, Field(ge=-2**63, le=2**63 - 1)]
 
 class DayMonthYearRequest(BaseModel):
     """Represents the request body for converting a day/month/year to timestamp."""
     day: int
     month: int
     year: int
+    tz: str = DEFAULT_TIMEZONE
 
 class TimestampResponse(BaseModel):
     """Represents the response body containing the timestamp or any error message."""
     timestamp: int | None = None
-    error: str | None = None
\ No newline at end of file
+    error: str | None = None
+
+class DayMonthYearBatchRequest(BaseModel):
+    """Represents the request body for converting arrays of day/month/year to timestamps."""
+    days: list[Int64]
+    months: list[Int64]
+    years: list[Int64]
+    tz: str = DEFAULT_TIMEZONE
+
+    @model_validator(mode="after")
+    def checkSameLength(self) -> "DayMonthYearBatchRequest":
+        if not (len(self.days) == len(self.months) == len(self.years)):
+            raise ValueError("days, months and years must have the same length.")
+        return self
+
+class TimestampBatchResponse(BaseModel):
+    """Represents the response body containing one timestamp or error message per input item."""
+    timestamps: list[int | None]
+    errors: list[str | None]
+
+
+class TimestampBucketRequest(BaseModel):
+    """Represents the request body for bucketing unix timestamps by day, month and year."""
+    timestamps: list[Int64]
+    tz: str = DEFAULT_TIMEZONE
+    mode: Literal["buckets", "counts"] = "buckets"
+    granularity: Literal["day", "month", "year"] = "day"
+
+class TimestampBucketResponse(BaseModel):
+    """
+    Represents the response body of timestamp bucketing.
+    In "buckets" mode, the start timestamp of the day, month and year bucket of each input timestamp.
+    In "counts" mode, the start timestamps of the non-empty buckets and their number of timestamps.
+    """
+    dayStarts: list[int | None] | None = None
+    monthStarts: list[int | None] | None = None
+    yearStarts: list[int | None] | None = None
+    bucketStarts: list[int] | None = None
+    counts: list[int] | None = None
+    outOfRange: int = 0
+    error: str | None = None
+
+
+class TimestampRequest(BaseModel):
+    """Represents the request body for converting a timestamp to day/month/year."""
+    timestamp: int
+    tz: str = DEFAULT_TIMEZONE
+
+class DayMonthYearResponse(BaseModel):
+    """Represents the response body containing the day/month/year or any error message."""
+    day: int | None = None
+    month: int | None = None
+    year: int | None = None
+    error: str | None = None
+
+class TimestampBatchRequest(BaseModel):
+    """Represents the request body for converting an array of timestamps to days/months/years."""
+    timestamps: list[Int64]
+    tz: str = DEFAULT_TIMEZONE
+
+class DayMonthYearBatchResponse(BaseModel):
+    """Represents the response body containing one day/month/year or error message per input item."""
+    days: list[int | None]
+    months: list[int | None]
+    years: list[int | None]
+    errors: list[str | None]
+
+class AggregationRequest(BaseModel):
+    """
+    Represents the request body of a time-range aggregation: a year (or a month of it) in the configured
+    timezone, or a [startTimestamp, endTimestamp) window.
+    """
+    source: str
+    granularity: Literal["day", "month", "year"] = "day"
+    year: int | None = None
+    month: int | None = None
+    startTimestamp: int | None = None
+    endTimestamp: int | None = None
+
+    @model_validator(mode="after")
+    def checkWindow(self) -> "AggregationRequest":
+        if self.year is None:
+            if self.month is not None:
+                raise ValueError("month requires a year.")
+            if self.startTimestamp is None or self.endTimestamp is None:
+                raise ValueError("Either year or startTimestamp and endTimestamp are required.")
+            if self.startTimestamp >= self.endTimestamp:
+                raise ValueError("startTimestamp must be lower than endTimestamp.")
+        elif self.startTimestamp is not None or self.endTimestamp is not None:
+            raise ValueError("year cannot be combined with startTimestamp and endTimestamp.")
+        return self
+
+class AggregationResponse(BaseModel):
+    """
+    Represents the response body of a time-range aggregation: the start timestamps of the non-empty buckets,
+    with their number of rows and sum of values, the totals, and the last row id served from the rollups.
+    """
+    bucketStarts: list[int] | None = None
+    counts: list[int] | None = None
+    sums: list[float] | None = None
+    totalCount: int = 0
+    totalSum: float = 0.0
+    startTimestamp: int | None = None
+    endTimestamp: int | None = None
+    watermark: int | None = None
+    scannedRows: int = 0
+    error: str | None = None
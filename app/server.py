@@ -0,0 +1,71 @@
+"""
+Production launcher: runs app.main:app in SERVER_WORKERS uvicorn worker processes, configured by the
+server section of config.yaml.
+
+Usage:
+    python -m app.server
+
+The supervisor restarts workers that die or reach SERVER_MAX_REQUESTS, and restarts every worker,
+one after the other, on SIGHUP (e.g. after a deployment). SIGTTIN / SIGTTOU add / remove a worker,
+but the pools of the new workers are sized for the initial number of workers.
+"""
+import os
+import shutil
+import tempfile
+import uvicorn
+from app.config import (
+    POSTGRES_POOL_MIN_CONN, SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_POSTGRES_CONNECTION_BUDGET,
+    SERVER_KEEP_ALIVE_TIMEOUT, SERVER_GRACEFUL_SHUTDOWN_TIMEOUT, SERVER_MAX_REQUESTS,
+    SERVER_LIMIT_CONCURRENCY, SERVER_BACKLOG, SERVER_ACCESS_LOG, SERVER_CPU_AFFINITY,
+)
+from app.utils.cpu_affinity import CPU_AFFINITY_ENV, GetAvailableCpus
+from app.utils.logging_setup import logger
+
+POOLS_PER_WORKER = 2 # PostgresManager and AsyncPostgresManager
+
+def GetPoolSizes(workers: int, budget: int, minConn: int) -> tuple[int, int]:
+    """
+    Split the Postgres connection budget between the pools of every worker.
+    Input: workers (int), budget (int): connections of all the workers together, minConn (int): configured minimum.
+    Output: (minConn, maxConn) of each pool.
+    Raises ValueError if the budget does not allow one connection per pool.
+    """
+    maxConn = budget // (workers * POOLS_PER_WORKER)
+    if maxConn < 1:
+        raise ValueError(
+            f"SERVER_POSTGRES_CONNECTION_BUDGET={budget} is too small for {workers} workers "
+            f"({POOLS_PER_WORKER} pools each): at least {workers * POOLS_PER_WORKER} connections are needed."
+        )
+    return min(minConn, maxConn), maxConn
+
+def main():
+    workers = SERVER_WORKERS or len(GetAvailableCpus())
+    minConn, maxConn = GetPoolSizes(workers, SERVER_POSTGRES_CONNECTION_BUDGET, POSTGRES_POOL_MIN_CONN)
+    # The workers read their pool sizes in app.config, and the CPU lock directory in PinWorkerToCpu
+    os.environ["POSTGRES_POOL_MIN_CONN"] = str(minConn)
+    os.environ["POSTGRES_POOL_MAX_CONN"] = str(maxConn)
+    if SERVER_CPU_AFFINITY:
+        os.environ[CPU_AFFINITY_ENV] = tempfile.mkdtemp(prefix="app-cpu-")
+    logger.info(
+        "Starting %s workers on %s:%s, Postgres pools of %s-%s connections per worker and pool",
+        workers, SERVER_HOST, SERVER_PORT, minConn, maxConn
+    )
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=SERVER_HOST,
+            port=SERVER_PORT,
+            workers=workers,
+            timeout_keep_alive=SERVER_KEEP_ALIVE_TIMEOUT,
+            timeout_graceful_shutdown=SERVER_GRACEFUL_SHUTDOWN_TIMEOUT or None,
+            limit_max_requests=SERVER_MAX_REQUESTS or None,
+            limit_concurrency=SERVER_LIMIT_CONCURRENCY or None,
+            backlog=SERVER_BACKLOG,
+            access_log=SERVER_ACCESS_LOG
+        )
+    finally:
+        if SERVER_CPU_AFFINITY:
+            shutil.rmtree(os.environ[CPU_AFFINITY_ENV], ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Day, month and year rollups (count and sum) of raw record tables in Postgres.
+
+A background job folds the rows newer than a per-source watermark (the last processed id) into the
+rollup table, one batch per transaction: the rollup increments and the new watermark commit together,
+under an advisory lock so that several workers never fold the same rows twice. Queries read whole
+buckets from the rollup table and scan the raw rows only for the rows past the watermark and the
+partial buckets at the edges of the window.
+
+Ids from a sequence are not committed in increasing order: a transaction may still commit a lower id
+than a visible row. So the watermark only moves up to a settled id: the largest id seen at a previous
+run is stamped at the next run with the current pg_snapshot_xmax, and becomes settled once every
+transaction below that stamp has ended, i.e. the snapshot xmin has passed it. The transactions that took
+an id up to it have then committed or aborted. The rows past the watermark are still counted by the
+queries, from the raw scan. Rows inserted below the watermark otherwise (a backfill with explicit ids)
+are never rolled up: rebuild the source with RebuildRollup after a backfill, or after changing
+DEFAULT_TIMEZONE (the buckets are local to it). Needs Postgres 13 or later.
+
+The driver is imported on first use, not with this module.
+"""
+import asyncio
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable
+import numpy as np
+from app.config import DEFAULT_TIMEZONE, ROLLUP_SOURCES, ROLLUP_TABLE, ROLLUP_BATCH_SIZE
+from app.utils.calendar_index import GetCalendarIndex
+from app.utils.convert_day import ConvertDayToTimestamp, ConvertTimestampToDay, GetMonthRange, GetYearRange
+from app.utils.logging_setup import logger
+from app.utils.metrics import REGISTRY
+from app.utils.readiness import READINESS
+
+GRANULARITIES = ("day", "month", "year")
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+
+ROLLUP_ROWS = REGISTRY.counter("rollup_rows_total", "Source rows folded into the rollups.", ("source",))
+ROLLUP_ERRORS = REGISTRY.counter("rollup_errors_total", "Failed runs of the rollup job.", ("source",))
+ROLLUP_WATERMARKS: Dict[str, int] = {} # Exposed in /metrics
+
+class RollupSource:
+    """Table and columns of one source, validated since they are formatted into the SQL."""
+    __slots__ = ("name", "table", "idColumn", "timeColumn", "valueColumn")
+
+    def __init__(self, name: str, table: str, idColumn: str = "id", timeColumn: str = "timestamp", valueColumn: str = None):
+        for identifier in (table, idColumn, timeColumn, valueColumn or "_"):
+            if not _IDENTIFIER_PATTERN.match(identifier):
+                raise ValueError(f"Invalid identifier '{identifier}' in the rollup source '{name}'.")
+        self.name = name
+        self.table = table
+        self.idColumn = idColumn
+        self.timeColumn = timeColumn
+        self.valueColumn = valueColumn
+
+    @property
+    def valueExpression(self) -> str:
+        return f"COALESCE({self.valueColumn}, 0)" if self.valueColumn else "0"
+
+def GetRollupSource(name: str) -> RollupSource | None:
+    """Return the configured source of this name, or None."""
+    config = ROLLUP_SOURCES.get(name)
+    return RollupSource(name, **config) if config else None
+
+def getManager():
+    from app.database.Postgres_connect import PostgresManager
+    return PostgresManager()
+
+def watermarkTable() -> str:
+    return f"{ROLLUP_TABLE}_watermarks"
+
+def BucketRange(timestamp: int, granularity: str, tz: str = DEFAULT_TIMEZONE) -> tuple[int, int] | None:
+    """
+    Return the bucket containing a timestamp, from the window functions of convert_day.
+    Input: timestamp (int), granularity ("day", "month" or "year"), tz (known timezone).
+    Output: (start, end) timestamps of the bucket, end exclusive, or None if the timestamp is out of range.
+    """
+    day, month, year, err = ConvertTimestampToDay(timestamp, tz)
+    if err:
+        return None
+    if granularity == "year":
+        start, end, err = GetYearRange(year, tz)
+    elif granularity == "month":
+        start, end, err = GetMonthRange(month, year, tz)
+    else:
+        nextDay = date(year, month, day) + timedelta(days=1)
+        start, err = ConvertDayToTimestamp(day, month, year, tz)
+        end, endErr = ConvertDayToTimestamp(nextDay.day, nextDay.month, nextDay.year, tz)
+        err, end = err or endErr, end - 1
+    return None if err else (start, end + 1)
+
+def BucketTotals(timestamps: Iterable[int], values: Iterable[float], granularity: str, tz: str = DEFAULT_TIMEZONE) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count and sum values per bucket, with the calendar index (BucketRange outside its year span).
+    Input: timestamps, values (sequences of the same length), granularity, tz.
+    Output:
+        starts (np.ndarray): start timestamps of the non-empty buckets, sorted.
+        counts, sums (np.ndarray): number of rows and sum of their values in each of these buckets.
+    Rows whose timestamp is out of the supported range are left out.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    starts, valid = GetCalendarIndex(tz).bucketStarts(timestamps, granularity)
+    valid = valid.copy()
+    for i in np.flatnonzero(~valid):
+        bucket = BucketRange(int(timestamps[i]), granularity, tz)
+        if bucket:
+            starts[i], valid[i] = bucket[0], True
+    buckets, inverse = np.unique(starts[valid], return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(buckets))
+    sums = np.bincount(inverse, weights=values[valid], minlength=len(buckets))
+    return buckets, counts, sums
+
+def EnsureRollupTables():
+    """Create the rollup and watermark tables if they do not exist."""
+    manager = getManager()
+    conn = manager.getConnection()
+    try:
+        with conn.cursor() as cur:
+            # Workers starting together would race on CREATE TABLE IF NOT EXISTS
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (ROLLUP_TABLE,))
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+                    source TEXT NOT NULL,
+                    granularity TEXT NOT NULL,
+                    bucket_start BIGINT NOT NULL,
+                    count BIGINT NOT NULL,
+                    sum DOUBLE PRECISION NOT NULL,
+                    PRIMARY KEY (source, granularity, bucket_start)
+                )
+            """)
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {watermarkTable()} (
+                    source TEXT PRIMARY KEY,
+                    last_id BIGINT NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """)
+            # Settling of the watermark (see the module docstring), added to the tables of older versions
+            cur.execute(f"""
+                ALTER TABLE {watermarkTable()}
+                    ADD COLUMN IF NOT EXISTS settled_id BIGINT NOT NULL DEFAULT 0,
+                    ADD COLUMN IF NOT EXISTS pending_id BIGINT,
+                    ADD COLUMN IF NOT EXISTS pending_xmax XID8,
+                    ADD COLUMN IF NOT EXISTS candidate_id BIGINT
+            """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        manager.releaseConnection(conn)
+    manager.invalidatePreparedStatements()
+
+def settleWatermark(cur, source: RollupSource) -> tuple[int, int]:
+    """
+    Advance the settling stages of a source and return (watermark, settled id): the rows with
+    watermark < id <= settled id can be folded. Runs in the transaction of RefreshRollup.
+    """
+    cur.execute(
+        f"""
+        SELECT last_id, settled_id, pending_id, pending_xmax <= pg_snapshot_xmin(pg_current_snapshot()), candidate_id
+        FROM {watermarkTable()} WHERE source = %s
+        """,
+        (source.name,)
+    )
+    watermark, settledId, pendingId, pendingSettled, candidateId = cur.fetchone() or (0, 0, None, None, None)
+    if pendingSettled:
+        settledId, pendingId = pendingId, None
+    # Stamped one run after being seen, so that the transactions which took an id up to it have an xid
+    stamp = pendingId is None and candidateId is not None
+    if stamp:
+        pendingId, candidateId = candidateId, None
+    if candidateId is None:
+        cur.execute(f"SELECT MAX({source.idColumn}) FROM {source.table}")
+        candidateId = cur.fetchone()[0]
+    cur.execute(
+        f"""
+        INSERT INTO {watermarkTable()} AS w (source, last_id, settled_id, pending_id, pending_xmax, candidate_id)
+        VALUES (%s, %s, %s, %s, CASE WHEN %s THEN pg_snapshot_xmax(pg_current_snapshot()) END, %s)
+        ON CONFLICT (source) DO UPDATE SET
+            settled_id = EXCLUDED.settled_id, pending_id = EXCLUDED.pending_id, candidate_id = EXCLUDED.candidate_id,
+            pending_xmax = CASE WHEN %s THEN EXCLUDED.pending_xmax WHEN EXCLUDED.pending_id IS NULL THEN NULL ELSE w.pending_xmax END
+        """,
+        (source.name, watermark, settledId, pendingId, stamp, candidateId, stamp)
+    )
+    return watermark, settledId
+
+def RefreshRollup(source: RollupSource, batchSize: int = ROLLUP_BATCH_SIZE, tz: str = DEFAULT_TIMEZONE) -> int:
+    """
+    Fold the next batch of settled rows past the watermark into the rollups, in one transaction.
+    Input: source (RollupSource), batchSize (int): rows read at most, tz: timezone of the buckets.
+    Output: number of rows folded (0 when up to date, or while another worker refreshes this source).
+    """
+    manager = getManager()
+    conn = manager.getConnection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", (f"{ROLLUP_TABLE}:{source.name}",))
+            if not cur.fetchone()[0]:
+                conn.rollback()
+                return 0
+            watermark, settledId = settleWatermark(cur, source)
+            cur.execute(
+                f"SELECT {source.idColumn}, {source.timeColumn}, {source.valueExpression} FROM {source.table} "
+                f"WHERE {source.idColumn} > %s AND {source.idColumn} <= %s ORDER BY {source.idColumn} LIMIT %s",
+                (watermark, settledId, batchSize)
+            )
+            rows = cur.fetchall()
+            if not rows:
+                conn.commit() # Keeps the settling stages
+                return 0
+            ids, timestamps, values = zip(*rows)
+            for granularity in GRANULARITIES:
+                starts, counts, sums = BucketTotals(timestamps, values, granularity, tz)
+                cur.execute(
+                    f"""
+                    INSERT INTO {ROLLUP_TABLE} AS r (source, granularity, bucket_start, count, sum)
+                    SELECT %s, %s, * FROM unnest(%s::BIGINT[], %s::BIGINT[], %s::DOUBLE PRECISION[])
+                    ON CONFLICT (source, granularity, bucket_start)
+                    DO UPDATE SET count = r.count + EXCLUDED.count, sum = r.sum + EXCLUDED.sum
+                    """,
+                    (source.name, granularity, starts.tolist(), counts.tolist(), sums.tolist())
+                )
+            cur.execute(
+                f"UPDATE {watermarkTable()} SET last_id = %s, updated_at = now() WHERE source = %s",
+                (ids[-1], source.name)
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        manager.releaseConnection(conn)
+    manager.invalidateCache(ROLLUP_TABLE)
+    ROLLUP_ROWS.inc((source.name,), len(rows))
+    ROLLUP_WATERMARKS[source.name] = ids[-1]
+    return len(rows)
+
+def RebuildRollup(source: RollupSource):
+    """Drop the rollups and the watermark of a source: the job then folds every row again."""
+    getManager().executeTransaction([
+        (f"DELETE FROM {ROLLUP_TABLE} WHERE source = %s", (source.name,)),
+        (f"DELETE FROM {watermarkTable()} WHERE source = %s", (source.name,)),
+    ], raiseOnError=True)
+    ROLLUP_WATERMARKS.pop(source.name, None)
+
+def QueryRollup(source: RollupSource, granularity: str, start: int, end: int, tz: str = DEFAULT_TIMEZONE) -> Dict[str, Any]:
+    """
+    Count and sum the rows of a source per bucket over the window [start, end).
+    The whole buckets come from the rollup table; the raw rows are scanned only past the watermark
+    and in the partial buckets at the edges of the window.
+    Input: source (RollupSource), granularity ("day", "month" or "year"), start, end (timestamps), tz.
+    Output: {"bucketStarts", "counts", "sums", "watermark", "scannedRows"}.
+    """
+    # Whole buckets of the window: [alignedStart, alignedEnd)
+    first, last = BucketRange(start, granularity, tz), BucketRange(end - 1, granularity, tz)
+    alignedStart = start if first is None or first[0] == start else first[1]
+    alignedEnd = end if last is None or last[1] == end else last[0]
+    if alignedStart >= alignedEnd:
+        alignedStart = alignedEnd = start # No whole bucket: every row is scanned
+
+    manager = getManager()
+    # One statement, so that the rollups and the watermark are read from the same snapshot
+    rows = manager.executeQuery(
+        f"""
+        WITH w AS (SELECT COALESCE(MAX(last_id), 0) AS last_id FROM {watermarkTable()} WHERE source = %s)
+        SELECT w.last_id, r.bucket_start, r.count, r.sum FROM w
+        LEFT JOIN {ROLLUP_TABLE} r ON r.source = %s AND r.granularity = %s
+            AND r.bucket_start >= %s AND r.bucket_start < %s
+        ORDER BY r.bucket_start
+        """,
+        (source.name, source.name, granularity, alignedStart, alignedEnd)
+    )
+    watermark = rows[0]["last_id"]
+    totals = {row["bucket_start"]: [row["count"], row["sum"]] for row in rows if row["bucket_start"] is not None}
+
+    scannedRows = 0
+    query = (
+        f"SELECT {source.timeColumn}, {source.valueExpression} FROM {source.table} "
+        f"WHERE {source.timeColumn} >= %s AND {source.timeColumn} < %s "
+        f"AND ({source.idColumn} > %s OR {source.timeColumn} < %s OR {source.timeColumn} >= %s)"
+    )
+    for _, chunk in manager.iterChunks(query, (start, end, watermark, alignedStart, alignedEnd), itersize=50000, requestBound=True):
+        timestamps, values = zip(*chunk)
+        for bucket, count, total in zip(*BucketTotals(timestamps, values, granularity, tz)):
+            entry = totals.setdefault(int(bucket), [0, 0.0])
+            entry[0] += int(count)
+            entry[1] += float(total)
+        scannedRows += len(chunk)
+
+    bucketStarts = sorted(totals)
+    return {
+        "bucketStarts": bucketStarts,
+        "counts": [totals[bucket][0] for bucket in bucketStarts],
+        "sums": [totals[bucket][1] for bucket in bucketStarts],
+        "watermark": watermark,
+        "scannedRows": scannedRows,
+    }
+
+async def RunRollupJob(interval: float, batchSize: int = ROLLUP_BATCH_SIZE, maxBatches: int = 100):
+    """
+    Refresh the rollups of every configured source every interval seconds, until cancelled.
+    A run folds at most maxBatches batches per source, and is skipped while Postgres is down.
+    """
+    sources = [GetRollupSource(name) for name in ROLLUP_SOURCES]
+    tablesReady = False
+    while True:
+        if READINESS.isBackendReady("postgres"):
+            try:
+                if not tablesReady:
+                    await asyncio.to_thread(EnsureRollupTables)
+                    tablesReady = True
+                for source in sources:
+                    try:
+                        for _ in range(maxBatches):
+                            if await asyncio.to_thread(RefreshRollup, source, batchSize) < batchSize:
+                                break
+                    except Exception as e:
+                        ROLLUP_ERRORS.inc((source.name,))
+                        logger.error("Rollup of %s failed: %s", source.name, e)
+            except Exception as e:
+                logger.error("Could not create the rollup tables: %s", e)
+        await asyncio.sleep(interval)
+
+REGISTRY.callback(
+    "rollup_watermark", "Last source row id folded into the rollups by this worker.", "gauge", ("source",),
+    lambda: {(name,): watermark for name, watermark in ROLLUP_WATERMARKS.items()}
+)
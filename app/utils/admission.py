@@ -0,0 +1,199 @@
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import deque
+from typing import Any, Dict
+from app.utils.logging_setup import logger
+from app.utils.metrics import REGISTRY, GetRouteTemplate
+
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "http_admission_rejections_total", "HTTP requests shed with a 503 by admission control.", ("route", "reason")
+)
+
+ROUTE_LIMITERS: Dict[str, "RouteLimiter"] = {} # Exposed in /metrics
+
+class RouteLimiter:
+    """
+    Concurrency limit of one route, with a bounded FIFO queue and a queue deadline.
+    Used from the event loop only: no lock is needed.
+    """
+
+    def __init__(self, route: str, concurrency: int, queueSize: int, queueTimeout: float):
+        self.route = route
+        self.concurrency = concurrency
+        self.queueSize = queueSize
+        self.queueTimeout = queueTimeout
+        self.active = 0
+        self._waiters = deque() # Futures of the queued requests, resolved True when given a slot
+        self._serviceTime = 0.0 # Moving average of the request duration, in seconds
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> str | None:
+        """
+        Take a slot, waiting in the queue if none is free.
+        Output: None once admitted, or the rejection reason: "queue_full" or "queue_timeout".
+        """
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.queueSize:
+            return "queue_full"
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(self.queueTimeout, self._expire, waiter)
+        try:
+            admitted = await waiter
+        except asyncio.CancelledError: # The client disconnected while queued
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        finally:
+            timer.cancel()
+        return None if admitted else "queue_timeout"
+
+    def _expire(self, waiter: asyncio.Future):
+        if not waiter.done():
+            self._discard(waiter)
+            waiter.set_result(False)
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, duration: float = None):
+        """Give the slot to the first queued request, or free it."""
+        if duration is not None:
+            self._serviceTime = duration if not self._serviceTime else 0.9 * self._serviceTime + 0.1 * duration
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True) # The slot is handed over: active is unchanged
+                return
+        self.active -= 1
+
+    def retryAfter(self) -> float:
+        """Seconds until the queue has likely drained."""
+        return self._serviceTime * (len(self._waiters) + 1) / self.concurrency
+
+class PoolPressure:
+    """
+    Saturation of the PostgresManager pool, from its live in-use and waiting counts,
+    and the average wait for a connection over the last sampling interval.
+    """
+
+    def __init__(self, maxWaiting: int, maxWaitTime: float, interval: float = 0.5):
+        self.maxWaiting = maxWaiting
+        self.maxWaitTime = maxWaitTime
+        self.interval = interval
+        self._sampledAt = 0.0
+        self._lastTotals = (0.0, 0) # totalWaitTime, waitCount
+        self._recentWait = 0.0
+        self._stats = {}
+
+    def isSaturated(self) -> bool:
+        """Every connection is in use, and too many requests wait for one or recent waits are too long."""
+        # Only when the pool module was loaded: admission control must not import the driver
+        module = sys.modules.get("app.database.Postgres_connect")
+        stats = self._stats = module.PostgresManager().getPoolStats() if module else {}
+        if not stats:
+            return False
+        now = time.monotonic()
+        if now - self._sampledAt >= self.interval:
+            totalWaitTime, waitCount = stats["totalWaitTime"], stats["waitCount"]
+            lastWaitTime, lastCount = self._lastTotals
+            self._recentWait = (totalWaitTime - lastWaitTime) / (waitCount - lastCount) if waitCount > lastCount else 0.0
+            self._lastTotals, self._sampledAt = (totalWaitTime, waitCount), now
+        if stats["inUse"] < stats["maxConn"]:
+            return False
+        return stats["waiting"] >= self.maxWaiting or self._recentWait >= self.maxWaitTime
+
+    def retryAfter(self) -> float:
+        """Seconds until the waiting requests have likely been served."""
+        stats = self._stats
+        return self._recentWait * (1 + stats.get("waiting", 0) / max(stats.get("maxConn", 1), 1))
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware enforcing per-route concurrency limits with bounded queues and queue deadlines,
+    and shedding Postgres-bound routes while the pool is saturated. Rejected requests get a 503 with a
+    Retry-After header, instead of waiting in the threadpool. Routes without a limit are not affected,
+    so CPU-only routes keep serving while DB-bound routes shed load.
+    """
+
+    def __init__(self, app, routes: Dict[str, Dict[str, Any]], poolMaxWaiting: int, poolMaxWaitTime: float, retryAfterMax: float):
+        """
+        Input:
+            routes (dict): route template -> {concurrency, queue, queueTimeout, postgres}.
+            poolMaxWaiting, poolMaxWaitTime: saturation thresholds of the Postgres pool.
+            retryAfterMax (float): upper bound of the Retry-After header, in seconds.
+        """
+        self.app = app
+        self.retryAfterMax = retryAfterMax
+        self.poolPressure = PoolPressure(poolMaxWaiting, poolMaxWaitTime)
+        self.limiters = {}
+        self.postgresRoutes = set()
+        for route, limits in (routes or {}).items():
+            if limits.get("concurrency"):
+                self.limiters[route] = RouteLimiter(
+                    route, limits["concurrency"], limits.get("queue", 0), limits.get("queueTimeout", 1.0)
+                )
+            if limits.get("postgres"):
+                self.postgresRoutes.add(route)
+        ROUTE_LIMITERS.update(self.limiters)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self.limiters or self.postgresRoutes):
+            await self.app(scope, receive, send)
+            return
+        route = GetRouteTemplate(scope)
+        if route in self.postgresRoutes and self.poolPressure.isSaturated():
+            await self.reject(send, route, "postgres_saturated", self.poolPressure.retryAfter())
+            return
+        limiter = self.limiters.get(route)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        reason = await limiter.acquire()
+        if reason:
+            await self.reject(send, route, reason, limiter.retryAfter())
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
+
+    async def reject(self, send, route: str, reason: str, retryAfter: float):
+        ADMISSION_REJECTIONS.inc((route, reason))
+        logger.info("Shedding %s: %s", route, reason) # Sampled like every INFO record
+        retryAfter = int(min(max(math.ceil(retryAfter), 1), self.retryAfterMax))
+        body = json.dumps({"detail": "Server overloaded, retry later.", "reason": reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retryAfter).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+REGISTRY.callback(
+    "http_admission_queued", "HTTP requests waiting for an admission slot.", "gauge", ("route",),
+    lambda: {(route,): limiter.queued for route, limiter in ROUTE_LIMITERS.items()}
+)
+REGISTRY.callback(
+    "http_admission_active", "HTTP requests holding an admission slot.", "gauge", ("route",),
+    lambda: {(route,): limiter.active for route, limiter in ROUTE_LIMITERS.items()}
+)
@@ -0,0 +1,106 @@
+from functools import lru_cache
+import numpy as np
+from app.config import CALENDAR_START_YEAR, CALENDAR_END_YEAR, DEFAULT_TIMEZONE
+from app.utils.convert_day import SECONDS_PER_DAY, ConvertDaysToTimestamps, ConvertDayToTimestamp, GetDaysInMonth, civilFromDays
+
+class CalendarIndex:
+    """
+    Sorted day, month and year boundary arrays of a span of years in one timezone.
+    A timestamp is bucketed with a binary search over the boundaries instead of
+    converting dates on every call.
+    """
+
+    def __init__(self, startYear: int, endYear: int, tz: str):
+        """
+        Build the boundaries of every day, month and year from 01/01/startYear to 31/12/endYear.
+        Input: startYear, endYear (integers, 1971 <= startYear <= endYear <= 9998), tz (known timezone).
+        """
+        if not (1971 <= startYear <= endYear <= 9998):
+            raise ValueError("The calendar index span must satisfy 1971 <= startYear <= endYear <= 9998.")
+
+        days, months, years = [], [], []
+        for year in range(startYear, endYear + 1):
+            for month in range(1, 13):
+                daysInMonth = GetDaysInMonth(month, year)
+                days.extend(range(1, daysInMonth + 1))
+                months.extend([month] * daysInMonth)
+                years.extend([year] * daysInMonth)
+        dayStarts, errors = ConvertDaysToTimestamps(days, months, years, tz)
+        if any(errors):
+            raise ValueError(next(err for err in errors if err))
+
+        days, months = np.asarray(days), np.asarray(months)
+        self.tz = tz
+        self.startYear = startYear
+        self.endYear = endYear
+        self.starts = {
+            "day": dayStarts,
+            "month": dayStarts[days == 1],
+            "year": dayStarts[(days == 1) & (months == 1)],
+        }
+        self.end, _ = ConvertDayToTimestamp(1, 1, endYear + 1, tz) # Exclusive upper bound of the index
+
+    def locate(self, timestamps: np.ndarray, granularity: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the bucket of each timestamp with a binary search.
+        Input: timestamps (int64 array), granularity ("day", "month" or "year").
+        Output:
+            positions (np.ndarray): index of each bucket in self.starts[granularity] (0 where out of range).
+            inRange (np.ndarray): boolean mask of the timestamps covered by the index.
+        """
+        starts = self.starts[granularity]
+        inRange = (timestamps >= starts[0]) & (timestamps < self.end)
+        positions = np.searchsorted(starts, timestamps, side="right") - 1
+        positions[~inRange] = 0
+        return positions, inRange
+
+    def bucketStarts(self, timestamps: np.ndarray, granularity: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the start timestamp of the bucket of each timestamp.
+        Output: bucket starts (int64 array, garbage where out of range), inRange mask.
+        """
+        positions, inRange = self.locate(timestamps, granularity)
+        return self.starts[granularity][positions], inRange
+
+    def countBuckets(self, timestamps: np.ndarray, granularity: str) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Count the timestamps per bucket.
+        Output:
+            starts (np.ndarray): start timestamps of the non-empty buckets, sorted.
+            counts (np.ndarray): number of timestamps in each of these buckets.
+            outOfRange (int): number of timestamps not covered by the index.
+        """
+        positions, inRange = self.locate(timestamps, granularity)
+        counts = np.bincount(positions[inRange], minlength=len(self.starts[granularity]))
+        nonEmpty = np.flatnonzero(counts)
+        return self.starts[granularity][nonEmpty], counts[nonEmpty], int(len(timestamps) - inRange.sum())
+
+@lru_cache(maxsize=4)
+def GetCalendarIndex(tz: str) -> CalendarIndex:
+    """
+    Return the calendar index of a timezone over the configured year span, building it on first use.
+    Only meant for the configured timezones (see GetCalendarIndexFor): a request-supplied timezone
+    would make every new zone build and cache a whole index.
+    Input: tz (str, a known timezone).
+    Output: CalendarIndex.
+    """
+    return CalendarIndex(CALENDAR_START_YEAR, CALENDAR_END_YEAR, tz)
+
+def GetCalendarIndexFor(timestamps: np.ndarray, tz: str) -> CalendarIndex:
+    """
+    Return a calendar index covering the given timestamps: the cached index of DEFAULT_TIMEZONE, or for
+    another timezone an uncached index over the years of the timestamps only (with a year of margin for
+    the UTC offset), clipped to the configured span so that out-of-span timestamps stay out of range.
+    Input: timestamps (int64 array), tz (str, a known timezone).
+    Output: CalendarIndex.
+    """
+    if tz == DEFAULT_TIMEZONE:
+        return GetCalendarIndex(tz)
+    if len(timestamps):
+        firstYear = civilFromDays(int(timestamps.min()) // SECONDS_PER_DAY)[2] - 1
+        lastYear = civilFromDays(int(timestamps.max()) // SECONDS_PER_DAY)[2] + 1
+    else:
+        firstYear = lastYear = CALENDAR_START_YEAR
+    firstYear = min(max(firstYear, CALENDAR_START_YEAR), CALENDAR_END_YEAR)
+    lastYear = min(max(lastYear, firstYear), CALENDAR_END_YEAR)
+    return CalendarIndex(firstYear, lastYear, tz)
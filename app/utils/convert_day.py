@@ -1,85 +1,432 @@
 from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+from app.config import DEFAULT_TIMEZONE, CONVERSION_CACHE_SIZE
+from app.utils.metrics import CONVERSION_ERRORS, REGISTRY
+from app.utils.result_cache import MemoCache
+
+SECONDS_PER_DAY = 86400
+
+# Days before the first day of each month, indexed by [isLeap][month - 1]
+_CUMULATIVE_DAYS_TABLE = (
+    (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334),
+    (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335),
+)
+# Number of days of each month, indexed by [isLeap][month - 1]
+_DAYS_IN_MONTH_TABLE = (
+    (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+_CUMULATIVE_DAYS = np.array(_CUMULATIVE_DAYS_TABLE[0], dtype=np.int64)
+_DAYS_IN_MONTH = np.array(_DAYS_IN_MONTH_TABLE[0], dtype=np.int64)
+_LEAP_YEARS_BEFORE_EPOCH = 477 # Leap years in [1, 1969]
+_MAX_YEAR = 9999
 
 def isLeapYear(year: int) -> bool:
     """Check if a year is a leap year."""
     return (year % 4 == 0) and ((year % 100 != 0) or (year % 400 == 0))
 
-def ConvertDayToTimestamp(day: int, month: int, year: int) -> tuple[int, str]:
+# Lookup tables of the days-from-civil engine, indexed by year (0 to _MAX_YEAR + 1)
+_LEAP_TABLE = tuple(isLeapYear(year) for year in range(_MAX_YEAR + 2))
+_YEAR_START_DAYS = tuple( # Days between 01/01/1970 and 01/01/year
+    365 * (year - 1970) + (year - 1) // 4 - (year - 1) // 100 + (year - 1) // 400 - _LEAP_YEARS_BEFORE_EPOCH
+    for year in range(_MAX_YEAR + 2)
+)
+# (cumulative days, days in month) indexed by [isLeap][month], month 0 is unused
+_MONTH_TABLE = tuple(
+    ((0, 0),) + tuple(zip(_CUMULATIVE_DAYS_TABLE[isLeap], _DAYS_IN_MONTH_TABLE[isLeap]))
+    for isLeap in (0, 1)
+)
+_YEAR_START_DAYS_ARRAY = np.array(_YEAR_START_DAYS, dtype=np.int64)
+# Timestamps whose UTC day and its neighbours all fall in [1970, _MAX_YEAR], so their offsets can be looked up
+_MIN_LOOKUP_TIMESTAMP = (_YEAR_START_DAYS[1971] - 2) * SECONDS_PER_DAY
+_MAX_LOOKUP_TIMESTAMP = (_YEAR_START_DAYS[_MAX_YEAR + 1] - 2) * SECONDS_PER_DAY
+
+def GetDaysInMonth(month: int, year: int) -> int:
+    """Return the number of days of a month (1 to 12) of a year."""
+    return _MONTH_TABLE[_LEAP_TABLE[year]][month][1]
+
+def validateDate(day: int, month: int, year: int) -> str | None:
     """
-    Convert a given day (e.g., 01/01/2025) with defaul time 00:00:00 
-    into a Unix timestamp (e.g., 1735743797).
+    Check a day/month/year against the conversion rules.
     Input: day, month, year (integers).
-    Output: timestamp (in seconds), error message (if any).
+    Output: error message if the date is invalid, None otherwise.
     """
 
     if year <= 1970:
-        return 0, "Invalid input: The year must be 1971 or later."
+        return "Invalid input: The year must be 1971 or later."
+    if year > _MAX_YEAR:
+        return f"Invalid input: The year must be {_MAX_YEAR} or earlier."
     if (month < 1) or (month > 12):
-        return 0, "Invalid input: The month must be between 1 and 12."
+        return "Invalid input: The month must be between 1 and 12."
 
-    if day < 1: 
-        return 0, "Invalid input: The day must be greater than 0"
+    if day < 1:
+        return "Invalid input: The day must be greater than 0"
     if (month in {1, 3, 5, 7, 8, 10, 12}) and (day > 31):
-        return 0, f"Invalid input: The month {month} only has 31 days."
+        return f"Invalid input: The month {month} only has 31 days."
     if (month in {4, 6, 9, 11}) and (day > 30):
-        return 0, f"Invalid input: The month {month} only has 30 days."
-    
+        return f"Invalid input: The month {month} only has 30 days."
+
     if isLeapYear(year):
         if (month == 2) and (day > 29):
-            return 0, f"Invalid input: February {year} (Leap year) only has 29 days."
+            return f"Invalid input: February {year} (Leap year) only has 29 days."
     elif (month == 2) and (day > 28):
-        return 0, f"Invalid input day. February {year} (Common year) only has 28 days." 
-    
-    dt = datetime(year, month, day, 0, 0) 
-    unixTimestamp = int(dt.timestamp())
-    err = None
+        return f"Invalid input day. February {year} (Common year) only has 28 days."
 
-    return unixTimestamp, err
+    return None
 
-def GetMonthRange(month: int, year: int) -> tuple[int, int, str]:
+@lru_cache(maxsize=1024)
+def getZone(tz: str) -> ZoneInfo | None:
     """
-    Calculate the Unix timestamp range for a given month of a year.
-    Input: month, year (integers).
-    Output: 
-        startOfMonth (int): Unix timestamp for the start of the month (00:00:00 on the 1st day).
-        endOfMonth (int): Unix timestamp for the end of the month (23:59:59 on the last day).
-        err (str or None): An error message if input is invalid, or None if no errors.
+    Resolve an IANA timezone name (e.g., "Asia/Ho_Chi_Minh").
+    Input: tz (str).
+    Output: the ZoneInfo, or None if the timezone is unknown.
+    """
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        return None
+
+def timezoneError(tz: str) -> str:
+    """Return the error message for an unknown timezone."""
+    return f"Invalid input: Unknown timezone '{tz}'."
+
+@lru_cache(maxsize=4096)
+def getYearOffsets(tz: str, year: int) -> tuple[int, ...] | None:
+    """
+    Compute the UTC offset (in seconds) at local midnight of every day of a year.
+    The result is cached per zone and per year, so each pair is only computed once.
+    Input: tz (str), year (int).
+    Output: tuple of offsets indexed by day of year (0-based, 365 or 366 entries), or None if the timezone is unknown.
+    """
+    zone = getZone(tz)
+    if zone is None:
+        return None
+    offsets = []
+    shared = {} # One int object per distinct offset, so that the tables stay small and cache friendly
+    for month in range(1, 13):
+        for day in range(1, GetDaysInMonth(month, year) + 1):
+            offset = int(zone.utcoffset(datetime(year, month, day)).total_seconds())
+            offsets.append(shared.setdefault(offset, offset))
+    return tuple(offsets)
+
+# getYearOffsets by zone then year, read with two dict lookups instead of a call on the hot path of
+# ConvertDayToTimestamp. Cleared when it holds _YEAR_OFFSETS_MAX_SIZE years, since tz comes from the requests.
+_YEAR_OFFSETS: dict[str, dict[int, tuple[int, ...]]] = {}
+_YEAR_OFFSETS_MAX_SIZE = 4096
+
+def loadYearOffsets(tz: str, year: int) -> tuple[int, ...] | None:
+    """getYearOffsets, stored in _YEAR_OFFSETS (unknown timezones are not stored)."""
+    offsets = getYearOffsets(tz, year)
+    if offsets is not None:
+        if sum(map(len, _YEAR_OFFSETS.values())) >= _YEAR_OFFSETS_MAX_SIZE:
+            _YEAR_OFFSETS.clear()
+        _YEAR_OFFSETS.setdefault(tz, {})[year] = offsets
+    return offsets
+
+# Memos of the month and year ranges: a hit is cheaper than their two conversions, and the traffic is
+# skewed toward a few recent months. Errors are not memoized, so that they are counted on every call.
+# ConvertDayToTimestamp is not memoized: a memo lookup costs about as much as the conversion itself.
+MONTH_RANGE_CACHE = MemoCache("GetMonthRange", CONVERSION_CACHE_SIZE)
+YEAR_RANGE_CACHE = MemoCache("GetYearRange", CONVERSION_CACHE_SIZE)
+# Reported by GetConversionCacheStats, with the memos of the routes built on these conversions
+CONVERSION_CACHES = [MONTH_RANGE_CACHE, YEAR_RANGE_CACHE]
+
+def ConvertDayToTimestamp(day: int, month: int, year: int, tz: str = DEFAULT_TIMEZONE) -> tuple[int, str]:
+    """
+    Convert a given day (e.g., 01/01/2025) with defaul time 00:00:00
+    into a Unix timestamp (e.g., 1735743797).
+    Input: day, month, year (integers), tz (IANA timezone name of the midnight, default from config).
+    Output: timestamp (in seconds), error message (if any).
+    """
+
+    if (1970 < year <= _MAX_YEAR) and (1 <= month <= 12):
+        cumulativeDays, daysInMonth = _MONTH_TABLE[_LEAP_TABLE[year]][month]
+        if 1 <= day <= daysInMonth:
+            dayOfYear = cumulativeDays + day - 1
+            unixTimestamp = (_YEAR_START_DAYS[year] + dayOfYear) * SECONDS_PER_DAY
+            if tz == "UTC":
+                return unixTimestamp, None
+            try:
+                offsets = _YEAR_OFFSETS[tz][year]
+            except KeyError:
+                offsets = loadYearOffsets(tz, year)
+                if offsets is None:
+                    CONVERSION_ERRORS.inc(("ConvertDayToTimestamp", "timezone"))
+                    return 0, timezoneError(tz)
+            return unixTimestamp - offsets[dayOfYear], None
+
+    CONVERSION_ERRORS.inc(("ConvertDayToTimestamp", "date"))
+    return 0, validateDate(day, month, year)
+
+def midnightOffsets(years: np.ndarray, dayOfYear: np.ndarray, tz: str) -> np.ndarray:
+    """
+    Vectorized lookup of the UTC offset at local midnight of many days.
+    The offsets of the distinct years are gathered once, then every item is looked up by (year, day of year).
+    Input: years, dayOfYear (int64 arrays of valid days), tz (known timezone).
+    Output: int64 array of offsets (in seconds).
+    """
+    uniqueYears, inverse = np.unique(years, return_inverse=True)
+    offsets = np.zeros((len(uniqueYears), 366), dtype=np.int64)
+    for i, year in enumerate(uniqueYears.tolist()):
+        yearOffsets = getYearOffsets(tz, year)
+        offsets[i, :len(yearOffsets)] = yearOffsets
+    return offsets[inverse, dayOfYear]
+
+def ConvertDaysToTimestamps(days: list[int], months: list[int], years: list[int], tz: str = DEFAULT_TIMEZONE) -> tuple[np.ndarray, list[str | None]]:
+    """
+    Convert arrays of days, months and years into Unix timestamps in one vectorized pass.
+    The validation rules are the same as ConvertDayToTimestamp.
+    Input: days, months, years (sequences of integers with the same length), tz (IANA timezone name).
+    Output:
+        timestamps (np.ndarray): int64 timestamps (in seconds), 0 where the date is invalid.
+        errors (List[str | None]): error message per item, None where the date is valid.
+    """
+
+    days = np.asarray(days, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    years = np.asarray(years, dtype=np.int64)
+    if not (days.shape == months.shape == years.shape):
+        raise ValueError("days, months and years must have the same length.")
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    monthIndex = np.clip(months - 1, 0, 11)
+    maxDay = _DAYS_IN_MONTH[monthIndex] + (leap & (months == 2))
+    valid = (years > 1970) & (years <= _MAX_YEAR) & (months >= 1) & (months <= 12) & (days >= 1) & (days <= maxDay)
+
+    # Days since 01/01/1970 for every item (garbage for invalid items, masked out below)
+    previousYear = years - 1
+    leapYearsBefore = previousYear // 4 - previousYear // 100 + previousYear // 400 - _LEAP_YEARS_BEFORE_EPOCH
+    dayOfYear = _CUMULATIVE_DAYS[monthIndex] + (leap & (months > 2)) + days - 1
+    epochDays = 365 * (years - 1970) + leapYearsBefore + dayOfYear
+
+    timestamps = np.zeros(days.shape, dtype=np.int64)
+    errors = [None] * len(days)
+    invalidItems = np.flatnonzero(~valid)
+    for i in invalidItems:
+        errors[i] = validateDate(int(days[i]), int(months[i]), int(years[i]))
+    if len(invalidItems):
+        CONVERSION_ERRORS.inc(("ConvertDaysToTimestamps", "date"), len(invalidItems))
+    if getZone(tz) is None:
+        validItems = np.flatnonzero(valid)
+        for i in validItems:
+            errors[i] = timezoneError(tz)
+        if len(validItems):
+            CONVERSION_ERRORS.inc(("ConvertDaysToTimestamps", "timezone"), len(validItems))
+        return timestamps, errors
+
+    timestamps[valid] = epochDays[valid] * SECONDS_PER_DAY
+    if tz != "UTC":
+        timestamps[valid] -= midnightOffsets(years[valid], dayOfYear[valid], tz)
+
+    return timestamps, errors
+
+def civilFromDays(epochDays: int) -> tuple[int, int, int]:
+    """
+    Inverse of the days-from-civil arithmetic: turn days since 01/01/1970 into a date.
+    Input: epochDays (int).
+    Output: day, month, year (integers).
+    """
+    shifted = epochDays + 719468 # Days since 01/03/0000, so that the leap day ends the year
+    era = shifted // 146097
+    dayOfEra = shifted - era * 146097
+    yearOfEra = (dayOfEra - dayOfEra // 1460 + dayOfEra // 36524 - dayOfEra // 146096) // 365
+    dayOfShiftedYear = dayOfEra - (365 * yearOfEra + yearOfEra // 4 - yearOfEra // 100)
+    shiftedMonth = (5 * dayOfShiftedYear + 2) // 153
+    day = dayOfShiftedYear - (153 * shiftedMonth + 2) // 5 + 1
+    month = shiftedMonth + 3 if shiftedMonth < 10 else shiftedMonth - 9
+    return day, month, yearOfEra + era * 400 + (month <= 2)
+
+def civilFromDaysArray(epochDays: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized civilFromDays over an int64 array. Output: days, months, years arrays."""
+    shifted = epochDays + 719468
+    era = shifted // 146097
+    dayOfEra = shifted - era * 146097
+    yearOfEra = (dayOfEra - dayOfEra // 1460 + dayOfEra // 36524 - dayOfEra // 146096) // 365
+    dayOfShiftedYear = dayOfEra - (365 * yearOfEra + yearOfEra // 4 - yearOfEra // 100)
+    shiftedMonth = (5 * dayOfShiftedYear + 2) // 153
+    days = dayOfShiftedYear - (153 * shiftedMonth + 2) // 5 + 1
+    months = np.where(shiftedMonth < 10, shiftedMonth + 3, shiftedMonth - 9)
+    return days, months, yearOfEra + era * 400 + (months <= 2)
+
+def localMidnight(epochDays: int, tz: str) -> int:
+    """Return the timestamp of local midnight (in a known timezone) of the day epochDays."""
+    year = civilFromDays(epochDays)[2]
+    return epochDays * SECONDS_PER_DAY - getYearOffsets(tz, year)[epochDays - _YEAR_START_DAYS[year]]
+
+def localMidnightsArray(epochDays: np.ndarray, tz: str) -> np.ndarray:
+    """Vectorized localMidnight over an int64 array."""
+    years = civilFromDaysArray(epochDays)[2]
+    return epochDays * SECONDS_PER_DAY - midnightOffsets(years, epochDays - _YEAR_START_DAYS_ARRAY[years], tz)
+
+def ConvertTimestampToDay(timestamp: int, tz: str = DEFAULT_TIMEZONE) -> tuple[int, int, int, str]:
+    """
+    Convert a Unix timestamp (e.g., 1735689600) into the day it falls on (e.g., 01/01/2025) in a timezone.
+    Inverse of ConvertDayToTimestamp, with the same year range and error messages.
+    Input: timestamp (in seconds), tz (IANA timezone name, default from config).
+    Output: day, month, year (integers, 0 on error), error message (if any).
     """
 
+    if not (_MIN_LOOKUP_TIMESTAMP <= timestamp < _MAX_LOOKUP_TIMESTAMP):
+        CONVERSION_ERRORS.inc(("ConvertTimestampToDay", "date"))
+        return 0, 0, 0, validateDate(1, 1, 1970 if timestamp < _MIN_LOOKUP_TIMESTAMP else _MAX_YEAR + 1)
+
+    epochDays = timestamp // SECONDS_PER_DAY
+    if tz != "UTC":
+        if getZone(tz) is None:
+            CONVERSION_ERRORS.inc(("ConvertTimestampToDay", "timezone"))
+            return 0, 0, 0, timezoneError(tz)
+        # The offset at UTC midnight is a guess, the local day is then found between two local midnights
+        guessOffset = epochDays * SECONDS_PER_DAY - localMidnight(epochDays, tz)
+        epochDays = (timestamp + guessOffset) // SECONDS_PER_DAY
+        if timestamp < localMidnight(epochDays, tz):
+            epochDays -= 1
+        elif timestamp >= localMidnight(epochDays + 1, tz):
+            epochDays += 1
+
+    day, month, year = civilFromDays(epochDays)
+    if (year <= 1970) or (year > _MAX_YEAR):
+        CONVERSION_ERRORS.inc(("ConvertTimestampToDay", "date"))
+        return 0, 0, 0, validateDate(1, 1, year)
+    return day, month, year, None
+
+def ConvertTimestampsToDays(timestamps: list[int], tz: str = DEFAULT_TIMEZONE) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[str | None]]:
+    """
+    Convert an array of Unix timestamps into days, months and years in one vectorized pass.
+    The validation rules are the same as ConvertTimestampToDay.
+    Input: timestamps (sequence of integers), tz (IANA timezone name).
+    Output:
+        days, months, years (np.ndarray): int64 arrays, 0 where the timestamp is invalid.
+        errors (List[str | None]): error message per item, None where the timestamp is valid.
+    """
+
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    inWindow = (timestamps >= _MIN_LOOKUP_TIMESTAMP) & (timestamps < _MAX_LOOKUP_TIMESTAMP)
+    lookupTimestamps = np.where(inWindow, timestamps, _YEAR_START_DAYS[1971] * SECONDS_PER_DAY) # Invalid items are masked out below
+    epochDays = lookupTimestamps // SECONDS_PER_DAY
+    zoneKnown = getZone(tz) is not None
+    if zoneKnown and tz != "UTC":
+        # The offset at UTC midnight is a guess, the local day is then found between two local midnights
+        epochDays = (lookupTimestamps + epochDays * SECONDS_PER_DAY - localMidnightsArray(epochDays, tz)) // SECONDS_PER_DAY
+        epochDays -= lookupTimestamps < localMidnightsArray(epochDays, tz)
+        epochDays += lookupTimestamps >= localMidnightsArray(epochDays + 1, tz)
+
+    days, months, years = civilFromDaysArray(epochDays)
+    years = np.where(inWindow, years, np.where(timestamps < _MIN_LOOKUP_TIMESTAMP, 1970, _MAX_YEAR + 1))
+    valid = (years > 1970) & (years <= _MAX_YEAR)
+
+    errors = [None] * len(timestamps)
+    invalidItems = np.flatnonzero(~valid)
+    for i in invalidItems:
+        errors[i] = validateDate(1, 1, int(years[i]))
+    if len(invalidItems):
+        CONVERSION_ERRORS.inc(("ConvertTimestampsToDays", "date"), len(invalidItems))
+    if not zoneKnown:
+        validItems = np.flatnonzero(valid)
+        for i in validItems:
+            errors[i] = timezoneError(tz)
+        if len(validItems):
+            CONVERSION_ERRORS.inc(("ConvertTimestampsToDays", "timezone"), len(validItems))
+        valid[:] = False
+
+    return np.where(valid, days, 0), np.where(valid, months, 0), np.where(valid, years, 0), errors
+
+def startOfNextYear(year: int, tz: str) -> tuple[int, str]:
+    """
+    Timestamp of local midnight on 01/01/(year + 1), also for _MAX_YEAR, whose next year ConvertDayToTimestamp rejects:
+    it is then taken one second after 23:59:59 on 31/12/_MAX_YEAR, the last second zoneinfo can represent.
+    Input: year (int), tz (IANA timezone name).
+    Output: timestamp (in seconds), error message (if any).
+    """
+    if year != _MAX_YEAR:
+        return ConvertDayToTimestamp(1, 1, year + 1, tz)
+    zone = getZone(tz)
+    if zone is None:
+        return 0, timezoneError(tz)
+    return int(datetime(_MAX_YEAR, 12, 31, 23, 59, 59, tzinfo=zone).timestamp()) + 1, None
+
+def getMonthRange(month: int, year: int, tz: str) -> tuple[int, int, str]:
+    """GetMonthRange without the memo."""
+
     # Calculate the start of the month
-    startOfMonth, err1 = ConvertDayToTimestamp(1, month, year)
-    if err1:
-        return startOfMonth, 0, err1
+    startOfMonth, err = ConvertDayToTimestamp(1, month, year, tz)
+    if err:
+        return startOfMonth, 0, err
 
     # Calculate the start of the next month
     if month == 12:
-        endOfMonth, err2 = ConvertDayToTimestamp(1, 1, year + 1)
+        endOfMonth, err = startOfNextYear(year, tz)
     else:
-        endOfMonth, err2 = ConvertDayToTimestamp(1, month + 1, year)
-    endOfMonth -= 1 if endOfMonth > 0 else 0 # Adjust to the end of the month (from 00:00:00 of 01/mm + 1/yyyy to 23:59:59 of dd/mm/yyyy)
+        endOfMonth, err = ConvertDayToTimestamp(1, month + 1, year, tz)
+    if err:
+        return startOfMonth, 0, err
+    endOfMonth -= 1 # Adjust to the end of the month (from 00:00:00 of 01/mm + 1/yyyy to 23:59:59 of dd/mm/yyyy)
+
+    return startOfMonth, endOfMonth, None
+
+def GetMonthRange(month: int, year: int, tz: str = DEFAULT_TIMEZONE) -> tuple[int, int, str]:
+    """
+    Calculate the Unix timestamp range for a given month of a year.
+    Input: month, year (integers), tz (IANA timezone name, default from config).
+    Output:
+        startOfMonth (int): Unix timestamp for the start of the month (00:00:00 on the 1st day).
+        endOfMonth (int): Unix timestamp for the end of the month (23:59:59 on the last day).
+        err (str or None): An error message if input is invalid, or None if no errors.
+    """
+    key = (month, year, tz)
+    result = MONTH_RANGE_CACHE.get(key)
+    if result is None:
+        result = getMonthRange(month, year, tz)
+        if result[2] is None:
+            MONTH_RANGE_CACHE.put(key, result)
+    return result
 
-    err = err1 if err1 == err2 else err2 or err1 or f"{err1}; {err2}"
+def getYearRange(year: int, tz: str) -> tuple[int, int, str]:
+    """GetYearRange without the memo."""
 
-    return startOfMonth, endOfMonth, err
+    # Calculate the start of the year
+    startOfYear, err = ConvertDayToTimestamp(1, 1, year, tz)
+    if err:
+        return startOfYear, 0, err
 
-def GetYearRange(year: int) -> tuple[int, int, str]:
+    # Calculate the start of the next year
+    endOfYear, err = startOfNextYear(year, tz)
+    if err:
+        return startOfYear, 0, err
+    endOfYear -= 1 # Adjust to 31st December 23:59:59
+
+    return startOfYear, endOfYear, None
+
+def GetYearRange(year: int, tz: str = DEFAULT_TIMEZONE) -> tuple[int, int, str]:
     """
     Calculate the Unix timestamp range for a given year.
-    Input: year (integers).
-    Output: 
+    Input: year (integers), tz (IANA timezone name, default from config).
+    Output:
         startOfYear (int): Unix timestamp for the start of the year (00:00:00 on 01/01/year).
         endOfYear (int): Unix timestamp for the end of the month (23:59:59 on 31/12/year).
         err (str or None): An error message if input is invalid, or None if no errors.
     """
+    key = (year, tz)
+    result = YEAR_RANGE_CACHE.get(key)
+    if result is None:
+        result = getYearRange(year, tz)
+        if result[2] is None:
+            YEAR_RANGE_CACHE.put(key, result)
+    return result
 
-    # Calculate the start of the year
-    startOfYear, err1 = ConvertDayToTimestamp(1, 1, year)
-    if err1:
-        return startOfYear, 0, err1
-    
-    # Calculate the start of the next year
-    endOfYear, err2 = ConvertDayToTimestamp(1, 1, year + 1)
-    endOfYear -= 1 if endOfYear > 0 else 0 # Adjust to 31st December 23:59:59
-    err = err1 if err1 == err2 else err2 or err1 or f"{err1}; {err2}"
+def GetConversionCacheStats() -> dict[str, dict]:
+    """Return the memo counters of each conversion (see MemoCache.getStats)."""
+    return {cache.name: cache.getStats() for cache in CONVERSION_CACHES}
 
-    return startOfYear, endOfYear, err
\ No newline at end of file
+REGISTRY.callback(
+    "conversion_cache_hits_total", "Conversions answered from the memo.", "counter", ("function",),
+    lambda: {(name,): stats["hits"] for name, stats in GetConversionCacheStats().items()}
+)
+REGISTRY.callback(
+    "conversion_cache_misses_total", "Conversions computed (not found in the memo).", "counter", ("function",),
+    lambda: {(name,): stats["misses"] for name, stats in GetConversionCacheStats().items()}
+)
+REGISTRY.callback(
+    "conversion_cache_size", "Entries in the conversion memo.", "gauge", ("function",),
+    lambda: {(name,): stats["size"] for name, stats in GetConversionCacheStats().items()}
+)
@@ -0,0 +1,40 @@
+import os
+from app.utils.logging_setup import logger
+
+CPU_AFFINITY_ENV = "APP_CPU_AFFINITY_DIR" # Lock directory set by the launcher (app.server) with SERVER_CPU_AFFINITY
+
+_cpuLock = None # Lock file of the CPU this worker is pinned to, held while the process lives
+
+def GetAvailableCpus() -> list[int]:
+    """Return the CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def PinWorkerToCpu():
+    """
+    Pin the current worker to a CPU core no other worker of the launcher holds (Linux only).
+    Each worker takes the lock file of the first free core, so that a restarted worker reuses the core
+    of the worker it replaces. A worker is left unpinned when every core is taken.
+    Does nothing unless the launcher enabled SERVER_CPU_AFFINITY.
+    """
+    global _cpuLock
+    lockDir = os.environ.get(CPU_AFFINITY_ENV)
+    if not lockDir or _cpuLock is not None:
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU pinning is not supported on this platform.")
+        return
+    import fcntl
+    for cpu in GetAvailableCpus():
+        lock = open(os.path.join(lockDir, f"cpu-{cpu}.lock"), "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            continue
+        _cpuLock = lock
+        os.sched_setaffinity(0, {cpu})
+        logger.info("Worker %s pinned to CPU %s", os.getpid(), cpu)
+        return
+    logger.warning("Worker %s not pinned: every CPU already has a worker.", os.getpid())
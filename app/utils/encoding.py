@@ -0,0 +1,135 @@
+"""
+Response encodings negotiated with the Accept header for array-shaped results:
+    - application/json (default): orjson, numpy arrays are serialized without a Python list.
+    - application/msgpack (or application/x-msgpack): MessagePack map with the same fields as the JSON.
+    - application/x-int64le: the int64 arrays only, concatenated as raw little-endian int64, in the order
+      listed by the X-Int64-Fields header, each X-Int64-Length items long. Null items are INT64_NULL, and
+      the other fields (error messages, counters) are left out: ask for JSON to get them.
+"""
+from typing import Any, Dict, Sequence
+import numpy as np
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+
+try:
+    import msgpack
+except ImportError: # msgpack is then not offered
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+INT64_MEDIA_TYPE = "application/x-int64le"
+INT64_NULL = np.iinfo(np.int64).min
+_MEDIA_TYPE_ALIASES = {"application/x-msgpack": MSGPACK_MEDIA_TYPE}
+
+class NullableArray:
+    """An int64 array with a validity mask, encoded as a list with nulls or as int64 with INT64_NULL."""
+    __slots__ = ("values", "valid")
+
+    def __init__(self, values: np.ndarray, valid: np.ndarray = None):
+        """Input: values (int64 array), valid (boolean mask, None if every item is valid)."""
+        self.values = values
+        self.valid = None if valid is None or valid.all() else valid
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def toJson(self) -> np.ndarray | list[int | None]:
+        """The array itself when every item is valid (serialized by orjson), else a list with None."""
+        if self.valid is None:
+            return self.values
+        result = self.values.tolist()
+        for i in np.flatnonzero(~self.valid):
+            result[i] = None
+        return result
+
+    def toInt64(self) -> np.ndarray:
+        return self.values if self.valid is None else np.where(self.valid, self.values, INT64_NULL)
+
+def parseAccept(accept: str) -> list[tuple[str, float]]:
+    """Split an Accept header into (media range, quality) pairs."""
+    ranges = []
+    for part in accept.split(","):
+        mediaRange, *params = part.split(";")
+        mediaRange = mediaRange.strip().lower()
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if mediaRange:
+            ranges.append((_MEDIA_TYPE_ALIASES.get(mediaRange, mediaRange), quality))
+    return ranges
+
+def NegotiateMediaType(accept: str | None, offered: Sequence[str]) -> str:
+    """
+    Pick the offered media type the Accept header prefers.
+    Input: accept (header value or None), offered (media types, the first one wins ties and is the default).
+    Output: the chosen media type; the default when nothing offered is acceptable.
+    """
+    if not accept:
+        return offered[0]
+    ranges = parseAccept(accept)
+    best, bestQuality = offered[0], 0.0
+    for mediaType in offered:
+        # The most specific matching range gives the quality (RFC 9110)
+        quality, specificity = 0.0, -1
+        mainType = mediaType.split("/")[0]
+        for mediaRange, rangeQuality in ranges:
+            if mediaRange == mediaType:
+                rangeSpecificity = 2
+            elif mediaRange == f"{mainType}/*":
+                rangeSpecificity = 1
+            elif mediaRange == "*/*":
+                rangeSpecificity = 0
+            else:
+                continue
+            if rangeSpecificity > specificity:
+                quality, specificity = rangeQuality, rangeSpecificity
+        if quality > bestQuality:
+            best, bestQuality = mediaType, quality
+    return best
+
+def toPlain(value: Any, forJson: bool) -> Any:
+    if isinstance(value, NullableArray):
+        value = value.toJson()
+    if isinstance(value, np.ndarray) and not forJson:
+        return value.tolist()
+    return value
+
+def EncodeResponse(request: Request, content: Dict[str, Any], int64Fields: Sequence[str] = ()) -> Response:
+    """
+    Encode an array-shaped result in the media type negotiated with the Accept header.
+    Input:
+        request: the request, for its Accept header.
+        content (dict): the response fields; arrays are numpy arrays or NullableArray.
+        int64Fields (sequence of str): the fields sent as application/x-int64le, which is only offered when
+            they are all present (e.g. not for an error response).
+    Output: Response, with a Vary: Accept header.
+    """
+    offered = [JSON_MEDIA_TYPE]
+    if msgpack is not None:
+        offered.append(MSGPACK_MEDIA_TYPE)
+    if int64Fields and all(content.get(field) is not None for field in int64Fields):
+        offered.append(INT64_MEDIA_TYPE)
+    mediaType = NegotiateMediaType(request.headers.get("accept"), offered)
+    headers = {"Vary": "Accept"}
+
+    if mediaType == INT64_MEDIA_TYPE:
+        arrays = [content[field] for field in int64Fields]
+        arrays = [array.toInt64() if isinstance(array, NullableArray) else np.asarray(array) for array in arrays]
+        lengths = {len(array) for array in arrays}
+        if len(lengths) == 1:
+            headers["X-Int64-Fields"] = ",".join(int64Fields)
+            headers["X-Int64-Length"] = str(lengths.pop())
+            body = np.concatenate(arrays).astype("<i8", copy=False).tobytes()
+            return Response(body, media_type=INT64_MEDIA_TYPE, headers=headers)
+        mediaType = JSON_MEDIA_TYPE # Arrays of different lengths cannot be told apart
+
+    if mediaType == MSGPACK_MEDIA_TYPE:
+        body = msgpack.packb({key: toPlain(value, False) for key, value in content.items()})
+        return Response(body, media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+    return ORJSONResponse({key: toPlain(value, True) for key, value in content.items()}, headers=headers)
@@ -0,0 +1,34 @@
+import hashlib
+from fastapi import Request
+from fastapi.responses import Response
+
+def ComputeETag(body: bytes) -> str:
+    """
+    Strong ETag of a response body: the same body gets the same ETag in every worker and release.
+    Input: body (bytes).
+    Output: quoted ETag, e.g. '"9f86d081884c7d659a2feaa0c55ad015"'.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def matchesETag(ifNoneMatch: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header with an ETag (RFC 9110)."""
+    if not ifNoneMatch:
+        return False
+    if ifNoneMatch.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in ifNoneMatch.split(","))
+
+def CacheableResponse(request: Request, body: bytes, maxAge: int, mediaType: str = "application/json", etag: str = None) -> Response:
+    """
+    Response of a result that only depends on the request, with ETag and Cache-Control headers.
+    A GET or HEAD request whose If-None-Match holds the ETag gets a 304 without body.
+    Input:
+        request, body (bytes), maxAge (int): seconds clients and CDNs may cache it (0: revalidate every time).
+        mediaType (str), etag (str): ComputeETag(body) if it is already known, e.g. memoized with the body.
+    Output: Response.
+    """
+    etag = etag or ComputeETag(body)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={maxAge}" if maxAge else "no-cache"}
+    if request.method in ("GET", "HEAD") and matchesETag(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=mediaType, headers=headers)
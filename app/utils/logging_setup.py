@@ -1,6 +1,12 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+from app.config import LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_RATE
 
 class CustomFormatter(logging.Formatter):
     """Custom formatter for coloring log level and timestamp."""
@@ -17,14 +23,93 @@ class CustomFormatter(logging.Formatter):
     def format(self, record):
         # Get color for the log level
         level_color = self.COLORS.get(record.levelno, self.RESET)
-        
-        # Apply color only to the levelname and asctime
+
+        # Color a copy: the record is shared with the file handlers, which must not get ANSI codes
+        record = logging.makeLogRecord(record.__dict__)
         record.levelname = f"{level_color}{record.levelname}{self.RESET}"
-        record.asctime = f"{level_color}{self.formatTime(record)}{self.RESET}"
-        
+
         # Format the log message
         return super().format(record)
 
+class JsonFormatter(logging.Formatter):
+    """Compact one-line JSON formatter: {"time", "level", "logger", "message"[, "exception"]}."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+class RateSamplingFilter(logging.Filter):
+    """
+    Let through at most `rate` records per second of each message type (the unformatted message),
+    for records at or below maxLevel. The number of dropped records of a type is appended to the
+    next record of that type that gets through. Warnings and errors are never sampled.
+    """
+
+    def __init__(self, rate: int, maxLevel: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.maxLevel = maxLevel
+        self.sampledOut = 0
+        self._lock = threading.Lock()
+        self._windows = {} # message type -> [window start second, count, dropped]
+
+    def filter(self, record):
+        if self.rate <= 0 or record.levelno > self.maxLevel:
+            return True
+        key = str(record.msg)
+        second = int(time.monotonic())
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                if len(self._windows) > 10000: # Bound the memory used by messages built with f-strings
+                    self._windows.clear()
+                window = self._windows[key] = [second, 0, 0]
+            if window[0] != second:
+                window[0], window[1] = second, 0
+            if window[1] >= self.rate:
+                window[2] += 1
+                self.sampledOut += 1
+                return False
+            window[1] += 1
+            dropped, window[2] = window[2], 0
+        if dropped:
+            record.msg = f"{record.msg} [{dropped} similar messages sampled out]"
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that does not block the logging thread on INFO/DEBUG records: they are dropped (and counted)
+    when the queue is full. WARNING and above wait up to blockTimeout seconds for room in the queue, and are
+    only dropped if the listener is stuck.
+    The message is merged on the logging thread, formatting and I/O happen on the listener thread.
+    """
+
+    def __init__(self, logQueue, blockTimeout: float = 1.0):
+        super().__init__(logQueue)
+        self.blockTimeout = blockTimeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.blockTimeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 # Create a "logs" directory if it doesn't exist
 LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -38,34 +123,47 @@ logger = logging.getLogger("system_logger")
 logger.setLevel(logging.DEBUG)  # or INFO, but we’ll handle levels per handler
 
 # Common formatter
-formatter = logging.Formatter(
-    fmt="%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
-color_formatter = CustomFormatter(
-    fmt="%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+if LOG_FORMAT == "json":
+    formatter = color_formatter = JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S%z")
+else:
+    formatter = logging.Formatter(
+        fmt="%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    color_formatter = CustomFormatter(
+        fmt="%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
 
 # 1) Handler for INFO and higher-level logs -> info.log
 info_handler = RotatingFileHandler(INFO_LOG_FILE, maxBytes=5_000_000, backupCount=3)
 info_handler.setLevel(logging.INFO)
 info_handler.setFormatter(formatter)
-logger.addHandler(info_handler)
 
 # 2) Handler for ERROR and higher-level logs -> error.log
 error_handler = RotatingFileHandler(ERROR_LOG_FILE, maxBytes=5_000_000, backupCount=3)
 error_handler.setLevel(logging.ERROR)
 error_handler.setFormatter(formatter)
-logger.addHandler(error_handler)
 
 # You can optionally add a console handler (useful while debugging locally).
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(formatter)
 console_handler.setFormatter(color_formatter)
-logger.addHandler(console_handler)
+
+# The request threads only put records on a bounded queue; a listener thread formats and writes them.
+sampling_filter = RateSamplingFilter(LOG_SAMPLE_RATE)
+queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+queue_handler.addFilter(sampling_filter)
+logger.addHandler(queue_handler)
+
+listener = QueueListener(queue_handler.queue, info_handler, error_handler, console_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop) # Writes the queued records before exit
 
 def GetLogger():
     """Return the custom system logger."""
-    return logger
\ No newline at end of file
+    return logger
+
+def GetLoggingStats():
+    """Return the number of log records dropped on a full queue and sampled out."""
+    return {"dropped": queue_handler.dropped, "sampledOut": sampling_filter.sampledOut}
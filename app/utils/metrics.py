@@ -0,0 +1,299 @@
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def escapeLabelValue(value: Any) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def formatLabels(labelNames: tuple, labelValues: tuple, extra: str = "") -> str:
+    """Format {name="value",...}, with an optional extra pre-formatted label (e.g. le="0.5")."""
+    pairs = [f'{name}="{escapeLabelValue(value)}"' for name, value in zip(labelNames, labelValues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def formatValue(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class ThreadShards:
+    """
+    One dict per thread, so that recording is a plain dict update without a lock:
+    each shard has a single writer, and the shards are only merged when metrics are collected.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+
+    def get(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def all(self) -> list:
+        with self._lock:
+            return list(self._shards)
+
+class Counter:
+    """A monotonically increasing counter with labels, sharded per thread."""
+    metricType = "counter"
+
+    def __init__(self, name: str, help: str, labelNames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelNames = tuple(labelNames)
+        self._shards = ThreadShards()
+
+    def inc(self, labelValues: tuple = (), amount: float = 1):
+        shard = self._shards.get()
+        shard[labelValues] = shard.get(labelValues, 0) + amount
+
+    def collect(self) -> Dict[tuple, float]:
+        totals = {}
+        for shard in self._shards.all():
+            for labelValues, value in list(shard.items()):
+                totals[labelValues] = totals.get(labelValues, 0) + value
+        return totals
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{formatLabels(self.labelNames, labelValues)} {formatValue(value)}"
+            for labelValues, value in sorted(self.collect().items())
+        ]
+
+class Gauge(Counter):
+    """A value that goes up and down (e.g. in-flight requests), sharded per thread."""
+    metricType = "gauge"
+
+    def dec(self, labelValues: tuple = (), amount: float = 1):
+        self.inc(labelValues, -amount)
+
+class Histogram:
+    """A histogram with labels and fixed buckets, sharded per thread."""
+    metricType = "histogram"
+
+    def __init__(self, name: str, help: str, labelNames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelNames = tuple(labelNames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = ThreadShards()
+
+    def observe(self, value: float, labelValues: tuple = ()):
+        shard = self._shards.get()
+        series = shard.get(labelValues)
+        if series is None:
+            series = shard[labelValues] = [0] * (len(self.buckets) + 3) # bucket counts, +Inf, sum, count
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def collect(self) -> Dict[tuple, list]:
+        totals = {}
+        for shard in self._shards.all():
+            for labelValues, series in list(shard.items()):
+                total = totals.setdefault(labelValues, [0] * len(series))
+                for i, value in enumerate(list(series)):
+                    total[i] += value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = []
+        for labelValues, series in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{formatValue(bound)}"'
+                lines.append(f"{self.name}_bucket{formatLabels(self.labelNames, labelValues, le)} {cumulative}")
+            labels = formatLabels(self.labelNames, labelValues)
+            lines.append(f"{self.name}_sum{labels} {formatValue(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+class CallbackMetric:
+    """A gauge or counter whose values are read from a callback when metrics are collected."""
+
+    def __init__(self, name: str, help: str, metricType: str, labelNames: Iterable[str], callback: Callable[[], Dict[tuple, float]]):
+        self.name = name
+        self.help = help
+        self.metricType = metricType
+        self.labelNames = tuple(labelNames)
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{formatLabels(self.labelNames, labelValues)} {formatValue(value)}"
+            for labelValues, value in sorted(self.callback().items())
+        ]
+
+class MetricsRegistry:
+    """The metrics exposed by /metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelNames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelNames))
+
+    def gauge(self, name: str, help: str, labelNames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelNames))
+
+    def histogram(self, name: str, help: str, labelNames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelNames, buckets))
+
+    def callback(self, name: str, help: str, metricType: str, labelNames: Iterable[str], callback: Callable) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, metricType, labelNames, callback))
+
+    def render(self) -> str:
+        """Render every metric. A failing callback metric is skipped."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.render()
+            except Exception:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.metricType}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the end of the response body.", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being handled.", ("method", "route"))
+DB_OPERATION_DURATION = REGISTRY.histogram("db_operation_duration_seconds", "Database manager method latency.", ("db", "operation"))
+DB_OPERATION_ERRORS = REGISTRY.counter("db_operation_errors_total", "Database manager methods that raised.", ("db", "operation"))
+CONVERSION_ERRORS = REGISTRY.counter("conversion_errors_total", "Rejected date and timestamp conversions.", ("function", "reason"))
+
+def Timed(db: str):
+    """
+    Decorator recording the latency and errors of a database manager method, labelled with its name.
+    Generators are timed until they are exhausted or closed, coroutines until they return.
+    """
+    def decorator(fn):
+        labels = (db, fn.__name__)
+
+        if inspect.isasyncgenfunction(fn):
+            @wraps(fn)
+            async def asyncGenWrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                except Exception:
+                    DB_OPERATION_ERRORS.inc(labels)
+                    raise
+                finally:
+                    DB_OPERATION_DURATION.observe(time.perf_counter() - start, labels)
+            return asyncGenWrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def asyncWrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    DB_OPERATION_ERRORS.inc(labels)
+                    raise
+                finally:
+                    DB_OPERATION_DURATION.observe(time.perf_counter() - start, labels)
+            return asyncWrapper
+
+        if inspect.isgeneratorfunction(fn):
+            @wraps(fn)
+            def genWrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    yield from fn(*args, **kwargs)
+                except Exception:
+                    DB_OPERATION_ERRORS.inc(labels)
+                    raise
+                finally:
+                    DB_OPERATION_DURATION.observe(time.perf_counter() - start, labels)
+            return genWrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                DB_OPERATION_ERRORS.inc(labels)
+                raise
+            finally:
+                DB_OPERATION_DURATION.observe(time.perf_counter() - start, labels)
+        return wrapper
+    return decorator
+
+def GetRouteTemplate(scope) -> str:
+    """
+    Return the path template of the route matching an HTTP request (e.g. /day2timestamp/timestamp), or "unmatched".
+    The result is stored in the scope, so that the middlewares of a request match its route once.
+    """
+    route = scope.get("routeTemplate")
+    if route is None:
+        from starlette.routing import Match
+        route = "unmatched"
+        for candidate in scope["app"].router.routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = getattr(candidate, "path", "unmatched")
+                break
+        scope["routeTemplate"] = route
+    return route
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the in-flight count and latency of HTTP requests per route template
+    (e.g. /day2timestamp/timestamp), so path parameters do not create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        labels = (scope["method"], GetRouteTemplate(scope))
+        status = [500]
+
+        async def sendWithStatus(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(labels)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, sendWithStatus)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(labels)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, labels + (str(status[0]),))
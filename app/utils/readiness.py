@@ -0,0 +1,140 @@
+import asyncio
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict
+from app.utils.logging_setup import logger
+from app.utils.metrics import REGISTRY
+
+class BackendState:
+    """Readiness of one backend: "starting", "ready" or "down", with the last error."""
+    __slots__ = ("name", "warmUp", "required", "state", "error", "attempts", "readySince", "task")
+
+    def __init__(self, name: str, warmUp: Callable[[], Awaitable], required: bool):
+        self.name = name
+        self.warmUp = warmUp
+        self.required = required
+        self.state = "starting"
+        self.error = None
+        self.attempts = 0
+        self.readySince = None
+        self.task = None # Current warm-up attempt
+
+class Readiness:
+    """
+    Concurrent, fault-tolerant warm-up of the backends, and the state behind the /ready probe.
+    Every backend is warmed up at the same time, each within a timeout. The application then starts
+    in degraded mode when only optional backends are down, and reconnects them in the background:
+    an attempt that times out keeps running, and marks its backend ready if it eventually succeeds.
+    """
+
+    def __init__(self):
+        self._backends: Dict[str, BackendState] = {}
+        self.started = False
+
+    def register(self, name: str, warmUp: Callable[[], Awaitable], required: bool = False):
+        """
+        Input:
+            name (str): e.g. "postgres".
+            warmUp (callable): coroutine function connecting the backend, raises if it is down.
+            required (bool): the application does not start if this backend is down.
+        """
+        self._backends[name] = BackendState(name, warmUp, required)
+
+    async def warmUp(self, timeout: float):
+        """
+        Warm up every backend concurrently, waiting at most timeout seconds for each.
+        Raises RuntimeError if a required backend is down.
+        """
+        start = time.perf_counter()
+        await asyncio.gather(*(self._attempt(backend, timeout) for backend in self._backends.values()))
+        self.started = True
+        down = [backend for backend in self._backends.values() if backend.state != "ready"]
+        missing = [backend.name for backend in down if backend.required]
+        if missing:
+            raise RuntimeError(f"Required backends are down: {', '.join(missing)}")
+        if down:
+            logger.warning("Started in degraded mode, down: %s", ", ".join(backend.name for backend in down))
+        logger.info("Backends warmed up in %.2f s", time.perf_counter() - start)
+
+    async def _attempt(self, backend: BackendState, timeout: float):
+        if backend.task and not backend.task.done():
+            return # The previous attempt is still running
+        backend.attempts += 1
+        backend.task = asyncio.ensure_future(backend.warmUp())
+        backend.task.add_done_callback(partial(self._onDone, backend))
+        try:
+            await asyncio.wait_for(asyncio.shield(backend.task), timeout)
+        except asyncio.TimeoutError:
+            if not backend.task.done():
+                backend.state, backend.error = "down", f"no answer after {timeout} s"
+                logger.error("Backend %s did not answer within %s s", backend.name, timeout)
+        except Exception:
+            pass # Recorded by _onDone
+
+    def _onDone(self, backend: BackendState, task: asyncio.Task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            backend.state, backend.error, backend.readySince = "ready", None, time.time()
+            logger.info("Backend %s is ready (attempt %s)", backend.name, backend.attempts)
+        else:
+            backend.state, backend.error = "down", f"{type(error).__name__}: {str(error).strip()}"
+            logger.error("Backend %s is down: %s", backend.name, backend.error)
+
+    async def reconnect(self, interval: float, timeout: float):
+        """Retry the warm-up of the backends that are down every interval seconds, until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            down = [backend for backend in self._backends.values() if backend.state == "down"]
+            if down:
+                await asyncio.gather(*(self._attempt(backend, timeout) for backend in down))
+
+    def cancel(self):
+        """Cancel the warm-up attempts still running, at shutdown."""
+        for backend in self._backends.values():
+            if backend.task and not backend.task.done():
+                backend.task.cancel()
+
+    def isReady(self) -> bool:
+        """Ready once started, while every required backend is up."""
+        return self.started and all(backend.state == "ready" for backend in self._backends.values() if backend.required)
+
+    def isBackendReady(self, name: str) -> bool:
+        """Whether a registered backend is up."""
+        backend = self._backends.get(name)
+        return backend is not None and backend.state == "ready"
+
+    def getStatus(self) -> Dict[str, Any]:
+        """
+        Output: {"status": "ready" | "degraded" | "starting" | "unavailable", "backends": {name: {...}}}.
+        """
+        backends = self._backends.values()
+        if not self.started:
+            status = "starting"
+        elif not self.isReady():
+            status = "unavailable"
+        elif any(backend.state != "ready" for backend in backends):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "backends": {
+                backend.name: {
+                    "state": backend.state,
+                    "required": backend.required,
+                    "attempts": backend.attempts,
+                    "readySince": backend.readySince,
+                    "error": backend.error,
+                }
+                for backend in backends
+            },
+        }
+
+READINESS = Readiness()
+
+REGISTRY.callback(
+    "backend_up", "1 if the backend is connected, 0 if it is down or starting.", "gauge", ("backend",),
+    lambda: {(backend.name,): int(backend.state == "ready") for backend in READINESS._backends.values()}
+)
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import time
+from contextvars import ContextVar
+from app.utils.logging_setup import logger
+from app.utils.metrics import REGISTRY
+
+REQUEST_TIMEOUTS = REGISTRY.counter("http_request_timeouts_total", "HTTP requests answered 504 by the request timeout.", ("method",))
+
+# time.monotonic() deadline of the request being handled, None outside a request or without a timeout
+REQUEST_DEADLINE: ContextVar[float | None] = ContextVar("REQUEST_DEADLINE", default=None)
+
+def GetStatementTimeout() -> int | None:
+    """
+    Return the milliseconds left before the timeout of the current request, to bound its database queries.
+    Output: int (at least 1), or None outside a request or without a request timeout.
+    """
+    deadline = REQUEST_DEADLINE.get()
+    if deadline is None:
+        return None
+    return max(1, round((deadline - time.monotonic()) * 1000))
+
+class RequestTimeoutMiddleware:
+    """
+    ASGI middleware answering 504 when a request has not started its response within timeout seconds.
+    Once the response has started (e.g. a streaming response), the request is no longer limited.
+    The handler is cancelled; a sync route keeps its threadpool thread until it returns, so the handler
+    runs with REQUEST_DEADLINE set, for the database managers to bound its queries (GetStatementTimeout).
+    """
+
+    def __init__(self, app, timeout: float):
+        self.app = app
+        self.timeout = timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.timeout:
+            await self.app(scope, receive, send)
+            return
+        started = asyncio.Event()
+        timedOut = False
+
+        async def sendUnlessTimedOut(message):
+            if timedOut:
+                return
+            if message["type"] == "http.response.start":
+                started.set()
+            await send(message)
+
+        token = REQUEST_DEADLINE.set(time.monotonic() + self.timeout)
+        try:
+            handler = asyncio.ensure_future(self.app(scope, receive, sendUnlessTimedOut)) # Copies the deadline
+        finally:
+            REQUEST_DEADLINE.reset(token)
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait((handler, waiter), timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError: # The client disconnected or the server stops
+            handler.cancel()
+            raise
+        finally:
+            waiter.cancel()
+        if handler.done() or started.is_set():
+            await handler
+            return
+
+        timedOut = True
+        handler.cancel()
+        REQUEST_TIMEOUTS.inc((scope["method"],))
+        logger.error("Request timed out after %s s: %s %s", self.timeout, scope["method"], scope["path"])
+        body = json.dumps({"detail": f"Request timed out after {self.timeout} s"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 504,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+        try:
+            await handler
+        except (asyncio.CancelledError, Exception):
+            pass # The client already has its 504
@@ -0,0 +1,229 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller runs the function,
+    the others wait for its result (or its exception) instead of running it again.
+    """
+
+    class _Call:
+        __slots__ = ("event", "value", "error")
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.value = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Run fn once for all the concurrent callers of a key.
+        Input: key (hashable), fn (callable without arguments).
+        Output: (result of fn, shared), shared is True if the result came from another caller's run.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = SingleFlight._Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.value, False
+
+class MemoCache:
+    """
+    Bounded memo of a pure function, keyed by its arguments.
+    A lookup is a single dict probe, without a lock or any reordering: when full, the memo is cleared
+    and the hot keys come back on their next miss. The counters are not locked either, so concurrent
+    threads may lose a few increments.
+    """
+    __slots__ = ("name", "maxSize", "entries", "hits", "misses", "evictions")
+
+    def __init__(self, name: str, maxSize: int):
+        """Input: name (str): memoized function, maxSize (int): maximum number of entries, 0 disables the memo."""
+        self.name = name
+        self.maxSize = maxSize
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the memoized value of a key, or None."""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Memoize the value of a key (not None), clearing the memo first if it is full."""
+        if not self.maxSize:
+            return
+        if len(self.entries) >= self.maxSize:
+            self.evictions += len(self.entries)
+            self.entries = {} # Readers holding the previous dict are unaffected
+        self.entries[key] = value
+
+    def clear(self):
+        """Drop every entry."""
+        self.entries = {}
+
+    def getStats(self) -> Dict[str, Any]:
+        """
+        Return the memo counters.
+        Output: dict with size, maxSize, hits, misses, hitRatio and evictions.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxSize": self.maxSize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+class ResultCache:
+    """
+    A thread-safe in-process read-through cache of query results.
+    - Entries are keyed by a query key and the namespaces (tables, collections) the query reads.
+    - Each namespace has its own TTL. The cache holds at most maxSize entries, least recently used first out.
+    - invalidate(namespace) drops every entry reading the namespace in O(1), with a per-namespace generation.
+      A load that was running during an invalidation is returned but not cached.
+      Invalidation is per process: the caches of other workers keep their entries until they expire.
+    - Concurrent misses of the same entry run the loader once (single-flight).
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, maxSize: int = 10000, defaultTtl: float = 60.0, namespaceTtls: Dict[str, float] = None):
+        """
+        Input:
+            maxSize (int): maximum number of entries.
+            defaultTtl (float): seconds an entry is valid, 0 disables the cache.
+            namespaceTtls (dict): TTL per namespace, overriding defaultTtl. With several namespaces the smallest applies.
+        """
+        self.maxSize = maxSize
+        self.defaultTtl = defaultTtl
+        self.namespaceTtls = dict(namespaceTtls or {})
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # (namespaces, key) -> (expiresAt, generations, value)
+        self._generations = {} # namespace -> generation
+        self._epoch = 0 # Bumped by clear()
+        self._flights = SingleFlight()
+        self._stats = {
+            "hits": 0, "misses": 0, "loads": 0, "sharedLoads": 0,
+            "evictions": 0, "expirations": 0, "invalidations": 0,
+        }
+
+    def getTtl(self, namespaces: tuple) -> float:
+        """Return the TTL of an entry reading the given namespaces."""
+        return min((self.namespaceTtls.get(namespace, self.defaultTtl) for namespace in namespaces), default=self.defaultTtl)
+
+    def _snapshot(self, namespaces: tuple) -> tuple:
+        """Current generations of the namespaces (under the lock)."""
+        return (self._epoch,) + tuple(self._generations.get(namespace, 0) for namespace in namespaces)
+
+    def _lookup(self, fullKey: tuple, now: float) -> tuple[bool, Any]:
+        """Return (found, value) for a valid entry, dropping it if expired or invalidated (under the lock)."""
+        entry = self._entries.get(fullKey)
+        if entry is None:
+            return False, None
+        expiresAt, generations, value = entry
+        if expiresAt <= now or generations != self._snapshot(fullKey[0]):
+            del self._entries[fullKey]
+            self._stats["expirations"] += expiresAt <= now
+            return False, None
+        self._entries.move_to_end(fullKey)
+        return True, value
+
+    def getOrLoad(self, namespaces: Iterable[str], key: Hashable, loader: Callable[[], Any], ttl: float = None) -> Any:
+        """
+        Return the cached result of a query, or load, cache and return it.
+        Input:
+            namespaces (iterable of str): tables or collections read by the query.
+            key (hashable): normalized query and parameters.
+            loader (callable): runs the query.
+            ttl (float): seconds the result is valid, the namespace TTL by default.
+        Output: the query result.
+        """
+        namespaces = tuple(sorted(set(namespaces)))
+        ttl = self.getTtl(namespaces) if ttl is None else ttl
+        if ttl <= 0:
+            return loader()
+        fullKey = (namespaces, key)
+        with self._lock:
+            found, value = self._lookup(fullKey, time.monotonic())
+            self._stats["hits" if found else "misses"] += 1
+        if found:
+            return value
+
+        def load():
+            with self._lock:
+                found, value = self._lookup(fullKey, time.monotonic())
+                if found:
+                    return value
+                generations = self._snapshot(namespaces)
+                self._stats["loads"] += 1
+            value = loader()
+            with self._lock:
+                if generations == self._snapshot(namespaces):
+                    self._entries[fullKey] = (time.monotonic() + ttl, generations, value)
+                    self._entries.move_to_end(fullKey)
+                    while len(self._entries) > self.maxSize:
+                        self._entries.popitem(last=False)
+                        self._stats["evictions"] += 1
+            return value
+
+        value, shared = self._flights.do(fullKey, load)
+        if shared:
+            with self._lock:
+                self._stats["sharedLoads"] += 1
+        return value
+
+    def invalidate(self, namespace: str):
+        """Drop the entries reading a namespace."""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+            self._stats["invalidations"] += 1
+
+    def getStats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters.
+        Output: dict with size, maxSize, hits, misses, hitRatio, loads, sharedLoads (misses served by
+        another caller's load), evictions, expirations and invalidations.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        stats["maxSize"] = self.maxSize
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRatio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,177 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from app.config import SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAINS_PER_MINUTE, SLOW_QUERY_SCAN_CHECKS_PER_MINUTE
+from app.utils.logging_setup import logger
+from app.utils.metrics import REGISTRY
+
+SLOW_OPERATIONS = REGISTRY.counter("db_slow_operations_total", "Database operations slower than the slow-query threshold.", ("db", "operation"))
+COLLECTION_SCANS = REGISTRY.counter("mongodb_collection_scans_total", "Slow MongoDB operations whose plan is a collection scan.", ("collection",))
+
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+def NormalizeSql(query: str) -> str:
+    """
+    Normalize a SQL query for logging and grouping: collapse whitespace, replace literals with ?.
+    Input: query (str), e.g. "SELECT *  FROM users WHERE age > 25 AND name = %s".
+    Output: str, e.g. "SELECT * FROM users WHERE age > ? AND name = %s".
+    """
+    query = _STRING_LITERAL_PATTERN.sub("?", query)
+    query = _NUMBER_LITERAL_PATTERN.sub("?", query)
+    return " ".join(query.split())
+
+def NormalizeFilter(value: Any) -> Any:
+    """
+    Normalize a MongoDB filter for logging and grouping: keep keys and operators, replace values with ?.
+    Input: value (filter), e.g. {"age": {"$gt": 25}, "city": {"$in": ["A", "B"]}}.
+    Output: e.g. {"age": {"$gt": "?"}, "city": {"$in": ["?"]}}.
+    """
+    if isinstance(value, dict):
+        return {key: NormalizeFilter(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, dict) for item in value): # e.g. $or / $and clauses
+            return [NormalizeFilter(item) for item in value]
+        return ["?"]
+    return "?"
+
+def ParamShape(params: Any) -> str:
+    """
+    Describe query parameters without their values (they may be sensitive).
+    Input: params, e.g. (25, "John", [1, 2, 3]).
+    Output: str, e.g. "(int, str, list[3])".
+    """
+    def describe(value):
+        if isinstance(value, (list, tuple, set)):
+            return f"{type(value).__name__}[{len(value)}]"
+        return type(value).__name__
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {describe(value)}" for key, value in params.items()) + "}"
+    return "(" + ", ".join(describe(value) for value in params) + ")"
+
+class PlanCaptureLimit:
+    """Rate limit of plan captures: at most perMinute per minute, and once per minute per normalized operation."""
+
+    def __init__(self, perMinute: int):
+        self.perMinute = perMinute
+        self._lock = threading.Lock()
+        self._windowStart = 0.0
+        self._windowCount = 0
+        self._lastCaptured = {} # normalized text -> time of the last capture
+
+    def allow(self, text: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._windowStart >= 60:
+                self._windowStart, self._windowCount = now, 0
+            if self._windowCount >= self.perMinute or now - self._lastCaptured.get(text, -60) < 60:
+                return False
+            self._windowCount += 1
+            if len(self._lastCaptured) > 1000:
+                self._lastCaptured.clear()
+            self._lastCaptured[text] = now
+        return True
+
+class SlowQueryLog:
+    """
+    Log database operations slower than a threshold, with their normalized text, parameter shape and duration.
+    Optionally, the plan of a slow operation is captured (EXPLAIN / explain()) on a background thread,
+    at most explainsPerMinute times per minute and once per minute per normalized operation, so that
+    capturing plans cannot overload the database.
+    Without plan captures, slow operations can still be checked for collection scans with a cheap
+    planner-only explain (the operation is not run again), under its own rate limit.
+    """
+
+    def __init__(self, thresholdMs: float, explain: bool = False, explainsPerMinute: int = 6, scanChecksPerMinute: int = 30):
+        """
+        Input:
+            thresholdMs (float): duration above which an operation is logged, 0 disables the log.
+            explain (bool): capture the plan of slow operations.
+            explainsPerMinute (int): maximum number of plans captured per minute.
+            scanChecksPerMinute (int): maximum number of collection scan checks per minute, 0 disables them.
+        """
+        self.thresholdMs = thresholdMs
+        self.explain = explain
+        self._explainLimit = PlanCaptureLimit(explainsPerMinute)
+        self._scanCheckLimit = PlanCaptureLimit(scanChecksPerMinute)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def isSlow(self, duration: float) -> bool:
+        return self.thresholdMs > 0 and duration * 1000 >= self.thresholdMs
+
+    def _submit(self, fn: Callable, *args):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._executor.submit(fn, *args)
+
+    def record(
+        self, db: str, operation: str, text: str, shape: str, duration: float,
+        explain: Callable[[], str] = None, checkScan: Callable[[], str | None] = None
+    ):
+        """
+        Log an operation if it is slow, and schedule the capture of its plan, or else the check for a collection scan.
+        Input:
+            db, operation (str): e.g. "postgres", "executeQuery".
+            text (str): normalized query or filter.
+            shape (str): parameter shape.
+            duration (float): seconds.
+            explain (callable): returns the plan as text, run on a background thread.
+            checkScan (callable): returns a plan summary if the operation scans a whole collection, else None,
+                run on a background thread.
+        """
+        if not self.isSlow(duration):
+            return
+        SLOW_OPERATIONS.inc((db, operation))
+        logger.warning("Slow %s %s: %.1f ms | %s | params=%s", db, operation, duration * 1000, text, shape)
+        if self.explain and explain is not None:
+            if self._explainLimit.allow(text):
+                self._submit(self._explain, db, operation, text, explain)
+        elif checkScan is not None and self._scanCheckLimit.perMinute > 0 and self._scanCheckLimit.allow(text):
+            self._submit(self._checkScan, db, operation, text, checkScan)
+
+    def _explain(self, db: str, operation: str, text: str, explain: Callable[[], str]):
+        try:
+            logger.warning("Plan of slow %s %s: %s\n%s", db, operation, text, explain())
+        except Exception as e:
+            logger.error("Could not capture the plan of slow %s %s: %s | %s", db, operation, text, e)
+
+    def _checkScan(self, db: str, operation: str, text: str, checkScan: Callable[[], str | None]):
+        try:
+            summary = checkScan()
+        except Exception as e:
+            logger.error("Could not check the plan of slow %s %s: %s | %s", db, operation, text, e)
+            return
+        if summary:
+            logger.warning("Collection scan in slow %s %s: %s\n%s", db, operation, text, summary)
+
+def SummarizeMongoPlan(explanation: Dict) -> tuple[str, bool]:
+    """
+    Summarize a MongoDB explain() output.
+    Input: explanation (dict returned by Cursor.explain()).
+    Output: (summary text with the winning plan stages and execution stats, True if it is a collection scan).
+    """
+    stages = []
+    plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+    plan = plan.get("queryPlan", plan) # Slot-based engine
+    while plan:
+        stage = plan.get("stage", "?")
+        stages.append(f"{stage}({plan['indexName']})" if "indexName" in plan else stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    stats = explanation.get("executionStats", {})
+    isCollectionScan = "COLLSCAN" in stages
+    summary = (
+        ("COLLSCAN: no index is used for this filter. " if isCollectionScan else "")
+        + f"stages={' <- '.join(stages) or '?'}, nReturned={stats.get('nReturned', '?')}, "
+        f"keysExamined={stats.get('totalKeysExamined', '?')}, docsExamined={stats.get('totalDocsExamined', '?')}"
+    )
+    return summary, isCollectionScan
+
+SLOW_QUERY_LOG = SlowQueryLog(
+    SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAINS_PER_MINUTE, SLOW_QUERY_SCAN_CHECKS_PER_MINUTE
+)
@@ -0,0 +1,18 @@
+"""
+Run every benchmark suite: conversion utilities, API load test and database managers.
+
+Usage:
+    python -m benchmarks [--quick] [--save PATH] [--compare PATH] [--tolerance 0.15]
+"""
+from benchmarks import api_benchmark, db_benchmark, utils_benchmark
+from benchmarks.benchmark_utils import Main
+
+def run(quick: bool = False) -> dict:
+    results = {}
+    for suite in (utils_benchmark, api_benchmark, db_benchmark):
+        print(f"Running {suite.__name__}...", flush=True)
+        results.update(suite.run(quick))
+    return results
+
+if __name__ == "__main__":
+    Main(run, "Run every benchmark suite.")
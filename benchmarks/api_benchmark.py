@@ -0,0 +1,55 @@
+"""
+In-process load test of POST /day2timestamp/timestamp through the ASGI app (no server, no network),
+reporting throughput and p50/p99 latency at several concurrency levels.
+
+Usage:
+    python -m benchmarks.api_benchmark [--quick] [--save PATH] [--compare PATH] [--tolerance 0.15]
+"""
+import asyncio
+import time
+import httpx
+from app.main import app
+from benchmarks.benchmark_utils import Main, Percentile, Result
+from benchmarks.convert_day_benchmark import TIMEZONES, buildDates
+
+ROUTE = "/day2timestamp/timestamp"
+
+async def worker(client: httpx.AsyncClient, bodies: list[dict], latencies: list[float]):
+    for body in bodies:
+        start = time.perf_counter()
+        response = await client.post(ROUTE, json=body)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200 or response.json().get("error"):
+            raise RuntimeError(f"{ROUTE} failed for {body}: {response.status_code} {response.text}")
+
+async def loadTest(bodies: list[dict], concurrency: int) -> tuple[float, list[float]]:
+    """
+    Send every body with `concurrency` concurrent clients.
+    Output: (elapsed seconds, latency of each request in seconds).
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await worker(client, bodies[:20], []) # Warm up
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, bodies[i::concurrency], latencies) for i in range(concurrency)))
+        return time.perf_counter() - start, latencies
+
+def run(quick: bool = False) -> dict:
+    count = 500 if quick else 5_000
+    dates = buildDates(count)
+    bodies = [
+        {"day": day, "month": month, "year": year, "tz": TIMEZONES[i % len(TIMEZONES)]}
+        for i, (day, month, year) in enumerate(dates)
+    ]
+    results = {}
+    for concurrency in (1, 10, 50):
+        elapsed, latencies = asyncio.run(loadTest(bodies, concurrency))
+        name = f"api.timestamp[c={concurrency}]"
+        results[f"{name}.throughput"] = Result(len(latencies) / elapsed, "req/s", "higher")
+        results[f"{name}.p50"] = Result(Percentile(latencies, 50) * 1e6, "us")
+        results[f"{name}.p99"] = Result(Percentile(latencies, 99) * 1e6, "us")
+    return results
+
+if __name__ == "__main__":
+    Main(run, f"In-process load test of POST {ROUTE}.")
@@ -0,0 +1,123 @@
+"""
+Shared helpers of the benchmark suite: timing, percentiles, JSON baselines and regression comparison.
+
+A result is a dict {"value": float, "unit": str, "better": "lower" | "higher"}, keyed by benchmark name.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable
+
+def Result(value: float, unit: str, better: str = "lower") -> dict:
+    """Build a benchmark result."""
+    return {"value": value, "unit": unit, "better": better}
+
+def TimePerCall(run: Callable[[], None], calls: int, repeat: int = 5) -> float:
+    """
+    Return the best time per call over several runs.
+    Input: run (callable making `calls` calls), calls (int), repeat (int).
+    Output: nanoseconds per call.
+    """
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / calls * 1e9
+
+def Percentile(values: list[float], percent: float) -> float:
+    """Return the percentile of a list of values (nearest-rank method)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def Environment() -> dict:
+    """Describe the machine a baseline was recorded on."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpuCount": os.cpu_count(),
+        "recordedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def SaveBaseline(results: dict, path: str):
+    """Save results as a JSON baseline, with the machine they were recorded on."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": Environment(), "results": results}, f, indent=2, sort_keys=True)
+    print(f"Baseline saved to {path}")
+
+def CompareBaseline(results: dict, path: str, tolerance: float) -> list[str]:
+    """
+    Compare results with a saved baseline and print the change of each benchmark.
+    Input: results (dict), path (baseline JSON), tolerance (allowed relative slowdown, e.g. 0.15 for 15%).
+    Output: names of the benchmarks that regressed by more than the tolerance.
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+    previous = baseline["results"]
+    print(f"Comparing with {path} (recorded {baseline['environment'].get('recordedAt')}), tolerance {tolerance:.0%}")
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in previous:
+            print(f"  {name:<48} {result['value']:>14.1f} {result['unit']:<10} (new)")
+            continue
+        before, after = previous[name]["value"], result["value"]
+        # Relative slowdown: positive when worse, whatever the direction of "better"
+        if before == 0 or after == 0:
+            slowdown = 0.0
+        elif result["better"] == "lower":
+            slowdown = after / before - 1
+        else:
+            slowdown = before / after - 1
+        regressed = slowdown > tolerance
+        if regressed:
+            regressions.append(name)
+        status = "REGRESSION" if regressed else ("improved" if slowdown < -tolerance else "ok")
+        print(f"  {name:<48} {before:>14.1f} -> {after:>14.1f} {result['unit']:<10} {-slowdown:+7.1%}  {status}")
+    notRun = set(previous) - set(results)
+    if notRun:
+        print(f"  ({len(notRun)} benchmark(s) of the baseline were not run)")
+    return regressions
+
+def PrintResults(results: dict):
+    """Print one line per benchmark."""
+    for name, result in sorted(results.items()):
+        print(f"  {name:<48} {result['value']:>14.1f} {result['unit']}")
+
+def RunAndReport(results: dict, save: str = None, compare: str = None, tolerance: float = 0.15) -> int:
+    """
+    Print the results, or compare them with a baseline, then optionally save them as a new baseline.
+    Output: process exit code, 1 if a benchmark regressed.
+    """
+    exitCode = 0
+    if not compare:
+        PrintResults(results)
+    else:
+        regressions = CompareBaseline(results, compare, tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            exitCode = 1
+    if save:
+        SaveBaseline(results, save)
+    sys.stdout.flush()
+    return exitCode
+
+def ParseArgs(description: str) -> argparse.Namespace:
+    """Parse the options shared by every benchmark entry point."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--quick", action="store_true", help="fewer iterations, for a smoke run")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results with a JSON baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown (default: 0.15)")
+    return parser.parse_args()
+
+def Main(run: Callable[[bool], dict], description: str):
+    """
+    Entry point of a benchmark module.
+    Input: run (callable taking quick (bool) and returning results), description (str).
+    """
+    args = ParseArgs(description)
+    results = run(args.quick)
+    sys.exit(RunAndReport(results, args.save, args.compare, args.tolerance))
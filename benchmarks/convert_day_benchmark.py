@@ -0,0 +1,65 @@
+"""
+Micro-benchmark of ConvertDayToTimestamp against the previous datetime-based implementation.
+
+Usage:
+    python -m benchmarks.convert_day_benchmark
+"""
+import random
+import timeit
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from app.utils.convert_day import ConvertDayToTimestamp, validateDate
+
+TIMEZONES = ["UTC", "Asia/Ho_Chi_Minh", "America/New_York", "Europe/London"]
+
+def legacyConvertDayToTimestamp(day: int, month: int, year: int, tz: str = None) -> tuple[int, str]:
+    """Previous implementation: builds a datetime per call and uses the host timezone (tz is ignored)."""
+    err = validateDate(day, month, year)
+    if err:
+        return 0, err
+    dt = datetime(year, month, day, 0, 0)
+    return int(dt.timestamp()), None
+
+def referenceConvertDayToTimestamp(day: int, month: int, year: int, tz: str) -> int:
+    """Timezone-aware datetime conversion used to check the integer engine."""
+    return int(datetime(year, month, day, tzinfo=ZoneInfo(tz)).timestamp())
+
+def buildDates(count: int, seed: int = 42) -> list[tuple[int, int, int]]:
+    """Build random valid dates between 1971 and 2100."""
+    rng = random.Random(seed)
+    dates = []
+    while len(dates) < count:
+        day, month, year = rng.randint(1, 31), rng.randint(1, 12), rng.randint(1971, 2100)
+        if validateDate(day, month, year) is None:
+            dates.append((day, month, year))
+    return dates
+
+def checkCorrectness(dates: list[tuple[int, int, int]]):
+    """Raise AssertionError if the integer engine disagrees with the datetime reference."""
+    for tz in TIMEZONES:
+        for day, month, year in dates:
+            timestamp, err = ConvertDayToTimestamp(day, month, year, tz)
+            expected = referenceConvertDayToTimestamp(day, month, year, tz)
+            assert err is None and timestamp == expected, f"{day}/{month}/{year} {tz}: {timestamp} != {expected}"
+
+def timePerCall(func, dates: list[tuple[int, int, int]], tz: str, repeat: int = 5) -> float:
+    """Return the best time per call (in nanoseconds) over several runs."""
+    def run():
+        for day, month, year in dates:
+            func(day, month, year, tz)
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    return best / len(dates) * 1e9
+
+def main():
+    dates = buildDates(100_000)
+    checkCorrectness(dates[:5_000])
+    print("Correctness check passed for:", ", ".join(TIMEZONES))
+
+    legacy = timePerCall(legacyConvertDayToTimestamp, dates, None)
+    print(f"{'legacy (datetime, host tz)':<32} {legacy:8.1f} ns/call")
+    for tz in TIMEZONES:
+        current = timePerCall(ConvertDayToTimestamp, dates, tz)
+        print(f"{'integer engine, ' + tz:<32} {current:8.1f} ns/call  ({legacy / current:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmarks of PostgresManager and MongoDBManager against local stand-ins:
+    - Postgres: an ephemeral server started by pgserver in a temporary directory, deleted afterwards.
+    - MongoDB: mongomock, an in-memory substitute. It measures the manager overhead (caching,
+      pagination, metrics), not MongoDB itself: compare its results only with mongomock baselines.
+Each suite is skipped, with a message, when its stand-in is not installed (see benchmarks/requirements.txt).
+
+Usage:
+    python -m benchmarks.db_benchmark [--quick] [--save PATH] [--compare PATH] [--tolerance 0.15]
+"""
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.benchmark_utils import Main, Result, TimePerCall
+
+def benchmarkPostgres(quick: bool) -> dict:
+    try:
+        import pgserver
+    except ImportError:
+        print("Skipping the Postgres benchmarks: pgserver is not installed.")
+        return {}
+    import app.database.Postgres_connect as postgresModule
+    from app.database.Postgres_connect import PostgresManager
+
+    rowCount = 10_000 if quick else 100_000
+    calls = 500 if quick else 5_000
+    repeat = 3 if quick else 5
+    results = {}
+    dataDir = tempfile.mkdtemp(prefix="pgbench")
+    server = pgserver.get_server(dataDir, cleanup_mode="delete")
+    # The manager reads its connection settings from module globals when the pool is created
+    postgresModule.POSTGRES_HOST, postgresModule.POSTGRES_DB = dataDir, "postgres"
+    postgresModule.POSTGRES_USER, postgresModule.POSTGRES_PASSWORD = "postgres", ""
+    manager = PostgresManager()
+    manager.initializePool(minConn=1, maxConn=10)
+    try:
+        manager.executeNonQuery("DROP TABLE IF EXISTS benchmark_items")
+        manager.executeNonQuery("CREATE TABLE benchmark_items (id integer PRIMARY KEY, name text NOT NULL, value integer NOT NULL)")
+        rows = [(i, f"item-{i}", i % 1000) for i in range(rowCount)]
+
+        start = time.perf_counter()
+        manager.copyFrom("benchmark_items", rows, ["id", "name", "value"])
+        results["postgres.copyFrom"] = Result(rowCount / (time.perf_counter() - start), "rows/s", "higher")
+
+        manager.executeNonQuery("TRUNCATE benchmark_items")
+        start = time.perf_counter()
+        manager.executeMany("INSERT INTO benchmark_items (id, name, value) VALUES (%s, %s, %s)", rows)
+        results["postgres.executeMany"] = Result(rowCount / (time.perf_counter() - start), "rows/s", "higher")
+        manager.executeNonQuery("ANALYZE benchmark_items")
+
+        ids = [(i * 7919) % rowCount for i in range(calls)]
+
+        def pointQueries():
+            for id in ids:
+                manager.executeQuery("SELECT id, name, value FROM benchmark_items WHERE id = %s", (id,))
+
+        def cachedQueries():
+            for id in ids[:50] * (calls // 50):
+                manager.executeQueryCached("SELECT id, name, value FROM benchmark_items WHERE id = %s", (id,), ["benchmark_items"])
+
+        def updates():
+            for id in ids:
+                manager.executeNonQuery("UPDATE benchmark_items SET value = value + 1 WHERE id = %s", (id,))
+
+        results["postgres.executeQuery[point]"] = Result(TimePerCall(pointQueries, calls, repeat) / 1000, "us/op")
+        results["postgres.executeQueryCached[hit]"] = Result(TimePerCall(cachedQueries, calls // 50 * 50, repeat) / 1000, "us/op")
+        results["postgres.executeNonQuery[update]"] = Result(TimePerCall(updates, calls, repeat) / 1000, "us/op")
+
+        start = time.perf_counter()
+        streamed = sum(1 for _ in manager.streamQuery("SELECT id, name, value FROM benchmark_items", itersize=2000))
+        results["postgres.streamQuery"] = Result(streamed / (time.perf_counter() - start), "rows/s", "higher")
+
+        # Concurrent point queries: measures the pool under contention
+        threads = 8
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: pointQueries(), range(threads)))
+        results[f"postgres.executeQuery[point, threads={threads}]"] = Result(
+            threads * calls / (time.perf_counter() - start), "ops/s", "higher"
+        )
+
+        manager.executeNonQuery("DROP TABLE benchmark_items")
+    finally:
+        manager.closePool()
+        server.cleanup()
+        shutil.rmtree(dataDir, ignore_errors=True)
+    return results
+
+def benchmarkMongo(quick: bool) -> dict:
+    try:
+        import mongomock
+    except ImportError:
+        print("Skipping the MongoDB benchmarks: mongomock is not installed.")
+        return {}
+    from app.database.MongoDB_connect import MongoDBManager
+
+    documentCount = 5_000 if quick else 50_000
+    calls = 500 if quick else 5_000
+    repeat = 3 if quick else 5
+    results = {}
+    manager = MongoDBManager()
+    manager.client = mongomock.MongoClient()
+    manager.db = manager.client["benchmark"]
+    try:
+        documents = [{"itemId": i, "name": f"item-{i}", "value": i % 1000} for i in range(documentCount)]
+        start = time.perf_counter()
+        manager.insertMany("benchmark_items", documents)
+        results["mongomock.insertMany"] = Result(documentCount / (time.perf_counter() - start), "docs/s", "higher")
+        manager.db["benchmark_items"].create_index("itemId")
+
+        ids = [(i * 7919) % documentCount for i in range(calls)]
+
+        def getOnes():
+            for id in ids:
+                manager.getOne("benchmark_items", {"itemId": id})
+
+        def cachedGetOnes():
+            for id in ids[:50] * (calls // 50):
+                manager.getOneCached("benchmark_items", {"itemId": id})
+
+        def updateOnes():
+            for id in ids:
+                manager.updateOne("benchmark_items", {"itemId": id}, {"value": id})
+
+        results["mongomock.getOne"] = Result(TimePerCall(getOnes, calls, repeat) / 1000, "us/op")
+        results["mongomock.getOneCached[hit]"] = Result(TimePerCall(cachedGetOnes, calls // 50 * 50, repeat) / 1000, "us/op")
+        results["mongomock.updateOne"] = Result(TimePerCall(updateOnes, calls, repeat) / 1000, "us/op")
+
+        start = time.perf_counter()
+        streamed = sum(1 for _ in manager.iterCollection("benchmark_items", batchSize=1000))
+        results["mongomock.iterCollection"] = Result(streamed / (time.perf_counter() - start), "docs/s", "higher")
+
+        start = time.perf_counter()
+        paged = sum(len(page) for page in manager.iterPages("benchmark_items", pageSize=1000, sortField="itemId"))
+        results["mongomock.iterPages"] = Result(paged / (time.perf_counter() - start), "docs/s", "higher")
+    finally:
+        manager.client.close()
+        manager.client = None
+        manager.db = None
+    return results
+
+def run(quick: bool = False) -> dict:
+    return {**benchmarkPostgres(quick), **benchmarkMongo(quick)}
+
+if __name__ == "__main__":
+    Main(run, "Benchmarks of the database managers against local stand-ins.")
@@ -0,0 +1,64 @@
+"""
+Micro-benchmarks of the conversion utilities: ConvertDayToTimestamp, GetMonthRange and GetYearRange.
+The range memos are cleared before each run, so that distinct inputs measure the conversions, and the
+[hot] benchmark measures a few recent dates.
+
+Usage:
+    python -m benchmarks.utils_benchmark [--quick] [--save PATH] [--compare PATH] [--tolerance 0.15]
+"""
+import random
+from app.utils.convert_day import (
+    ConvertDayToTimestamp, GetMonthRange, GetYearRange, MONTH_RANGE_CACHE, YEAR_RANGE_CACHE,
+)
+from benchmarks.benchmark_utils import Main, Result, TimePerCall
+from benchmarks.convert_day_benchmark import TIMEZONES, buildDates
+
+def buildMonths(count: int, seed: int = 42) -> list[tuple[int, int]]:
+    """Build random (month, year) pairs between 1971 and 2100."""
+    rng = random.Random(seed)
+    return [(rng.randint(1, 12), rng.randint(1971, 2100)) for _ in range(count)]
+
+def run(quick: bool = False) -> dict:
+    count = 10_000 if quick else 100_000
+    repeat = 3 if quick else 5
+    dates = buildDates(count)
+    months = buildMonths(count)
+    years = [year for _, year in months]
+    results = {}
+
+    for tz in TIMEZONES:
+        def convertDays():
+            for day, month, year in dates:
+                ConvertDayToTimestamp(day, month, year, tz)
+
+        def monthRanges():
+            MONTH_RANGE_CACHE.clear()
+            for month, year in months:
+                GetMonthRange(month, year, tz)
+
+        def yearRanges():
+            YEAR_RANGE_CACHE.clear()
+            for year in years:
+                GetYearRange(year, tz)
+
+        results[f"utils.ConvertDayToTimestamp[{tz}]"] = Result(TimePerCall(convertDays, count, repeat), "ns/call")
+        results[f"utils.GetMonthRange[{tz}]"] = Result(TimePerCall(monthRanges, count, repeat), "ns/call")
+        results[f"utils.GetYearRange[{tz}]"] = Result(TimePerCall(yearRanges, count, repeat), "ns/call")
+
+    # Skewed traffic: a few recent dates
+    hotDates = [(day, month, 2025) for month in (1, 2) for day in range(1, 29)]
+    def hotDays():
+        for i in range(count):
+            day, month, year = hotDates[i % len(hotDates)]
+            ConvertDayToTimestamp(day, month, year, "Asia/Ho_Chi_Minh")
+    results["utils.ConvertDayToTimestamp[hot]"] = Result(TimePerCall(hotDays, count, repeat), "ns/call")
+
+    # Error path: validation failures must stay cheap too
+    def invalidDays():
+        for day, month, year in dates:
+            ConvertDayToTimestamp(day + 40, month, year, "UTC")
+    results["utils.ConvertDayToTimestamp[invalid]"] = Result(TimePerCall(invalidDays, count, repeat), "ns/call")
+    return results
+
+if __name__ == "__main__":
+    Main(run, "Micro-benchmarks of the conversion utilities.")
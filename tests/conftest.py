@@ -0,0 +1,23 @@
+import tempfile
+import pytest
+
+@pytest.fixture(scope="session")
+def postgresDirectory():
+    """Socket directory of an ephemeral Postgres server from pgserver (see benchmarks/requirements.txt)."""
+    pgserver = pytest.importorskip("pgserver")
+    directory = tempfile.mkdtemp()
+    server = pgserver.get_server(directory, cleanup_mode="delete")
+    yield directory
+    server.cleanup()
+
+@pytest.fixture(scope="module")
+def postgresManager(postgresDirectory):
+    """The PostgresManager singleton, connected to the ephemeral server with a single connection."""
+    pytest.importorskip("psycopg2")
+    import app.database.Postgres_connect as module
+    module.POSTGRES_HOST, module.POSTGRES_DB, module.POSTGRES_USER, module.POSTGRES_PASSWORD = postgresDirectory, "postgres", "postgres", ""
+    manager = module.PostgresManager()
+    manager.closePool()
+    manager.initializePool(minConn=1, maxConn=1) # Every query runs on the same connection
+    yield manager
+    manager.closePool()
@@ -0,0 +1,119 @@
+"""
+Tests of admission control and load shedding (app/utils/admission.py).
+"""
+import asyncio
+import sys
+import types
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.utils.admission import AdmissionMiddleware, RouteLimiter
+
+def makeApp(poolStats: dict = None) -> tuple[FastAPI, asyncio.Event]:
+    release = asyncio.Event()
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware,
+        routes={
+            "/slow": {"concurrency": 1, "queue": 1, "queueTimeout": 0.2},
+            "/db": {"postgres": True},
+        },
+        poolMaxWaiting=2, poolMaxWaitTime=0.5, retryAfterMax=30
+    )
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {}
+
+    @app.get("/db")
+    async def db():
+        return {}
+
+    @app.get("/free")
+    async def free():
+        return {}
+
+    return app, release
+
+def client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+def test_queue_full_and_queue_timeout_are_shed():
+    async def scenario():
+        app, release = makeApp()
+        async with client(app) as http:
+            admitted = asyncio.create_task(http.get("/slow"))
+            await asyncio.sleep(0.05)
+            queued = asyncio.create_task(http.get("/slow"))
+            await asyncio.sleep(0.05)
+            full = await http.get("/slow")
+            free = await http.get("/free") # Routes without a limit keep serving
+            timedOut = await queued
+            release.set()
+            return (await admitted), full, free, timedOut
+
+    admitted, full, free, timedOut = asyncio.run(scenario())
+    assert admitted.status_code == 200 and free.status_code == 200
+    assert full.status_code == 503 and full.json()["reason"] == "queue_full"
+    assert timedOut.status_code == 503 and timedOut.json()["reason"] == "queue_timeout"
+    assert 1 <= int(full.headers["retry-after"]) <= 30
+
+def test_queued_request_gets_the_released_slot():
+    async def scenario():
+        app, release = makeApp()
+        async with client(app) as http:
+            first = asyncio.create_task(http.get("/slow"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(http.get("/slow"))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await first, await second
+
+    assert [response.status_code for response in asyncio.run(scenario())] == [200, 200]
+
+def test_limiter_hands_over_and_frees_slots():
+    async def scenario():
+        limiter = RouteLimiter("/route", concurrency=1, queueSize=1, queueTimeout=1)
+        assert await limiter.acquire() is None
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert (limiter.active, limiter.queued) == (1, 1)
+        limiter.release(0.5)
+        assert await waiter is None and (limiter.active, limiter.queued) == (1, 0)
+        cancelled = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel() # A client disconnecting while queued leaves the queue
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.active == 0 and limiter.retryAfter() == pytest.approx(0.5)
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("waiting, waitTime, shed", [(0, 0.1, False), (2, 0.1, True), (0, 1.0, True)])
+def test_postgres_routes_are_shed_while_the_pool_is_saturated(monkeypatch, waiting, waitTime, shed):
+    stats = {"inUse": 4, "maxConn": 4, "waiting": waiting, "totalWaitTime": 10 * waitTime, "waitCount": 10}
+    manager = types.SimpleNamespace(getPoolStats=lambda: stats)
+    monkeypatch.setitem(sys.modules, "app.database.Postgres_connect", types.SimpleNamespace(PostgresManager=lambda: manager))
+
+    async def scenario():
+        app, _ = makeApp()
+        async with client(app) as http:
+            return await http.get("/db"), await http.get("/free")
+
+    db, free = asyncio.run(scenario())
+    assert free.status_code == 200
+    if shed:
+        assert db.status_code == 503 and db.json()["reason"] == "postgres_saturated" and "retry-after" in db.headers
+    else:
+        assert db.status_code == 200
+
+def test_pool_with_free_connections_is_not_saturated(monkeypatch):
+    stats = {"inUse": 3, "maxConn": 4, "waiting": 10, "totalWaitTime": 50.0, "waitCount": 10}
+    manager = types.SimpleNamespace(getPoolStats=lambda: stats)
+    monkeypatch.setitem(sys.modules, "app.database.Postgres_connect", types.SimpleNamespace(PostgresManager=lambda: manager))
+    middleware = AdmissionMiddleware(None, {}, poolMaxWaiting=2, poolMaxWaitTime=0.5, retryAfterMax=30)
+    assert not middleware.poolPressure.isSaturated()
+    stats["inUse"] = 4
+    assert middleware.poolPressure.isSaturated()
@@ -0,0 +1,122 @@
+"""
+Tests of the date conversions (app/utils/convert_day.py), checked against datetime and zoneinfo.
+"""
+import random
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+import pytest
+
+np = pytest.importorskip("numpy")
+from app.utils.convert_day import (
+    _YEAR_START_DAYS, ConvertDaysToTimestamps, ConvertDayToTimestamp, ConvertTimestampsToDays, ConvertTimestampToDay,
+    civilFromDays, civilFromDaysArray, getMonthRange, getYearRange
+)
+
+ZONES = ["UTC", "Asia/Ho_Chi_Minh", "America/New_York", "Europe/London", "Pacific/Kiritimati", "Australia/Lord_Howe"]
+EPOCH = date(1970, 1, 1)
+# Days whose local midnight is skipped or repeated by a transition
+TRANSITION_DAYS = [
+    ("America/Sao_Paulo", 2018, 11, 4), # DST starts at midnight: 00:00 is skipped
+    ("America/Santiago", 2023, 9, 3), # Same
+    ("America/Havana", 2023, 11, 5), # DST ends at 01:00: 00:00 happens twice
+    ("Pacific/Apia", 2011, 12, 30), # The whole day is skipped
+    ("Europe/London", 2024, 3, 31), # DST starts at 01:00, after midnight
+    ("America/New_York", 2024, 11, 3),
+]
+
+def localTimestamp(tz: str, *fields: int) -> int:
+    """Timestamp of a local time, the first one if it is repeated, the offset before the transition if it is skipped."""
+    return int(datetime(*fields, tzinfo=ZoneInfo(tz)).timestamp())
+
+def localDay(timestamp: int, tz: str) -> tuple[int, int, int]:
+    local = datetime.fromtimestamp(timestamp, ZoneInfo(tz))
+    return local.day, local.month, local.year
+
+def test_year_start_days():
+    for year in range(1, 10000):
+        assert _YEAR_START_DAYS[year] == (date(year, 1, 1) - EPOCH).days
+    assert _YEAR_START_DAYS[10000] == (date(9999, 12, 31) - EPOCH).days + 1
+
+def test_civil_from_days():
+    epochDays = list(range((date(1, 1, 1) - EPOCH).days, (date(9999, 12, 31) - EPOCH).days + 1, 97))
+    epochDays += [-1, 0, 59, 365 + 59, (date(2000, 2, 29) - EPOCH).days, (date(2100, 3, 1) - EPOCH).days]
+    expected = [(day.day, day.month, day.year) for day in (EPOCH + timedelta(days=n) for n in epochDays)]
+    assert [civilFromDays(n) for n in epochDays] == expected
+    days, months, years = civilFromDaysArray(np.array(epochDays, dtype=np.int64))
+    assert list(zip(days.tolist(), months.tolist(), years.tolist())) == expected
+
+@pytest.mark.parametrize("tz", ZONES)
+def test_day_to_timestamp(tz):
+    rng = random.Random(tz)
+    dates = [date(1971, 1, 1) + timedelta(days=rng.randrange((date(9999, 12, 31) - date(1971, 1, 1)).days)) for _ in range(2000)]
+    dates += [date(2000, 2, 29), date(2100, 2, 28), date(2024, 12, 31), date(1971, 1, 1), date(9999, 12, 31)]
+    expected = [localTimestamp(tz, day.year, day.month, day.day) for day in dates]
+    assert [ConvertDayToTimestamp(day.day, day.month, day.year, tz) for day in dates] == [(ts, None) for ts in expected]
+    timestamps, errors = ConvertDaysToTimestamps([d.day for d in dates], [d.month for d in dates], [d.year for d in dates], tz)
+    assert timestamps.tolist() == expected and errors == [None] * len(dates)
+
+@pytest.mark.parametrize("tz, year, month, day", TRANSITION_DAYS)
+def test_day_to_timestamp_across_transitions(tz, year, month, day):
+    dates = [date(year, month, day) + timedelta(days=delta) for delta in (-1, 0, 1)]
+    expected = [localTimestamp(tz, d.year, d.month, d.day) for d in dates]
+    assert [ConvertDayToTimestamp(d.day, d.month, d.year, tz)[0] for d in dates] == expected
+    assert ConvertDaysToTimestamps([d.day for d in dates], [d.month for d in dates], [d.year for d in dates], tz)[0].tolist() == expected
+
+@pytest.mark.parametrize("tz, year, month, day", TRANSITION_DAYS)
+def test_timestamp_to_day_across_transitions(tz, year, month, day):
+    start = localTimestamp(tz, year, month, day) - 2 * 86400
+    timestamps = list(range(start, start + 4 * 86400, 900)) # Every quarter of an hour, two days around the transition
+    timestamps += [ts + delta for ts in timestamps[::4] for delta in (-1, 1)]
+    expected = [localDay(ts, tz) for ts in timestamps]
+    assert [ConvertTimestampToDay(ts, tz)[:3] for ts in timestamps] == expected
+    days, months, years, errors = ConvertTimestampsToDays(timestamps, tz)
+    assert list(zip(days.tolist(), months.tolist(), years.tolist())) == expected and errors == [None] * len(timestamps)
+
+@pytest.mark.parametrize("tz", ZONES)
+def test_timestamp_to_day(tz):
+    rng = random.Random(tz)
+    timestamps = [rng.randrange(31536000, 253402000000) for _ in range(2000)]
+    expected = [localDay(ts, tz) for ts in timestamps]
+    assert [ConvertTimestampToDay(ts, tz) for ts in timestamps] == [(*day, None) for day in expected]
+    days, months, years, errors = ConvertTimestampsToDays(timestamps, tz)
+    assert list(zip(days.tolist(), months.tolist(), years.tolist())) == expected and errors == [None] * len(timestamps)
+
+@pytest.mark.parametrize("tz", ZONES)
+def test_year_bounds(tz):
+    invalid = [(31, 12, 1970), (1, 1, 10000), (29, 2, 2100), (31, 4, 2024), (0, 1, 2024), (1, 13, 2024)]
+    for day, month, year in invalid:
+        assert ConvertDayToTimestamp(day, month, year, tz)[1] is not None
+    timestamps, errors = ConvertDaysToTimestamps(*zip(*invalid), tz)
+    assert timestamps.tolist() == [0] * len(invalid) and all(errors)
+
+    first, last = localTimestamp(tz, 1971, 1, 1), localTimestamp(tz, 9999, 12, 29)
+    for timestamp in (first, last):
+        assert ConvertTimestampToDay(timestamp, tz)[:3] == localDay(timestamp, tz)
+    for timestamp in (first - 1, -1, 253402300800, 2 ** 40):
+        assert ConvertTimestampToDay(timestamp, tz)[3] is not None
+    assert ConvertTimestampsToDays([first - 1, first, 2 ** 40], tz)[3][1] is None
+    # The last days of 9999 are either converted exactly or rejected
+    for timestamp in range(last, localTimestamp(tz, 9999, 12, 31, 23, 59, 59) + 1, 3600):
+        day, month, year, err = ConvertTimestampToDay(timestamp, tz)
+        assert err is not None or (day, month, year) == localDay(timestamp, tz)
+
+def test_unknown_timezone():
+    assert ConvertDayToTimestamp(1, 1, 2024, "Not/AZone")[1] is not None
+    assert ConvertTimestampToDay(1704067200, "Not/AZone")[3] is not None
+    assert all(ConvertDaysToTimestamps([1], [1], [2024], "Not/AZone")[1])
+    assert all(ConvertTimestampsToDays([1704067200], "Not/AZone")[3])
+
+@pytest.mark.parametrize("tz", ZONES)
+@pytest.mark.parametrize("year", [1971, 2024, 9999])
+def test_december_range(tz, year):
+    assert getMonthRange(12, year, tz) == (localTimestamp(tz, year, 12, 1), localTimestamp(tz, year, 12, 31, 23, 59, 59), None)
+
+@pytest.mark.parametrize("tz", ZONES)
+@pytest.mark.parametrize("year", [1971, 2024, 9999])
+def test_year_range(tz, year):
+    assert getYearRange(year, tz) == (localTimestamp(tz, year, 1, 1), localTimestamp(tz, year, 12, 31, 23, 59, 59), None)
+
+def test_ranges_past_the_last_year_are_rejected():
+    assert getMonthRange(1, 10000, "UTC")[2] is not None
+    assert getYearRange(10000, "UTC")[2] is not None
+    assert getYearRange(9999, "Not/AZone")[2] is not None
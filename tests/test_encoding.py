@@ -0,0 +1,32 @@
+"""
+Tests of the Accept negotiation of array-shaped responses (app/utils/encoding.py).
+"""
+import pytest
+
+pytest.importorskip("numpy")
+from app.utils.encoding import INT64_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, NegotiateMediaType, parseAccept
+
+OFFERED = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, INT64_MEDIA_TYPE]
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON_MEDIA_TYPE),
+    ("", JSON_MEDIA_TYPE),
+    ("*/*", JSON_MEDIA_TYPE),
+    ("application/*", JSON_MEDIA_TYPE),
+    ("application/msgpack", MSGPACK_MEDIA_TYPE),
+    ("Application/X-MsgPack", MSGPACK_MEDIA_TYPE),
+    ("application/x-int64le", INT64_MEDIA_TYPE),
+    ("application/json;q=0.5, application/msgpack", MSGPACK_MEDIA_TYPE),
+    ("application/json; q=0.9, application/x-int64le; q=0.95", INT64_MEDIA_TYPE),
+    # The most specific range gives the quality: */* does not revive an excluded type
+    ("application/json;q=0, */*", MSGPACK_MEDIA_TYPE),
+    ("application/*;q=0.1, application/msgpack;q=0.2", MSGPACK_MEDIA_TYPE),
+    ("application/msgpack;q=0.5, application/x-int64le;q=0.5", MSGPACK_MEDIA_TYPE), # Ties go to the first offered
+    ("text/html", JSON_MEDIA_TYPE), # Nothing acceptable: the default
+    ("application/msgpack;q=abc, application/json;q=0.1", JSON_MEDIA_TYPE),
+])
+def test_negotiate(accept, expected):
+    assert NegotiateMediaType(accept, OFFERED) == expected
+
+def test_parse_accept():
+    assert parseAccept("text/html;level=1;q=0.3, ,application/x-msgpack") == [("text/html", 0.3), (MSGPACK_MEDIA_TYPE, 1.0)]
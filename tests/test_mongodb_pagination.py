@@ -0,0 +1,20 @@
+"""
+Tests of the projection of keyset-paginated MongoDB reads (app/database/MongoDB_connect.py).
+"""
+import pytest
+
+pytest.importorskip("pymongo")
+from app.database.MongoDB_connect import MongoDBManager
+
+@pytest.mark.parametrize("projection", [{"_id": 1}, {"_id": True}, {"name": 1}, {"_id": 1, "name": 1}, {"tags": {"$elemMatch": {"a": 1}}}])
+def test_inclusion_projection_gets_the_sort_field(projection):
+    assert MongoDBManager.withSortFields(projection, "date") == {**projection, "date": 1}
+
+@pytest.mark.parametrize("projection", [{"name": 0}, {"_id": 1, "name": 0}, {"tags": {"$slice": 2}}, None, {}])
+def test_projection_returning_every_field_is_kept(projection):
+    assert MongoDBManager.withSortFields(projection, "date") == projection
+
+@pytest.mark.parametrize("projection", [{"_id": 0}, {"date": 0}, {"_id": 0, "name": 1}])
+def test_projection_cannot_exclude_the_cursor_fields(projection):
+    with pytest.raises(ValueError):
+        MongoDBManager.withSortFields(projection, "date")
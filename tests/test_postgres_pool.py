@@ -0,0 +1,134 @@
+"""
+Tests of the bounded-wait connection pool (app/database/Postgres_pool.py), with fake connections.
+"""
+import threading
+import time
+import pytest
+
+pytest.importorskip("psycopg2")
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+from app.database.Postgres_pool import BoundedConnectionPool, PoolTimeoutError
+
+class FakeConnection:
+    def __init__(self, number: int):
+        self.number = number
+        self.closed = 0
+        self.info = type("Info", (), {"transaction_status": extensions.TRANSACTION_STATUS_IDLE})()
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+def makePool(**kwargs) -> tuple[BoundedConnectionPool, list]:
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection(len(opened)))
+        return opened[-1]
+
+    return BoundedConnectionPool(connect=connect, **kwargs), opened
+
+def test_acquire_times_out():
+    pool, _ = makePool(minConn=0, maxConn=1, acquireTimeout=0.1)
+    conn = pool.getconn()
+    start = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    assert 0.1 <= time.monotonic() - start < 1
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn(timeout=0)
+    stats = pool.getStats()
+    assert (stats["timeoutCount"], stats["exhaustedCount"], stats["waiting"], stats["inUse"]) == (2, 2, 0, 1)
+    pool.putconn(conn)
+    assert pool.getconn(timeout=0) is conn
+
+def test_waiters_are_served_in_order():
+    pool, opened = makePool(minConn=1, maxConn=1, acquireTimeout=5)
+    conn = pool.getconn()
+    served = []
+
+    def wait(name):
+        served.append((name, pool.getconn()))
+
+    threads = []
+    for name in ("first", "second"):
+        threads.append(threading.Thread(target=wait, args=(name,)))
+        threads[-1].start()
+        while pool.getStats()["waiting"] < len(threads):
+            time.sleep(0.001)
+    pool.putconn(conn)
+    threads[0].join(5)
+    pool.putconn(served[0][1])
+    threads[1].join(5)
+    assert served == [("first", conn), ("second", conn)] and len(opened) == 1
+    stats = pool.getStats()
+    assert stats["waitCount"] == 2 and stats["maxWaitTime"] > 0
+
+def test_freed_slot_goes_to_a_waiter():
+    pool, opened = makePool(minConn=0, maxConn=1, acquireTimeout=5)
+    conn = pool.getconn()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(pool.getconn()))
+    thread.start()
+    while pool.getStats()["waiting"] < 1:
+        time.sleep(0.001)
+    pool.putconn(conn, close=True)
+    thread.join(5)
+    assert conn.closed and result == [opened[1]]
+
+def test_connections_past_their_lifetime_are_replaced(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    pool, opened = makePool(minConn=1, maxConn=2, maxLifetime=60, maxIdleTime=1000, validationInterval=1000)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    now[0] += 61
+    replacement = pool.getconn() # The idle connection expired while idle
+    assert conn.closed and replacement is opened[1]
+    now[0] += 61
+    pool.putconn(replacement) # And this one expired while in use
+    assert replacement.closed
+    stats = pool.getStats()
+    assert (stats["size"], stats["idle"], stats["createdCount"], stats["closedCount"]) == (0, 0, 2, 2)
+
+def test_idle_connections_above_min_are_closed(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    pool, opened = makePool(minConn=1, maxConn=3, maxIdleTime=10, validationInterval=1000)
+    conns = [pool.getconn() for _ in range(3)]
+    for conn in conns:
+        pool.putconn(conn)
+    now[0] += 11
+    pool.putconn(pool.getconn())
+    assert pool.getStats()["size"] == 1 and sum(conn.closed for conn in opened) == 2
+
+def test_open_transaction_is_rolled_back():
+    pool, _ = makePool(minConn=1, maxConn=1)
+    conn = pool.getconn()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE and not conn.closed
+
+def test_closed_pool_wakes_up_waiters():
+    pool, _ = makePool(minConn=1, maxConn=1, acquireTimeout=5)
+    conn = pool.getconn()
+    errors = []
+
+    def wait():
+        try:
+            pool.getconn()
+        except PoolError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    while pool.getStats()["waiting"] < 1:
+        time.sleep(0.001)
+    pool.closeall()
+    thread.join(5)
+    assert len(errors) == 1 and not isinstance(errors[0], PoolTimeoutError)
+    pool.putconn(conn)
+    assert conn.closed
@@ -0,0 +1,42 @@
+"""
+Regression tests of the prepared statement cache (app/database/Postgres_prepared.py).
+The Postgres tests run against an ephemeral server from pgserver (see benchmarks/requirements.txt).
+"""
+import pytest
+
+pytest.importorskip("psycopg2")
+from app.database.Postgres_prepared import toPreparedSql
+
+def test_scalar_params_are_converted():
+    assert toPreparedSql("SELECT * FROM t WHERE id = %s AND name = %s", (1, "a")) == ("SELECT * FROM t WHERE id = $1 AND name = $2", 2)
+
+def test_adapted_params_are_not_prepared():
+    assert toPreparedSql("SELECT id FROM t WHERE id IN %s", ((1, 2),)) is None
+    assert toPreparedSql("SELECT id FROM t WHERE id = ANY(%s)", ([1, 2],)) is None
+
+@pytest.fixture(scope="module")
+def manager(postgresManager):
+    postgresManager.executeNonQuery("CREATE TABLE prepared_test (id INT PRIMARY KEY)")
+    postgresManager.executeNonQuery("INSERT INTO prepared_test VALUES (1), (2), (3)")
+    yield postgresManager
+    postgresManager.executeNonQuery("DROP TABLE prepared_test")
+
+def test_in_tuple_query_past_the_threshold(manager):
+    for _ in range(manager._preparedCache.threshold * 2):
+        rows = manager.executeQuery("SELECT id FROM prepared_test WHERE id IN %s ORDER BY id", ((1, 2),))
+        assert [row["id"] for row in rows] == [1, 2]
+
+def test_failed_prepare_keeps_the_transaction(manager):
+    conn = manager.getConnection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO prepared_test VALUES (42)")
+            for _ in range(manager._preparedCache.threshold * 2):
+                # PREPARE fails (unknown + unknown has no operator), the query runs unprepared
+                manager.executePrepared(conn, cur, "SELECT %s + %s", (1, 2))
+                assert cur.fetchone() == (3,)
+            cur.execute("SELECT count(*) FROM prepared_test WHERE id = 42")
+            assert cur.fetchone() == (1,)
+        conn.rollback()
+    finally:
+        manager.releaseConnection(conn)
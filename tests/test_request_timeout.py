@@ -0,0 +1,54 @@
+"""
+Tests of the request deadline (app/utils/request_timeout.py) and of the queries it bounds.
+The Postgres tests run against an ephemeral server from pgserver (see benchmarks/requirements.txt).
+"""
+import time
+from contextlib import contextmanager
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.utils.request_timeout import REQUEST_DEADLINE, GetStatementTimeout, RequestTimeoutMiddleware
+
+@contextmanager
+def requestDeadline(seconds: float):
+    token = REQUEST_DEADLINE.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        REQUEST_DEADLINE.reset(token)
+
+def test_no_statement_timeout_outside_a_request():
+    assert GetStatementTimeout() is None
+
+def test_sync_route_runs_with_the_deadline():
+    app = FastAPI()
+    app.add_middleware(RequestTimeoutMiddleware, timeout=5)
+
+    @app.get("/timeout")
+    def timeout():
+        return {"timeout": GetStatementTimeout()}
+
+    assert 0 < TestClient(app).get("/timeout").json()["timeout"] <= 5000
+
+def test_request_query_is_cancelled(postgresManager):
+    psycopg2 = pytest.importorskip("psycopg2")
+    with requestDeadline(0.2), pytest.raises(psycopg2.errors.QueryCanceled):
+        postgresManager.executeQuery("SELECT pg_sleep(2)")
+    assert postgresManager.getPoolStats()["inUse"] == 0
+    # The limit ended with the transaction
+    assert postgresManager.executeQuery("SHOW statement_timeout")[0]["statement_timeout"] == "0"
+
+def test_copy_from_outlives_the_request_timeout(postgresManager):
+    postgresManager.executeNonQuery("CREATE TABLE copy_timeout_test (id INT, name TEXT)")
+
+    def slowRows():
+        for i in range(50):
+            time.sleep(0.01)
+            yield i, f"row {i}"
+
+    try:
+        with requestDeadline(0.2):
+            assert postgresManager.copyFrom("copy_timeout_test", slowRows()) == 50
+        assert postgresManager.executeQuery("SELECT count(*) AS n FROM copy_timeout_test")[0]["n"] == 50
+    finally:
+        postgresManager.executeNonQuery("DROP TABLE copy_timeout_test")
@@ -0,0 +1,155 @@
+"""
+Tests of the memo and of the read-through result cache (app/utils/result_cache.py).
+"""
+import threading
+import time
+import pytest
+from app.utils.result_cache import MemoCache, ResultCache, SingleFlight
+
+def test_memo_hits_and_misses():
+    memo = MemoCache("test", 4)
+    assert memo.get("a") is None
+    memo.put("a", 1)
+    assert memo.get("a") == 1
+    stats = memo.getStats()
+    assert (stats["hits"], stats["misses"], stats["size"], stats["hitRatio"]) == (1, 1, 1, 0.5)
+
+def test_memo_is_cleared_when_full():
+    memo = MemoCache("test", 3)
+    for key in "abc":
+        memo.put(key, key)
+    entries = memo.entries
+    memo.put("d", "d")
+    assert memo.entries == {"d": "d"} and memo.getStats()["evictions"] == 3
+    assert entries == {"a": "a", "b": "b", "c": "c"} # A reader holding the previous dict still sees it
+
+def test_disabled_memo_keeps_nothing():
+    memo = MemoCache("test", 0)
+    memo.put("a", 1)
+    assert memo.get("a") is None and memo.getStats()["size"] == 0
+
+def test_single_flight_runs_once():
+    flights, started, release = SingleFlight(), threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def slowLoad():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    leader = threading.Thread(target=lambda: results.append(flights.do("key", slowLoad)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("key", slowLoad))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+    assert len(calls) == 1
+    assert sorted(results) == [("value", False)] + [("value", True)] * 4
+
+def test_single_flight_shares_the_error():
+    flights, started, release = SingleFlight(), threading.Event(), threading.Event()
+    errors = []
+
+    def failingLoad():
+        started.set()
+        release.wait(5)
+        raise KeyError("missing")
+
+    def call():
+        try:
+            flights.do("key", failingLoad)
+        except KeyError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(errors) == 2
+    assert flights.do("key", lambda: "again") == ("again", False) # The failed call is forgotten
+
+def test_result_is_cached_per_namespace():
+    cache = ResultCache(maxSize=10, defaultTtl=60)
+    loads = []
+    load = lambda: loads.append(1) or len(loads)
+    assert cache.getOrLoad(["users"], "q", load) == 1
+    assert cache.getOrLoad(["users"], "q", load) == 1
+    cache.invalidate("orders")
+    assert cache.getOrLoad(["users"], "q", load) == 1
+    cache.invalidate("users")
+    assert cache.getOrLoad(["users"], "q", load) == 2
+    assert cache.getOrLoad(["orders", "users"], "q", load) == 3
+    cache.invalidate("orders")
+    assert cache.getOrLoad(["users", "orders"], "q", load) == 4
+    cache.clear()
+    assert cache.getOrLoad(["users"], "q", load) == 5
+    stats = cache.getStats()
+    assert (stats["hits"], stats["loads"], stats["invalidations"]) == (2, 5, 4)
+
+def test_load_running_during_an_invalidation_is_not_cached():
+    cache = ResultCache(maxSize=10, defaultTtl=60)
+
+    def staleLoad():
+        cache.invalidate("users") # A write committed while the query ran
+        return "stale"
+
+    assert cache.getOrLoad(["users"], "q", staleLoad) == "stale"
+    assert cache.getOrLoad(["users"], "q", lambda: "fresh") == "fresh"
+    assert cache.getOrLoad(["users"], "q", lambda: "newer") == "fresh"
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = ResultCache(maxSize=2, defaultTtl=60, namespaceTtls={"fast": 1})
+    assert cache.getTtl(("fast", "slow")) == 1
+    cache.getOrLoad(["fast"], "a", lambda: "a1")
+    cache.getOrLoad(["slow"], "b", lambda: "b1")
+    now[0] += 2
+    assert cache.getOrLoad(["fast"], "a", lambda: "a2") == "a2"
+    assert cache.getOrLoad(["slow"], "b", lambda: "b2") == "b1"
+    cache.getOrLoad(["slow"], "c", lambda: "c1") # Evicts the least recently used entry, "a"
+    assert cache.getOrLoad(["slow"], "b", lambda: "b3") == "b1"
+    assert cache.getOrLoad(["fast"], "a", lambda: "a3") == "a3"
+    stats = cache.getStats()
+    assert (stats["expirations"], stats["evictions"], stats["size"]) == (1, 2, 2)
+
+def test_zero_ttl_bypasses_the_cache():
+    cache = ResultCache(maxSize=10, defaultTtl=0)
+    loads = []
+    for _ in range(2):
+        cache.getOrLoad(["users"], "q", lambda: loads.append(1))
+    assert len(loads) == 2 and cache.getStats()["size"] == 0
+
+def test_concurrent_misses_load_once():
+    cache = ResultCache(maxSize=10, defaultTtl=60)
+    started, release, loads = threading.Event(), threading.Event(), []
+
+    def slowLoad():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return "rows"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.getOrLoad(["users"], "q", slowLoad)))]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=lambda: results.append(cache.getOrLoad(["users"], "q", slowLoad))) for _ in range(4)]
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["rows"] * 5 and len(loads) == 1
+    assert cache.getStats()["sharedLoads"] == 4
@@ -0,0 +1,69 @@
+"""
+Tests of the settling of the rollup watermark (app/services/rollup.py).
+The Postgres tests run against an ephemeral server from pgserver (see benchmarks/requirements.txt).
+"""
+import pytest
+from app.services.rollup import ROLLUP_TABLE, EnsureRollupTables, QueryRollup, RebuildRollup, RefreshRollup, RollupSource, settleWatermark
+
+SOURCE = RollupSource("events", "rollup_events", valueColumn="value")
+DAY = 1735689600 # 01/01/2025 00:00:00 UTC
+
+@pytest.fixture
+def manager(postgresManager):
+    postgresManager.executeNonQuery("CREATE TABLE rollup_events (id BIGSERIAL PRIMARY KEY, timestamp BIGINT NOT NULL, value DOUBLE PRECISION)")
+    EnsureRollupTables()
+    yield postgresManager
+    RebuildRollup(SOURCE)
+    postgresManager.executeNonQuery("DROP TABLE rollup_events")
+
+@pytest.fixture
+def otherConnection(postgresDirectory):
+    """A second session, outside the single-connection pool."""
+    psycopg2 = pytest.importorskip("psycopg2")
+    conn = psycopg2.connect(host=postgresDirectory, dbname="postgres", user="postgres")
+    yield conn
+    conn.close()
+
+def insertRows(manager, count: int):
+    manager.executeMany("INSERT INTO rollup_events (timestamp, value) VALUES (%s, %s)", [(DAY + i, 1.0) for i in range(count)])
+
+def settle(manager) -> tuple[int, int]:
+    conn = manager.getConnection()
+    try:
+        with conn.cursor() as cur:
+            result = settleWatermark(cur, SOURCE)
+        conn.commit()
+        return result
+    finally:
+        manager.releaseConnection(conn)
+
+def test_ids_settle_on_the_third_run(manager):
+    insertRows(manager, 3)
+    assert [settle(manager) for _ in range(3)] == [(0, 0), (0, 0), (0, 3)]
+    insertRows(manager, 2)
+    # The next candidate is seen on the run that settles the previous one
+    assert [settle(manager) for _ in range(3)] == [(0, 3), (0, 3), (0, 5)]
+
+def test_open_transaction_holds_the_settled_id(manager, otherConnection):
+    insertRows(manager, 3)
+    with otherConnection.cursor() as cur:
+        cur.execute("INSERT INTO rollup_events (timestamp, value) VALUES (%s, 1.0)", (DAY,)) # Takes id 4, not committed yet
+    insertRows(manager, 1) # Id 5, visible before id 4
+    assert [settle(manager) for _ in range(4)] == [(0, 0), (0, 0), (0, 0), (0, 0)]
+    otherConnection.commit()
+    assert settle(manager) == (0, 5)
+
+def test_refresh_folds_late_commits(manager, otherConnection):
+    insertRows(manager, 3)
+    with otherConnection.cursor() as cur:
+        cur.execute("INSERT INTO rollup_events (timestamp, value) VALUES (%s, 1.0)", (DAY,))
+    insertRows(manager, 1)
+    for _ in range(3):
+        RefreshRollup(SOURCE, tz="UTC")
+    otherConnection.commit()
+    folded = sum(RefreshRollup(SOURCE, tz="UTC") for _ in range(3))
+    assert folded == 5
+    counts = manager.executeQuery(f"SELECT granularity, count FROM {ROLLUP_TABLE} WHERE source = %s ORDER BY granularity", (SOURCE.name,))
+    assert counts == [{"granularity": "day", "count": 5}, {"granularity": "month", "count": 5}, {"granularity": "year", "count": 5}]
+    result = QueryRollup(SOURCE, "day", DAY, DAY + 86400, tz="UTC")
+    assert (result["counts"], result["sums"], result["scannedRows"], result["watermark"]) == ([5], [5.0], 0, 5)
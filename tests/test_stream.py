@@ -0,0 +1,91 @@
+"""
+Tests of the streaming conversion parser (app/routers/day2timestamp_stream.py).
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.day2timestamp_stream import (
+    LINE_TOO_LONG_ERROR, MALFORMED_ROW_ERROR, MAX_LINE_BYTES, convertCsvLines, convertNdjsonLines, iterLineBatches, router
+)
+
+def splitLines(chunks: list[bytes]) -> list[list[bytes | None]]:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [lines async for lines in iterLineBatches(stream())]
+
+    return asyncio.run(collect())
+
+def utcMidnight(day: int, month: int, year: int) -> int:
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp())
+
+def test_lines_split_across_chunks():
+    assert splitLines([b"1,1,", b"2025\n2,1", b"", b",2025\n3,1,2025"]) == [[b"1,1,2025"], [b"2,1,2025"], [b"3,1,2025"]]
+    assert splitLines([b"a\nb\n"]) == [[b"a", b"b"]]
+    assert splitLines([]) == []
+
+@pytest.mark.parametrize("chunkSize", [1000, MAX_LINE_BYTES, 3 * MAX_LINE_BYTES])
+def test_long_line_is_skipped(chunkSize):
+    data = b"1,1,2025\n" + b"x" * (2 * MAX_LINE_BYTES) + b"\n2,1,2025\n"
+    chunks = [data[i:i + chunkSize] for i in range(0, len(data), chunkSize)]
+    lines = [line for batch in splitLines(chunks) for line in batch]
+    assert lines == [b"1,1,2025", None, b"2,1,2025"]
+
+def test_long_last_line_is_skipped():
+    data = b"1,1,2025\n" + b"x" * (MAX_LINE_BYTES + 1)
+    assert [line for batch in splitLines([data[:1000], data[1000:]]) for line in batch] == [b"1,1,2025", None]
+
+def test_line_at_the_limit_is_kept():
+    line = b"x" * MAX_LINE_BYTES
+    assert [line for batch in splitLines([line[:10], line[10:], b"\n"]) for line in batch] == [line]
+
+def test_ndjson_rows():
+    lines = [
+        b'{"day": 15, "month": 1, "year": 2025}', b"  ", b'{"day": 15, "month": 1, "year": 2025, "tz": "Asia/Ho_Chi_Minh"}',
+        b'{"day": "15", "month": 1, "year": 2025}', b'{"day": 15.0, "month": 1, "year": 2025}', b'{"day": true, "month": 1, "year": 2025}',
+        b'{"day": 15}', b"[1, 2, 3]", b"{", None, b'{"day": 30, "month": 2, "year": 2025}',
+    ]
+    results = list(convertNdjsonLines(lines, "UTC"))
+    assert results[:2] == [(utcMidnight(15, 1, 2025), None), (utcMidnight(15, 1, 2025) - 7 * 3600, None)]
+    assert results[2:8] == [(None, MALFORMED_ROW_ERROR)] * 6
+    assert results[8] == (None, LINE_TOO_LONG_ERROR)
+    assert results[9][0] is None and results[9][1].startswith("Invalid input")
+
+def test_csv_rows():
+    lines = [b"day,month,year,tz", b"15,1,2025", b"15,1,2025,Asia/Ho_Chi_Minh\r", b"15,1,2025, ", b"", b"a,1,2025", b"15,1", None]
+    assert list(convertCsvLines(lines, "UTC")) == [
+        (utcMidnight(15, 1, 2025), None), (utcMidnight(15, 1, 2025) - 7 * 3600, None), (utcMidnight(15, 1, 2025), None),
+        (None, MALFORMED_ROW_ERROR), (None, MALFORMED_ROW_ERROR), (None, LINE_TOO_LONG_ERROR),
+    ]
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.include_router(router, prefix="/day2timestamp")
+    return TestClient(app)
+
+def test_stream_ndjson(client):
+    def upload():
+        yield b'{"day": 15, "month": 1, "year": 2025}\n{"day": 16, "mo'
+        yield b'nth": 1, "year": 2025}\n'
+        yield b'{"day": 32, "month": 1, "year": 2025}'
+
+    response = client.post("/day2timestamp/stream", content=upload(), headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["timestamp"] for row in rows] == [utcMidnight(15, 1, 2025), utcMidnight(16, 1, 2025), None]
+    assert rows[2]["error"]
+
+def test_stream_csv(client):
+    response = client.post("/day2timestamp/stream?tz=Asia/Ho_Chi_Minh", content=b'15,1,2025\n15,1,2025,Bad"Zone\n', headers={"Content-Type": "text/csv"})
+    assert response.text.splitlines() == [
+        "timestamp,error", f"{utcMidnight(15, 1, 2025) - 7 * 3600},", ',"Invalid input: Unknown timezone \'Bad""Zone\'."'
+    ]
+
+def test_stream_rejects_other_content_types(client):
+    assert client.post("/day2timestamp/stream", content=b"{}", headers={"Content-Type": "application/json"}).status_code == 415